@@ -2,12 +2,12 @@ import asyncio
 import re
 import streamlit as st
 import os 
+import uuid
 from pydantic import BaseModel
 
 # Import from new modular structure
 from main import run_agent_async
 from src.config import get_settings
-from src.services import create_session_manager
 from src.utils import setup_logging
 
 st.set_page_config(
@@ -22,8 +22,8 @@ settings = get_settings()
 logger = setup_logging()
 
 # Environment variables from settings
-FOLDER_PATH = settings.target_folder_absolute_path
 MODEL = settings.advanced_programming_model
+HISTORY_PAGE = settings.chat_history_window
 
 class SessionModel(BaseModel):
     """Legacy session model for compatibility"""
@@ -31,29 +31,86 @@ class SessionModel(BaseModel):
     model_config = {"arbitrary_types_allowed": True}
 
 # Session management functions
-async def create_session_async():
+async def create_session_async(project=None):
     """Create session using new modular structure"""
-    session_manager = await create_session_manager()
+    # Loads google.adk and builds the agents on the first prompt, not on page load
+    from src.services import create_remote_session_manager, create_session_manager
+
+    # A browser session must not resume another one's conversation from a shared session store
+    session_id = uuid.uuid4().hex
+    if settings.agent_workers:
+        # Agents run in a worker process; this page only streams their events
+        session_manager = await create_remote_session_manager(session_id=session_id, target_folder=project)
+    else:
+        session_manager = await create_session_manager(session_id=session_id, target_folder=project)
     return SessionModel(session_manager=session_manager)
 
 def get_or_create_event_loop():
     try:
         return asyncio.get_running_loop()
     except RuntimeError:
-        loop = asyncio.new_event_loop()
+        # One loop per browser session: the project's MCP toolsets stay open
+        # between turns and can only be used from the loop that opened them
+        loop = st.session_state.get("event_loop")
+        if loop is None or loop.is_closed():
+            loop = asyncio.new_event_loop()
+            st.session_state.event_loop = loop
         asyncio.set_event_loop(loop)
         return loop
 
+def cancel_previous_turn():
+    """Stop a turn that is still running because its page was interrupted by a new prompt"""
+    turn = st.session_state.pop("turn", None)
+    if turn is not None and not turn.finished:
+        turn.cancel()
+        get_or_create_event_loop().run_until_complete(turn.wait())
+        logger.info("Cancelled the previous turn")
+
+
 def create_session():
     loop = get_or_create_event_loop()
-    return loop.run_until_complete(create_session_async())
+    return loop.run_until_complete(create_session_async(st.session_state.get("project")))
+
+
+def get_workspace():
+    from src.tools import get_workspace as _get_workspace
+
+    return _get_workspace()
+
+
+def select_project():
+    """Sidebar selector of the workspace projects; switching keeps the conversation"""
+    workspace = get_workspace()
+    options = [""] + [project["name"] for project in workspace.list_projects() if project["root"] != workspace.base]
+    current = st.session_state.get("project", "")
+    project = st.selectbox(
+        ":material/folder_open: Project",
+        options,
+        index=options.index(current) if current in options else 0,
+        format_func=lambda name: name or "Workspace (new project)",
+    )
+    if project != current:
+        st.session_state.project = project
+        cancel_previous_turn()
+        if "session_model" in st.session_state:
+            st.session_state.session_model.session_manager.select_project(project)
 
 # Response generator
-async def response_generator(prompt: str, session_model: SessionModel):
-    """Generate response using new modular structure"""
-    response =  run_agent_async(prompt, session_model.session_manager)
-    async for event in response:
-        yield event.content.parts[0].text
+async def response_generator(prompt: str, session_model: SessionModel, stats=None):
+    """
+    Generate response using new modular structure
+    
+    Yields StreamChunk objects: text deltas token by token, plus tool call
+    and tool result notifications that are rendered separately.
+    """
+    from src.services import TurnHandle, run_agent_in_worker, stream_chunks
+
+    run_agent = run_agent_in_worker if settings.agent_workers else run_agent_async
+    turn = TurnHandle(run_agent, prompt, session_model.session_manager)
+    # Kept so the next prompt can cancel this turn if the page moved on mid-stream
+    st.session_state.turn = turn
+    async for chunk in stream_chunks(turn.events(), stats):
+        yield chunk
 
 
 def sync_from_async_generator(async_gen):
@@ -78,9 +135,55 @@ def sync_from_async_generator(async_gen):
             break
         else:
             yield item
+def get_transcript():
+    """Transcript of this browser session; only its id lives in session_state"""
+    from src.services import get_transcript_store
+
+    transcript = get_transcript_store().get(st.session_state.get("transcript_id"))
+    st.session_state.transcript_id = transcript.id
+    return transcript
+
+
+def render_message(message):
+    avatar = ":material/person:" if message.role == "user" else ":material/neurology:"
+    with st.chat_message(message.role, avatar=avatar):
+        st.markdown(message.content)
+        if message.caption:
+            st.caption(message.caption)
+
+
+def load_earlier_messages():
+    st.session_state.history_window = st.session_state.get("history_window", HISTORY_PAGE) + HISTORY_PAGE
+
+
+def render_history(transcript):
+    """
+    Render the newest messages in full and collapse the rest
+
+    The page of messages just before the window is listed as one-line
+    summaries with a button that renders them in full; anything older is
+    only counted. Rerun cost and websocket payload stay bounded however
+    long the conversation gets.
+    """
+    if transcript.expired:
+        st.info("This chat was inactive for a long time and its earlier messages were cleared.", icon=":material/history_toggle_off:")
+    older, recent = transcript.window(st.session_state.get("history_window", HISTORY_PAGE))
+    if older or transcript.dropped:
+        page = older[-HISTORY_PAGE:]
+        earlier = len(older) - len(page) + transcript.dropped
+        with st.expander(f":material/history: {len(older) + transcript.dropped} earlier messages"):
+            if earlier:
+                st.caption(f"{earlier} more before these")
+            st.markdown("\n".join(
+                f"- **{'You' if message.role == 'user' else 'Agent'}:** {message.summary or '…'}" for message in page
+            ))
+            if page:
+                st.button(f"Show these {len(page)} in full", key="load_earlier", on_click=load_earlier_messages)
+    for message in recent:
+        render_message(message)
+
+
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
 if "theme" not in st.session_state:
     st.session_state.theme = "dark"
 
@@ -88,7 +191,9 @@ if "theme" not in st.session_state:
 def chatWithAgent():
 
     msg_container =  st.container(height=850, border=False)
-
+    transcript = get_transcript()
+    with msg_container:
+        render_history(transcript)
         
     col1, col2 = st.columns([4, 1.2])
     with col2:
@@ -111,52 +216,74 @@ def chatWithAgent():
         prompt = st.chat_input("💭 Type your message...", key="chat_input")
         if prompt:
             with st.spinner("Thinking...", show_time=True):
+                cancel_previous_turn()
                 # Ensure session exists
                 if "session_model" not in st.session_state:
                     st.session_state.session_model = create_session()
                 session_model: SessionModel = st.session_state.session_model
 
-                # Append user message
-                st.session_state.messages.append({"role": "user", "content": prompt})
+                # Append user message; the next rerun shows the default window again
+                st.session_state.history_window = HISTORY_PAGE
                 with msg_container:
-                    # Display all messages
-                    for msg in st.session_state.messages:
-                        if msg["role"] == "user":
-                            with st.chat_message("user", avatar=":material/person:"):
-                                st.markdown(msg["content"])
-                        else:
-                            with st.chat_message("assistant", avatar=":material/neurology:"):
-                                st.markdown(msg["content"])
+                    render_message(transcript.append("user", prompt))
                 # Prepare async response stream
-                async_gen = response_generator(prompt, session_model)
+                from src.services import StreamStats
+
+                stats = StreamStats()
+                async_gen = response_generator(prompt, session_model, stats)
 
                 # Append empty assistant message (will stream into it)
-                st.session_state.messages.append({"role": "assistant", "content": ""})
+                reply = transcript.append("assistant", final=False)
                 with msg_container:
 
                     with st.chat_message("assistant", avatar=":material/neurology:"):
+                        tool_placeholder = st.empty()
                         stream_placeholder = st.empty()
 
                         # Consume async generator chunk by chunk
                         for chunk in sync_from_async_generator(async_gen):
-                            chunk_text = "" if chunk is None else str(chunk)
-                            st.session_state.messages[-1]["content"] += chunk_text
+                            if chunk.kind == "tool_call":
+                                tool_placeholder.caption(f":material/build: Working: `{chunk.name}`")
+                                continue
+                            if chunk.kind == "tool_result":
+                                tool_placeholder.caption(f":material/check: Done: `{chunk.name}`")
+                                continue
+                            if chunk.kind == "error":
+                                tool_placeholder.caption(f":material/error: {chunk.text}")
+                                continue
+
+                            reply.content += chunk.text
                             
                             # live update inside SAME chat bubble
-                            stream_placeholder.markdown(st.session_state.messages[-1]["content"])
+                            stream_placeholder.markdown(reply.content)
                         # final render
-                        stream_placeholder.markdown(st.session_state.messages[-1]["content"])
+                        reply.final = True
+                        stream_placeholder.markdown(reply.content)
+                        tool_placeholder.empty()
+                        if stats.time_to_first_token is not None:
+                            reply.caption = (
+                                f"First token {stats.time_to_first_token:.2f}s · "
+                                f"total {stats.duration:.1f}s · {stats.tool_calls} tool calls"
+                            )
+                            st.caption(reply.caption)
+                            logger.info(
+                                f"Turn streamed: ttft={stats.time_to_first_token:.2f}s "
+                                f"duration={stats.duration:.2f}s chunks={stats.text_chunks}"
+                            )
                             
 
         
 # Enhanced Sidebar
 with st.sidebar:
+    select_project()
     chatWithAgent()
     
 
 def preview():    
     # Check project type
-    package_json_path = os.path.join(FOLDER_PATH, "package.json")
+    workspace = get_workspace()
+    project_root = workspace.resolve(st.session_state.get("project"))
+    package_json_path = os.path.join(project_root, "package.json")
     has_react_project = os.path.exists(package_json_path)
     
     if not has_react_project:
@@ -169,7 +296,16 @@ def preview():
         return
     
 
-    preview_url = "http://localhost:8080"
+    # One dev server per project, kept by the workspace until the project goes idle
+    preview_url = workspace.dev_server_url(project_root)
+    if preview_url is None:
+        if not os.path.isdir(os.path.join(project_root, "node_modules")):
+            st.info(":material/info: Install the dependencies (ask the agent) before starting the dev server")
+            return
+        if st.button(":material/play_arrow: Start dev server"):
+            preview_url = workspace.start_dev_server(project_root)
+        else:
+            return
     
     import requests
     try:
@@ -179,10 +315,10 @@ def preview():
         else:
             st.warning("Server not responding correctly")
     except:
-        st.warning("""
-            :material/warning: Dev server not running
+        st.warning(f"""
+            :material/hourglass_top: Dev server starting at {preview_url}
             
-            Start it with: `npm run dev` in the project folder
+            Reload the preview in a few seconds
         """)
     
 
@@ -0,0 +1 @@
+"""Offline benchmarks and profiling scripts"""
@@ -0,0 +1,93 @@
+"""
+Cold-start import time profiling
+
+Prints the slowest imports (cumulative time from `python -X importtime`)
+for the entry points, so heavy modules creeping back into the import path
+are easy to spot.
+
+Usage:
+    python benchmarks/import_time.py [module ...] [--top N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+ENTRY_POINTS = ['main', 'tashkill_agent', 'src', 'src.services', 'src.agents']
+
+# Modules that must not be loaded by a cold import of the entry points
+HEAVY_MODULES = ('google.adk', 'google.genai', 'mcp', 'streamlit', 'litellm')
+
+
+def measure_import(statement: str) -> Dict[str, object]:
+    """
+    Time an import statement in a fresh interpreter
+
+    Args:
+        statement: Python import statement, e.g. "import main"
+
+    Returns:
+        Elapsed milliseconds and the heavy modules that got loaded
+    """
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = (time.perf_counter() - started) * 1000\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'ms': elapsed, 'heavy': heavy}))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def importtime_report(module: str, top: int = 15) -> List[Tuple[float, float, str]]:
+    """
+    Slowest imports of a module according to `python -X importtime`
+
+    Args:
+        module: Module to import
+        top: Number of entries to return
+
+    Returns:
+        (cumulative ms, self ms, module name), slowest first
+    """
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS, help='Modules to profile')
+    parser.add_argument('--top', type=int, default=15, help='Imports to list per module')
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = measure_import(f'import {module}')
+        heavy = ', '.join(result['heavy']) or 'none'
+        print(f"\n{module}: {result['ms']:.1f} ms (heavy modules loaded: {heavy})")
+        print(f"  {'cumulative':>10}  {'self':>8}  module")
+        for cumulative, own, name in importtime_report(module, args.top):
+            print(f"  {cumulative:>8.1f}ms  {own:>6.1f}ms  {name}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
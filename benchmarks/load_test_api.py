@@ -0,0 +1,133 @@
+"""
+Load test for the API server against the stub model
+
+Starts the API server in-process on one event loop, opens many concurrent
+client sessions and streams turns over SSE, then reports latency, time to
+first token and throughput. No model provider or network is involved.
+
+Usage:
+    python benchmarks/load_test_api.py --clients 50 --messages 3 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+import httpx
+import uvicorn
+from google.adk.runners import Runner
+
+from benchmarks.run_benchmarks import build_agent
+from src.api import create_app
+from src.config import get_settings
+from src.services import create_session_manager, get_runner_plugins
+from src.tools import get_workspace
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def stub_session_factory(root: str, latency: float):
+    """Session factory that wires every new session to the stub-model agent"""
+    settings = get_settings()
+
+    async def factory(session_id: str, user_id: str, target_folder=None):
+        folder = os.path.join(root, session_id)
+        os.makedirs(folder, exist_ok=True)
+        manager = await create_session_manager(session_id=session_id, user_id=user_id, target_folder=folder)
+        manager.runner = Runner(
+            app_name=settings.app_name,
+            agent=build_agent(folder, latency),
+            artifact_service=manager.artifacts_service,
+            session_service=manager.session_service,
+            plugins=get_runner_plugins(),
+        )
+        return manager
+
+    return factory
+
+
+async def run_client(client: httpx.AsyncClient, messages: int, results: list):
+    """One user: create a session and stream several turns"""
+    response = await client.post('/sessions', json={'user_id': 'load'})
+    response.raise_for_status()
+    session_id = response.json()['session_id']
+    for index in range(messages):
+        started = time.perf_counter()
+        first_token = None
+        failed = False
+        async with client.stream('POST', f'/sessions/{session_id}/messages', json={'message': f'turn {index}'}) as stream:
+            async for line in stream.aiter_lines():
+                if line.startswith('event: text') and first_token is None:
+                    first_token = time.perf_counter() - started
+                elif line.startswith('event: error'):
+                    failed = True
+        results.append({
+            'latency': time.perf_counter() - started,
+            'ttft': first_token,
+            'failed': failed or stream.status_code != 200,
+        })
+
+
+async def load_test(clients: int, messages: int, latency: float) -> dict:
+    settings = get_settings()
+    settings.react_manage_project_mcp_path = os.path.join(REPO_ROOT, 'tools.py')
+    port = _free_port()
+    results: list = []
+
+    with tempfile.TemporaryDirectory(prefix='tashkil-load-') as root:
+        get_workspace().add_root(root)
+        app = create_app(stub_session_factory(root, latency))
+        server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=None) as client:
+            await asyncio.gather(*(run_client(client, messages, results) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+        server.should_exit = True
+        await server_task
+
+    latencies = sorted(r['latency'] for r in results)
+    ttfts = sorted(r['ttft'] for r in results if r['ttft'] is not None)
+    return {
+        'clients': clients,
+        'turns': len(results),
+        'failed': sum(1 for r in results if r['failed']),
+        'turns_per_second': round(len(results) / elapsed, 2),
+        'latency_p50_s': round(latencies[len(latencies) // 2], 3),
+        'latency_p95_s': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        'ttft_p50_s': round(statistics.median(ttfts), 3) if ttfts else None,
+        'elapsed_s': round(elapsed, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=20, help='Concurrent client sessions')
+    parser.add_argument('--messages', type=int, default=3, help='Turns per client')
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated model latency per call in seconds')
+    args = parser.parse_args()
+
+    report = asyncio.run(load_test(args.clients, args.messages, args.latency))
+    print(json.dumps(report, indent=2))
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
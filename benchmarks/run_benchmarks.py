@@ -0,0 +1,238 @@
+"""
+Offline end-to-end benchmarks
+
+Runs the full DevFlowAgent -> Runner -> MCP toolset path against the
+scripted StubLlm, so no model provider or network is involved, and
+compares the results against the baselines committed in baselines.json.
+A missing baseline file fails the comparison; it is only written with
+--update-baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # compare with baselines
+    python benchmarks/run_benchmarks.py --update-baseline  # record new baselines
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, REPO_ROOT)
+
+from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.runners import Runner
+
+from main import run_agent_async
+from src.agents import DevFlowAgent
+from src.config import get_settings
+from src.models import StubLlm
+from src.services import create_session_manager
+from src.tools import get_workspace
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+
+# metric -> (better direction, allowed relative regression)
+THRESHOLDS = {
+    'session_create_ms': ('lower', 0.50),
+    'turn_latency_ms_p50': ('lower', 0.25),
+    'turn_latency_ms_p95': ('lower', 0.35),
+    'tool_call_overhead_ms': ('lower', 0.30),
+    'memory_peak_mb': ('lower', 0.20),
+    'events_per_second': ('higher', 0.25),
+}
+
+# metric -> smallest absolute change that counts as a regression; below a
+# millisecond a relative threshold only measures scheduler noise
+MIN_REGRESSION = {
+    'session_create_ms': 0.25,
+}
+
+# Sessions created back to back per timing sample of the session benchmark
+SESSIONS_PER_SAMPLE = 20
+
+BENCH_SCRIPT = [
+    {'tool': 'tashkil-write-files', 'args': {'operations': [
+        {'path': 'bench/src/App.jsx', 'content': 'export default function App() {\n  return <main>Hello</main>;\n}\n'},
+        {'path': 'bench/src/main.jsx', 'content': "import App from './App';\n"},
+    ]}},
+    {'tool': 'tashkil-read-files', 'args': {'paths': ['bench/src/App.jsx', 'bench/src/main.jsx']}},
+    {'tool': 'tashkil-apply-patch', 'args': {'path': 'bench/src/App.jsx', 'patch': (
+        '@@ -1,3 +1,3 @@\n'
+        ' export default function App() {\n'
+        '-  return <main>Hello</main>;\n'
+        '+  return <main>Hello, benchmark</main>;\n'
+        ' }\n'
+    )}},
+    {'text': 'The App component now greets the benchmark.'},
+]
+
+
+def build_agent(root: str, latency: float, script: list = BENCH_SCRIPT) -> DevFlowAgent:
+    """DevFlowAgent whose agents all use the stub model and the local MCP server"""
+    model = StubLlm(model='stub/bench', script=script, latency=latency)
+    # The workspace's warm project toolset, as the real agents use it
+    _, toolset = get_workspace().toolsets(root)
+    requirements_agent = LlmAgent(name='RequirementsAgent', model=model, instruction='Write requirements.')
+    design_agent = LlmAgent(name='DesignAgent', model=model, instruction='Write a design.')
+    tasks_agent = LlmAgent(name='TasksAgent', model=model, instruction='Write tasks.')
+    responsible_agent = LlmAgent(
+        name='ReactDesignExpertAgent',
+        model=model,
+        instruction='Build the requested React UI.',
+        tools=[toolset],
+    )
+    return DevFlowAgent(
+        name='AppDevOrchestrator',
+        requirements_agent=requirements_agent,
+        design_agent=design_agent,
+        tasks_agent=tasks_agent,
+        project_workflow=SequentialAgent(
+            name='ProjectWorkflowAgent',
+            sub_agents=[requirements_agent, design_agent, tasks_agent],
+        ),
+        responsible_agent=responsible_agent,
+        toolset_file_system=toolset,
+        target_folder=root,
+    )
+
+
+async def bench_sessions(count: int) -> float:
+    """
+    create_session_manager time in milliseconds
+
+    One creation takes tens of microseconds, below the timer's useful
+    resolution, so every sample times SESSIONS_PER_SAMPLE creations and
+    the median sample is reported per session.
+    """
+    samples = []
+    for sample in range(max(1, count)):
+        started = time.perf_counter()
+        for index in range(SESSIONS_PER_SAMPLE):
+            await create_session_manager(session_id=f'bench-session-{sample}-{index}', user_id='bench')
+        samples.append((time.perf_counter() - started) * 1000 / SESSIONS_PER_SAMPLE)
+    return statistics.median(samples)
+
+
+async def bench_turns(root: str, turns: int, latency: float) -> dict:
+    """Run turns end to end and collect latency, tool overhead and event rate"""
+    session_manager = await create_session_manager(session_id='bench-turns', user_id='bench', target_folder=root)
+    settings = get_settings()
+    session_manager.runner = Runner(
+        app_name=settings.app_name,
+        agent=build_agent(root, latency),
+        artifact_service=session_manager.artifacts_service,
+        session_service=session_manager.session_service,
+    )
+
+    latencies, tool_overheads = [], []
+    total_events = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for turn in range(turns):
+        turn_started = time.perf_counter()
+        pending = {}
+        async for event in run_agent_async(f'Benchmark turn {turn}', session_manager, raise_errors=True):
+            now = time.perf_counter()
+            total_events += 1
+            for call in event.get_function_calls():
+                pending[call.id] = now
+            for response in event.get_function_responses():
+                if response.id in pending:
+                    tool_overheads.append((now - pending.pop(response.id)) * 1000)
+        latencies.append((time.perf_counter() - turn_started) * 1000)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'turn_latency_ms_p50': latencies[len(latencies) // 2],
+        'turn_latency_ms_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'tool_call_overhead_ms': statistics.mean(tool_overheads) if tool_overheads else 0.0,
+        'memory_peak_mb': peak / (1024 * 1024),
+        'events_per_second': total_events / elapsed if elapsed else 0.0,
+        'events': total_events,
+    }
+
+
+async def run_benchmarks(turns: int, sessions: int, latency: float) -> dict:
+    """Run every benchmark and return the collected metrics"""
+    settings = get_settings()
+    settings.react_manage_project_mcp_path = os.path.join(REPO_ROOT, 'tools.py')
+    with tempfile.TemporaryDirectory(prefix='tashkil-bench-') as root:
+        get_workspace().add_root(root)
+        metrics = {'session_create_ms': await bench_sessions(sessions)}
+        metrics.update(await bench_turns(root, turns, latency))
+    metrics['max_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {name: round(value, 3) for name, value in metrics.items()}
+
+
+def compare(metrics: dict, baseline: dict) -> list:
+    """Return a description of every metric that regressed past its threshold"""
+    regressions = []
+    for name, (direction, tolerance) in THRESHOLDS.items():
+        tolerance = baseline.get('thresholds', {}).get(name, tolerance)
+        expected = baseline.get('metrics', {}).get(name)
+        current = metrics.get(name)
+        if expected is None or current is None or not expected:
+            continue
+        change = (current - expected) / expected
+        if abs(current - expected) < MIN_REGRESSION.get(name, 0.0):
+            continue
+        if (direction == 'lower' and change > tolerance) or (direction == 'higher' and -change > tolerance):
+            regressions.append(f'{name}: {current} vs baseline {expected} ({change:+.0%}, allowed {tolerance:.0%})')
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=20, help='End-to-end turns to run')
+    parser.add_argument('--sessions', type=int, default=50,
+                        help=f'Timing samples of the session benchmark, {SESSIONS_PER_SAMPLE} sessions each')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated model latency per call in seconds')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the new baseline')
+    args = parser.parse_args()
+
+    if not args.update_baseline and not os.path.exists(args.baseline):
+        # Writing one here would make the first comparison pass against itself
+        print(f'ERROR no baseline at {args.baseline}; record one with --update-baseline', file=sys.stderr)
+        return 2
+
+    metrics = asyncio.run(run_benchmarks(args.turns, args.sessions, args.latency))
+    print(json.dumps(metrics, indent=2))
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'turns': args.turns,
+                'thresholds': {name: tolerance for name, (_, tolerance) in THRESHOLDS.items()},
+                'metrics': metrics,
+            }, f, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    for name in THRESHOLDS:
+        if not baseline.get('metrics', {}).get(name):
+            print(f'WARNING {name} has no baseline and is not compared', file=sys.stderr)
+    regressions = compare(metrics, baseline)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
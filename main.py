@@ -2,17 +2,21 @@
 Main entry point for Tashkil Coder
 """
 
+import argparse
 import asyncio
+import json
 import traceback
-from google.genai import types
+from typing import Optional
 
-from src.utils import setup_logging
-from src.services import create_session_manager
+# google.adk / google.genai and the src services are imported inside the
+# functions that need them, so importing this module stays cheap
 
 
 async def run_agent_async(
     query: str,
-    session_manager=None
+    session_manager=None,
+    raise_errors: bool = False,
+    streaming: Optional[bool] = None
 ):
     """
     Run the agent with the given query
@@ -20,11 +24,25 @@ async def run_agent_async(
     Args:
         query: User input query
         session_manager: Optional session manager (will create if not provided)
+        raise_errors: Re-raise errors instead of only logging them
+        streaming: Emit partial (token-level) events; defaults to settings
         
     Returns:
         Agent response text
     """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
+    from src.config import get_settings
+    from src.models import set_turn_deadline
+    from src.services import create_session_manager, get_memory_accountant
+    from src.utils import setup_logging
+
     logger = setup_logging()
+    settings = get_settings()
+    if streaming is None:
+        streaming = settings.stream_responses
+    # Model retries and rate-limit waits give up once the turn runs out of time
+    set_turn_deadline(settings.turn_timeout)
     
     try:
         # Create session manager if not provided
@@ -46,7 +64,10 @@ async def run_agent_async(
         events_async = runner.run_async(
             session_id=session_manager.session.id,
             user_id=session_manager.session.user_id,
-            new_message=content
+            new_message=content,
+            run_config=RunConfig(
+                streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE
+            )
         )
                 
         async for event in events_async:
@@ -60,7 +81,17 @@ async def run_agent_async(
     except Exception as e:
         logger.error(f"Error in run_agent_async: {e}")
         traceback.print_exc()
+        if raise_errors:
+            raise
         # return f"An error occurred: {e}"
+    finally:
+        # Account the session's memory and spill old events above the caps,
+        # also after a failed or cancelled turn, whose events are kept too
+        if session_manager is not None:
+            try:
+                get_memory_accountant().after_turn(session_manager)
+            except Exception as e:
+                logger.error(f"Memory accounting failed: {e}")
 
 
 def run_agent(query: str, session_service=None, artifacts_service=None, session=None) -> str:
@@ -76,17 +107,82 @@ def run_agent(query: str, session_service=None, artifacts_service=None, session=
     Returns:
         Agent response text
     """
+    async def collect() -> str:
+        from src.tools import get_workspace
+
+        final_response_text = ""
+        async for event in run_agent_async(query, streaming=False):
+            if event.is_final_response() and event.content and event.content.parts:
+                final_response_text = "".join(part.text or "" for part in event.content.parts)
+        # One-shot run: stop the project's MCP servers instead of keeping them warm
+        await get_workspace().close_all()
+        return final_response_text
+
     try:
         loop = asyncio.get_event_loop()
     except RuntimeError:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
     
-    return loop.run_until_complete(run_agent_async(query))
+    return loop.run_until_complete(collect())
+
+
+def parse_args():
+    """Command line arguments for single-query and batch runs"""
+    parser = argparse.ArgumentParser(description="Run the Tashkil Coder agent without the Streamlit UI")
+    parser.add_argument("query", nargs="?", default="Create a simple todo app with React",
+                        help="Query to run once (ignored with --batch)")
+    parser.add_argument("--batch", metavar="REQUESTS_JSONL",
+                        help="Process every request of a JSONL file")
+    parser.add_argument("--output", default="batch_results.jsonl",
+                        help="Results JSONL file, appended to and used to resume")
+    parser.add_argument("--output-root", default="./batch_output",
+                        help="Parent folder of the per-request project folders")
+    parser.add_argument("--concurrency", type=int, default=2,
+                        help="Maximum requests processed at the same time")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Re-run requests whose previous result failed")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Stop after this many new requests")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the HTTP/WebSocket API server instead of a query")
+    parser.add_argument("--host", default="127.0.0.1", help="API server host")
+    parser.add_argument("--port", type=int, default=8000, help="API server port")
+    parser.add_argument("--cassette", metavar="PATH",
+                        help="Cassette file to record to or replay from")
+    parser.add_argument("--cassette-mode", choices=["record", "replay", "replay-timed", "replay-model"],
+                        help="Record model/tool traffic, or replay it without model calls")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    # Example usage
-    test_query = "Create a simple todo app with React"
-    result = run_agent(test_query)
-    print(f"Result: {result}")
\ No newline at end of file
+    from src.config import get_settings
+    from src.services import run_batch
+    from src.utils import setup_logging
+
+    args = parse_args()
+    settings = get_settings()
+    if args.cassette_mode:
+        settings.cassette_mode = args.cassette_mode
+    if args.cassette:
+        settings.cassette_path = args.cassette
+    if args.serve:
+        from src.api import serve
+
+        setup_logging()
+        serve(host=args.host, port=args.port)
+    elif args.batch:
+        setup_logging()
+        summary = asyncio.run(run_batch(
+            input_path=args.batch,
+            output_path=args.output,
+            run_agent=run_agent_async,
+            concurrency=args.concurrency,
+            output_root=args.output_root,
+            retry_failed=args.retry_failed,
+            limit=args.limit,
+        ))
+        print(json.dumps(summary))
+    else:
+        result = run_agent(args.query)
+        print(f"Result: {result}")
\ No newline at end of file
@@ -2,5 +2,16 @@
 Tashkil Coder - AI-powered development assistant
 """
 
+import importlib
+
 __version__ = "1.0.0"
-__author__ = "Tashkil Team"
\ No newline at end of file
+__author__ = "Tashkil Team"
+
+_SUBPACKAGES = {"agents", "api", "config", "models", "services", "tools", "utils"}
+
+
+def __getattr__(name):
+    """Import subpackages on first access, e.g. `src.services`"""
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,12 +1,36 @@
 """Agents module for AI agent definitions"""
 
-from .base import AgentInputSchemas
-from .specialized_agents import create_specialized_agents
-from .orchestrator import DevFlowAgent, create_dev_flow_agent
+from typing import TYPE_CHECKING
+
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .base import PROJECT_CONTEXT_MARKER, AgentInputSchemas, with_project_context
+    from .specialized_agents import create_specialized_agents
+    from .orchestrator import DevFlowAgent, create_dev_flow_agent
+    from .task_executor import TaskExecutor, parse_task_graph
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "AgentInputSchemas": ".base",
+    "PROJECT_CONTEXT_MARKER": ".base",
+    "with_project_context": ".base",
+    "create_specialized_agents": ".specialized_agents",
+    "DevFlowAgent": ".orchestrator",
+    "create_dev_flow_agent": ".orchestrator",
+    "TaskExecutor": ".task_executor",
+    "parse_task_graph": ".task_executor",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     "AgentInputSchemas",
-    "create_specialized_agents", 
+    "PROJECT_CONTEXT_MARKER",
+    "with_project_context",
+    "create_specialized_agents",
     "DevFlowAgent",
-    "create_dev_flow_agent"
-]
\ No newline at end of file
+    "create_dev_flow_agent",
+    "TaskExecutor",
+    "parse_task_graph"
+]
@@ -3,6 +3,25 @@
 from pydantic import BaseModel, Field
 
 
+# Everything before this marker in an instruction is identical for every
+# session and project, so providers can cache it as a prompt prefix
+PROJECT_CONTEXT_MARKER = "\n\n---\n**File System Path**: "
+
+
+def with_project_context(static_instruction: str, target_folder: str) -> str:
+    """
+    Append the per-project part of an instruction after its static part
+
+    Args:
+        static_instruction: Instruction text that never changes
+        target_folder: Project folder of this session
+
+    Returns:
+        Instruction whose byte-stable prefix is static_instruction
+    """
+    return static_instruction.rstrip() + PROJECT_CONTEXT_MARKER + target_folder
+
+
 class AgentInputSchemas:
     """Input schemas for different agent types"""
     
@@ -1,7 +1,7 @@
 """Main orchestrator agent for development workflow"""
 
 import logging
-from typing import AsyncGenerator, Dict, Any
+from typing import AsyncGenerator, Dict, Any, Optional
 from typing_extensions import override
 
 from google.adk.agents import BaseAgent, LlmAgent, SequentialAgent
@@ -10,6 +10,9 @@ from google.adk.events import Event
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 
 from .specialized_agents import create_specialized_agents
+from .task_executor import TaskExecutor, parse_task_graph
+from ..config import get_settings
+from ..tools import get_workspace
 
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,8 @@ class DevFlowAgent(BaseAgent):
     project_workflow: SequentialAgent
     responsible_agent: LlmAgent 
     toolset_file_system: MCPToolset
+    toolset_react_project: Optional[MCPToolset] = None
+    target_folder: Optional[str] = None
     
     model_config = {"arbitrary_types_allowed": True}
 
@@ -38,7 +43,9 @@ class DevFlowAgent(BaseAgent):
         tasks_agent: LlmAgent,
         project_workflow: SequentialAgent,
         responsible_agent: LlmAgent,
-        toolset_file_system: MCPToolset
+        toolset_file_system: MCPToolset,
+        toolset_react_project: Optional[MCPToolset] = None,
+        target_folder: Optional[str] = None
     ):
         """
         Initialize the development flow orchestrator
@@ -50,6 +57,8 @@ class DevFlowAgent(BaseAgent):
             tasks_agent: Agent for breaking down tasks
             responsible_agent: Main development agent
             toolset_file_system: Filesystem toolset for file operations
+            toolset_react_project: Project management toolset (batch files, npm)
+            target_folder: Project folder the workflow builds in
         """
         # Only the responsible agent is in sub_agents as it orchestrates others
         sub_agents_list = [responsible_agent]
@@ -63,6 +72,8 @@ class DevFlowAgent(BaseAgent):
             project_workflow=project_workflow,
             responsible_agent=responsible_agent,
             toolset_file_system=toolset_file_system,
+            toolset_react_project=toolset_react_project,
+            target_folder=target_folder,
             sub_agents=sub_agents_list,
         )
 
@@ -184,40 +195,59 @@ class DevFlowAgent(BaseAgent):
             
         #     logger.info(f"[{self.name}] Project state after generate tasks: {ctx.session.state.get('tasks_list')}")
 
+        settings = get_settings()
+        root = self.target_folder or settings.target_folder_absolute_path
         try:
             logger.info(f"[{self.name}] Starting development workflow")
             
-            # Execute the responsible agent which will orchestrate the entire flow
-            async for event in self.responsible_agent.run_async(ctx):
-                logger.info(
-                    f"[{self.name}] Event from workflow: "
-                    f"{event.model_dump_json(indent=2, exclude_none=True)}"
+            tasks = []
+            if settings.parallel_task_workers > 0 and not ctx.session.state.get('task_results'):
+                tasks = parse_task_graph(ctx.session.state.get('tasks_list'))
+
+            if tasks:
+                # Build independent tasks concurrently instead of one agent working serially
+                logger.info(f"[{self.name}] Executing {len(tasks)} tasks with {settings.parallel_task_workers} workers")
+                executor = TaskExecutor(
+                    template_agent=self.responsible_agent,
+                    root=root,
+                    max_workers=settings.parallel_task_workers,
+                    lock_timeout=settings.task_lock_timeout,
                 )
-                yield event
+                events = executor.run(ctx, tasks)
+            else:
+                # Execute the responsible agent which will orchestrate the entire flow
+                events = self.responsible_agent.run_async(ctx)
+
+            # The project's toolsets stay open between turns and are shared with
+            # other sessions on it; the workspace closes them once the root is idle
+            async with get_workspace().use(root):
+                async for event in events:
+                    # Full event dumps are large copies; only build them when debugging
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"[{self.name}] Event from workflow: {event.model_dump_json(exclude_none=True)}")
+                    else:
+                        logger.info(f"[{self.name}] Event {event.id} from {event.author}")
+                    yield event
                 
             logger.info(f"[{self.name}] Workflow completed successfully")
             
         except Exception as e:
             logger.error(f"Error in {self.name}: {e}")
             raise e
-        finally:
-            # Clean up resources
-            if self.toolset_file_system:
-                try:
-                    await self.toolset_file_system.close()
-                    logger.info(f"[{self.name}] Toolset closed successfully")
-                except Exception as e:
-                    logger.warning(f"[{self.name}] Error closing toolset: {e}")
 
 
-def create_dev_flow_agent() -> DevFlowAgent:
+def create_dev_flow_agent(target_folder: Optional[str] = None) -> DevFlowAgent:
     """
     Factory function to create a configured DevFlowAgent
     
+    Args:
+        target_folder: Project folder the workflow builds in (defaults to the workspace base)
+        
     Returns:
         Configured DevFlowAgent instance
     """
-    agents_config = create_specialized_agents()
+    target_folder = get_workspace().resolve(target_folder)
+    agents_config = create_specialized_agents(target_folder)
     
     return DevFlowAgent(
         name="AppDevOrchestrator",
@@ -226,5 +256,7 @@ def create_dev_flow_agent() -> DevFlowAgent:
         tasks_agent=agents_config['tasks_agent'],
         project_workflow=agents_config['project_workflow'],
         responsible_agent=agents_config['responsible_agent'],
-        toolset_file_system=agents_config['toolset_file_system']
+        toolset_file_system=agents_config['toolset_file_system'],
+        toolset_react_project=agents_config['toolset_react_project'],
+        target_folder=target_folder
     )
\ No newline at end of file
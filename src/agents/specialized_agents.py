@@ -1,28 +1,57 @@
 """Specialized agent implementations"""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from google.adk.agents import LlmAgent, SequentialAgent
-from google.adk.models.lite_llm import LiteLlm
-from .base import AgentInputSchemas, AgentOutputSchemas
+from .base import AgentInputSchemas, AgentOutputSchemas, with_project_context
 from ..config import get_settings
-from ..tools import create_filesystem_toolset
+from ..models import create_rate_limited_model
+from ..tools import format_catalog, get_component_catalog, get_workspace
 
-import os
-from dotenv import load_dotenv
-load_dotenv()
 
-def create_specialized_agents() -> Dict[str, Any]:
+def build_components_section(catalog: Dict[str, Any]) -> str:
+    """
+    Template UI Components section of the developer agent's instruction
+
+    Args:
+        catalog: Manifest from get_component_catalog()
+
+    Returns:
+        Section text, empty when the template has no components
+    """
+    component_catalog = format_catalog(catalog)
+    if not component_catalog:
+        return ""
+    return (
+        "### Template UI Components:\n"
+        "New projects already contain these components (`*` marks a default variant). "
+        "Each line lists a file's named exports and the path to import them from; use them instead of listing or reading the component files to discover them, and "
+        "`tashkil-list-components` returns their full props.\n"
+        f"{component_catalog}\n\n"
+    )
+
+
+def create_specialized_agents(target_folder: Optional[str] = None) -> Dict[str, Any]:
     """
     Create all specialized agents for the development workflow
+    
+    Args:
+        target_folder: Project folder the agents work in (defaults to the workspace base)
     """
     settings = get_settings()
-    toolset_file_system = create_filesystem_toolset()
+    workspace = get_workspace()
+    target_folder = workspace.resolve(target_folder)
+    # Shared with every other session on this project, so a switch reuses warm MCP servers
+    toolset_file_system, toolset_react_project = workspace.toolsets(target_folder)
+    text_model = create_rate_limited_model(settings.text_generation_model)
+    programming_model = create_rate_limited_model(settings.advanced_programming_model)
+    # Built once per template version; part of the static, cacheable instruction prefix
+    components_section = build_components_section(get_component_catalog())
     
     # Requirements Agent
     requirements_agent = LlmAgent(
         name="RequirementsAgent",
-        model=settings.text_generation_model,
-        instruction=(
+        model=text_model,
+        instruction=with_project_context(
             "You are a professional UX/UI analyst specializing in **React applications**. Your primary goal is to understand the user's application idea and produce a comprehensive requirements document focused on user experience and interface design for a React project.\n\n"
             "**TARGET FRAMEWORK**: React (with Vite, TypeScript, Tailwind CSS, and shadcn/ui)\n\n"
             "Follow these steps:\n"
@@ -46,8 +75,8 @@ def create_specialized_agents() -> Dict[str, Any]:
             "    - Custom hooks needed\n"
             "6.  **Structure the Document**: Organize the requirements under clear, structured headings for readability.\n"
             "7.  **Validate**: Before finalizing, ensure the requirements are complete, consistent, and unambiguous for a React project.\n"
-            "8.  **Save the Output**: Persist the final document as 'requirements.md' in the specified project folder.\n\n"
-            f"**File System Path**: {settings.target_folder_absolute_path}"
+            "8.  **Save the Output**: Persist the final document as 'requirements.md' in the specified project folder.\n\n",
+            target_folder,
         ),
         tools=[toolset_file_system],
         input_schema=AgentInputSchemas.RequirementsInput,
@@ -58,8 +87,8 @@ def create_specialized_agents() -> Dict[str, Any]:
     # Design Agent
     design_agent = LlmAgent(
         name="DesignAgent",
-        model=settings.text_generation_model,
-        instruction=(
+        model=text_model,
+        instruction=with_project_context(
             "You are a professional UI/UX designer and **React architect**. Your task is to create a comprehensive design document that combines visual design specifications with React application architecture.\n\n"
             "**TARGET FRAMEWORK**: React (with Vite, TypeScript, Tailwind CSS, and shadcn/ui)\n\n"
             "Follow these steps:\n"
@@ -118,8 +147,8 @@ def create_specialized_agents() -> Dict[str, Any]:
             "    - Image optimization\n"
             "10. **Illustrate Component Structure**: Use ASCII diagrams to show component hierarchy.\n"
             "11. **Final Review**: Ensure the design is beautiful, modern, feasible for React, and directly addresses the requirements.\n"
-            "12. **Save the Output**: Persist the final document as 'design.md' in the specified project folder.\n\n"
-            f"**File System Path**: {settings.target_folder_absolute_path}"
+            "12. **Save the Output**: Persist the final document as 'design.md' in the specified project folder.\n\n",
+            target_folder,
         ),
         tools=[toolset_file_system],
         input_schema=AgentInputSchemas.DesignInput,
@@ -130,8 +159,8 @@ def create_specialized_agents() -> Dict[str, Any]:
     # Tasks Agent
     tasks_agent = LlmAgent(
         name="TasksAgent",
-        model=settings.text_generation_model,
-        instruction=(
+        model=text_model,
+        instruction=with_project_context(
             "You are a professional **React project planner**. Your job is to break down the design into a list of actionable React development tasks.\n\n"
             "**TARGET FRAMEWORK**: React (with Vite, TypeScript, Tailwind CSS, and shadcn/ui)\n\n"
             "Follow these steps:\n"
@@ -195,8 +224,8 @@ def create_specialized_agents() -> Dict[str, Any]:
             "    - Small enough to complete in one session\n"
             "    - Visually testable in the browser\n"
             "    - Unambiguous with clear acceptance criteria\n"
-            "7.  **Save the Output**: Persist the final list as 'tasks.md' in the specified project folder.\n\n"
-            f"**File System Path**: {settings.target_folder_absolute_path}"
+            "7.  **Save the Output**: Persist the final list as 'tasks.md' in the specified project folder.\n\n",
+            target_folder,
         ),
         tools=[toolset_file_system],
         input_schema=AgentInputSchemas.TasksInput,
@@ -211,7 +240,7 @@ def create_specialized_agents() -> Dict[str, Any]:
     # Responsible Agent (Main Developer)
     responsible_agent = LlmAgent(
     name="ReactDesignExpertAgent",
-    model=settings.advanced_programming_model,
+    model=programming_model,
     instruction=f"""
 ### Role: Professional React UI Designer & Frontend Specialist
 
@@ -237,9 +266,18 @@ Tone: Professional, concise, non-technical where possible. Keep answers short 
 
 If you cannot comply with a request due to security constraints, respond with a one-line refusal and a safe alternative.
 
+{components_section}### Working Efficiently:
+- Read every file you need for a module in one `tashkil-read-files` call instead of one call per file.
+- To find where a component, hook or string is defined or used, call `tashkil-search-code` (literal or regex, optional path glob) instead of opening files to look for it.
+- Apply all writes and edits of a module in one `tashkil-write-files` call; the batch is applied atomically.
+- Calls that do not depend on each other (reads, listings, dependency checks) can be issued together in one step; they run concurrently.
+- To change an existing file, send a unified diff with `tashkil-apply-patch` rather than rewriting the whole file. On a conflict, re-read the reported lines and resend only the failing hunk.
+- After finishing each module, call `tashkil-check-build` and fix any errors it reports before moving on; it only lists errors that are new since the last check.
+- Every write batch and patch returns a `checkpoint` id. If a module goes wrong or the user rejects it, roll back with `tashkil-restore-checkpoint` instead of rewriting the files by hand.
+
 Remember: focus on **what the user will see and experience**, not on internal structure or tooling.
 """,
-    tools=[toolset_file_system],
+    tools=[toolset_file_system, toolset_react_project],
     output_key="development_progress",
 )
 
@@ -252,5 +290,6 @@ Remember: focus on **what the user will see and experience**, not on internal st
         'tasks_agent': tasks_agent,
         'project_workflow': project_workflow,
         'responsible_agent': responsible_agent,
-        'toolset_file_system': toolset_file_system
+        'toolset_file_system': toolset_file_system,
+        'toolset_react_project': toolset_react_project
     }
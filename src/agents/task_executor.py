@@ -0,0 +1,353 @@
+"""Concurrent execution of the tasks list produced by the tasks agent"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Dict, List, Optional, Set
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+
+logger = logging.getLogger(__name__)
+
+PHASE_PATTERN = re.compile(r'^\s*(?:#+\s*|\*\*)\s*Phase\s+(\d+)\s*[:.-]?\s*(.*?)(?:\*\*)?\s*$', re.IGNORECASE)
+TASK_PATTERN = re.compile(r'^\s*[-*]\s*\[[ xX]?\]\s*(.+?)\s*$')
+DEPENDS_PATTERN = re.compile(r'depends on:?\s*(.+?)(?:\)|$)', re.IGNORECASE)
+PHASE_REF_PATTERN = re.compile(r'phase\s+(\d+)', re.IGNORECASE)
+TASK_REF_PATTERN = re.compile(r'\bT(\d+)\b')
+
+WRITE_TOOLS = {
+    'write_file', 'edit_file', 'create_directory', 'move_file',
+    'tashkil-write-files', 'tashkil-apply-patch',
+}
+PATCH_PATH_PATTERN = re.compile(r'^\+\+\+ (?:b/)?(\S+)', re.MULTILINE)
+# ADK's instruction placeholder pattern; one naming a state key is replaced, and fails when the key is missing
+PLACEHOLDER_PATTERN = re.compile(r'{+[^{}]*}+')
+STATE_PREFIXES = ('app:', 'user:', 'temp:')
+
+
+def without_placeholders(text: str) -> str:
+    """
+    Make model-written text safe to embed in an agent instruction
+
+    ADK has no escape for "{name}" in instructions, so the braces of every
+    span it would look up in session state ("{children}", "{user:name?}",
+    "{artifact.x}") are dropped; other braces ("{ a: 1 }") are kept.
+    """
+    def literal(match: re.Match) -> str:
+        name = match.group().strip('{}').strip().rstrip('?')
+        if name.startswith(STATE_PREFIXES):
+            name = name.split(':', 1)[1]
+        if name.isidentifier() or name.startswith('artifact.'):
+            return match.group().strip('{}')
+        return match.group()
+
+    return PLACEHOLDER_PATTERN.sub(literal, text)
+
+
+@dataclass
+class TaskNode:
+    """One checklist item and the tasks it waits for"""
+    id: str
+    phase: int
+    title: str
+    depends_on: Set[str] = field(default_factory=set)
+
+
+def _as_text(tasks_list: Any) -> str:
+    """tasks_list is stored either as raw markdown or as the TasksOutput dict"""
+    if isinstance(tasks_list, dict):
+        return str(tasks_list.get('tasks_doc', ''))
+    return str(tasks_list or '')
+
+
+def parse_task_graph(tasks_list: Any) -> List[TaskNode]:
+    """
+    Parse the tasks document into a dependency DAG
+
+    Tasks in the same phase are independent of each other. A phase waits
+    for the previous phase unless it names its own dependencies
+    ("Depends on: Phase 2"); a single task may add more dependencies on
+    phases or on other tasks (T3).
+
+    Args:
+        tasks_list: Tasks document or TasksOutput dict
+
+    Returns:
+        Task nodes in document order
+    """
+    nodes: List[TaskNode] = []
+    phase_tasks: Dict[int, List[str]] = {}
+    phase_deps: Dict[int, Set[int]] = {}
+    phase_order: List[int] = []
+    task_refs: Dict[str, Set[str]] = {}
+    current_phase = 0
+
+    for line in _as_text(tasks_list).splitlines():
+        phase_match = PHASE_PATTERN.match(line)
+        if phase_match:
+            current_phase = int(phase_match.group(1))
+            if current_phase not in phase_order:
+                phase_order.append(current_phase)
+            phase_deps.setdefault(current_phase, set())
+            continue
+        depends = DEPENDS_PATTERN.search(line)
+        task_match = TASK_PATTERN.match(line)
+        if task_match:
+            title = DEPENDS_PATTERN.sub('', task_match.group(1)).strip(' ()-')
+            node = TaskNode(id=f'T{len(nodes) + 1}', phase=current_phase, title=title)
+            nodes.append(node)
+            phase_tasks.setdefault(current_phase, []).append(node.id)
+            if current_phase not in phase_order:
+                phase_order.append(current_phase)
+            if depends:
+                task_refs[node.id] = {depends.group(1)}
+        elif depends and current_phase not in phase_tasks:
+            # Phase-level dependencies are only read between the heading and its first task
+            phase_deps.setdefault(current_phase, set()).update(
+                int(p) for p in PHASE_REF_PATTERN.findall(depends.group(1))
+            )
+
+    known = {node.id for node in nodes}
+    for node in nodes:
+        deps = phase_deps.get(node.phase) or set()
+        if not deps:
+            position = phase_order.index(node.phase)
+            deps = {phase_order[position - 1]} if position else set()
+        for phase in deps:
+            node.depends_on.update(phase_tasks.get(phase, []))
+        for ref in task_refs.get(node.id, ()):
+            for phase in PHASE_REF_PATTERN.findall(ref):
+                node.depends_on.update(phase_tasks.get(int(phase), []))
+            node.depends_on.update(f'T{n}' for n in TASK_REF_PATTERN.findall(ref) if f'T{n}' in known)
+        node.depends_on.discard(node.id)
+
+    _break_cycles(nodes)
+    return nodes
+
+
+def _break_cycles(nodes: List[TaskNode]):
+    """Drop dependencies on later tasks when they would form a cycle"""
+    order = {node.id: index for index, node in enumerate(nodes)}
+    for node in nodes:
+        node.depends_on = {dep for dep in node.depends_on if order[dep] < order[node.id]}
+
+
+class FileLockRegistry:
+    """
+    Per-file ownership for concurrent workers
+
+    The first task that writes a file owns it until the task finishes;
+    another task writing the same file waits for the owner, and gets a
+    "locked" tool error after timeout seconds so it can move on instead
+    of deadlocking.
+    """
+
+    def __init__(self, root: str, timeout: float = 120.0):
+        self.root = root
+        self.timeout = timeout
+        self._owners: Dict[str, str] = {}
+        self._released: Dict[str, asyncio.Event] = {}
+        self.touched: Dict[str, Set[str]] = {}
+
+    def normalize(self, path: str) -> str:
+        return os.path.normpath(path if os.path.isabs(path) else os.path.join(self.root, path))
+
+    async def acquire(self, paths: List[str], owner: str) -> Optional[str]:
+        """
+        Take ownership of paths
+
+        Returns:
+            None on success, otherwise the path that stayed locked
+        """
+        deadline = time.monotonic() + self.timeout
+        for path in sorted(self.normalize(p) for p in paths):
+            while self._owners.get(path, owner) != owner:
+                event = self._released.setdefault(self._owners[path], asyncio.Event())
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return path
+                try:
+                    await asyncio.wait_for(event.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return path
+            self._owners[path] = owner
+            self.touched.setdefault(owner, set()).add(path)
+        return None
+
+    def release_all(self, owner: str):
+        """Release every file owned by a finished task"""
+        for path in [p for p, o in self._owners.items() if o == owner]:
+            del self._owners[path]
+        event = self._released.pop(owner, None)
+        if event:
+            event.set()
+
+
+def tool_write_paths(tool_name: str, args: Dict[str, Any]) -> List[str]:
+    """Paths a write tool call is about to modify"""
+    if tool_name not in WRITE_TOOLS:
+        return []
+    paths = [args[key] for key in ('path', 'source', 'destination') if isinstance(args.get(key), str)]
+    for operation in args.get('operations') or []:
+        if isinstance(operation, dict) and operation.get('path'):
+            paths.append(operation['path'])
+    if isinstance(args.get('patch'), str):
+        paths.extend(PATCH_PATH_PATTERN.findall(args['patch']))
+    return paths
+
+
+class TaskExecutor:
+    """
+    Runs independent tasks concurrently on a bounded pool of worker agents
+
+    Every task gets its own worker LlmAgent built from the responsible
+    agent (same model, instruction and tools) plus the task description.
+    Workers run on their own branch of the invocation, so their histories
+    do not leak into each other, and their events are merged into one
+    stream as they arrive. As in ADK's ParallelAgent, a worker pauses
+    after each event until it has been yielded, so the Runner has appended
+    it to the session before the worker builds its next model request.
+    """
+
+    def __init__(self, template_agent: LlmAgent, root: str, max_workers: int = 4, lock_timeout: float = 120.0):
+        self.template_agent = template_agent
+        self.root = root
+        self.max_workers = max(1, max_workers)
+        self.locks = FileLockRegistry(root, timeout=lock_timeout)
+
+    def _make_worker(self, task: TaskNode) -> LlmAgent:
+        locks = self.locks
+
+        async def lock_files(tool, args, tool_context):
+            paths = tool_write_paths(tool.name, args)
+            if not paths:
+                return None
+            blocked = await locks.acquire(paths, task.id)
+            if blocked:
+                return {'success': False, 'message': f'{blocked} is being edited by another task, retry later'}
+            return None
+
+        template = self.template_agent
+        return LlmAgent(
+            name=f"TaskWorker_{task.id}",
+            model=template.model,
+            instruction=(
+                f"{template.instruction}\n\n"
+                f"### Current Task ({task.id}, Phase {task.phase})\n"
+                f"{without_placeholders(task.title)}\n\n"
+                "Implement only this task. Other tasks are handled in parallel by other developers, "
+                "so do not touch files unrelated to it. Finish with a one-line summary of the files you changed."
+            ),
+            tools=list(template.tools),
+            before_tool_callback=lock_files,
+        )
+
+    async def run(self, ctx: InvocationContext, tasks: List[TaskNode]) -> AsyncGenerator[Event, None]:
+        """
+        Execute the task DAG and yield merged worker events
+
+        Args:
+            ctx: Invocation context of the orchestrator
+            tasks: Parsed task nodes
+
+        Yields:
+            Worker events, then a summary event carrying task_results
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_workers)
+        status: Dict[str, str] = {}
+        summaries: Dict[str, str] = {}
+        durations: Dict[str, float] = {}
+        done = {task.id: asyncio.Event() for task in tasks}
+        started = time.monotonic()
+
+        async def run_task(task: TaskNode):
+            try:
+                for dep in task.depends_on:
+                    await done[dep].wait()
+                failed = [dep for dep in task.depends_on if status.get(dep) != 'ok']
+                if failed:
+                    status[task.id] = 'blocked'
+                    summaries[task.id] = f"blocked by {', '.join(sorted(failed))}"
+                    return
+                async with semaphore:
+                    worker = self._make_worker(task)
+                    branch = f"{ctx.branch}.{worker.name}" if ctx.branch else worker.name
+                    task_started = time.monotonic()
+                    async for event in worker.run_async(ctx.model_copy(update={'branch': branch})):
+                        if event.is_final_response() and event.content and event.content.parts:
+                            summaries[task.id] = ''.join(p.text or '' for p in event.content.parts).strip()
+                        resume = asyncio.Event()
+                        await queue.put((event, resume))
+                        await resume.wait()
+                    durations[task.id] = round(time.monotonic() - task_started, 2)
+                    status[task.id] = 'ok'
+            except Exception as e:
+                logger.error(f"Task {task.id} failed: {e}")
+                status[task.id] = 'failed'
+                summaries[task.id] = str(e)
+            finally:
+                self.locks.release_all(task.id)
+                done[task.id].set()
+
+        async def run_all():
+            try:
+                await asyncio.gather(*(run_task(task) for task in tasks))
+            finally:
+                await queue.put(None)
+
+        runner = asyncio.create_task(run_all())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, resume = item
+                yield event
+                resume.set()
+        finally:
+            if not runner.done():
+                runner.cancel()
+                await asyncio.gather(runner, return_exceptions=True)
+
+        results = self._verify(tasks, status, summaries, durations)
+        elapsed = round(time.monotonic() - started, 2)
+        ok = sum(1 for r in results.values() if r['status'] == 'ok')
+        logger.info(f"Executed {len(tasks)} tasks in {elapsed}s with {self.max_workers} workers ({ok} ok)")
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=ctx.agent.name,
+            branch=ctx.branch,
+            content=types.Content(role='model', parts=[types.Part(
+                text=f"Completed {ok}/{len(tasks)} tasks in {elapsed}s."
+            )]),
+            actions=EventActions(state_delta={'task_results': results}),
+        )
+
+    def _verify(self, tasks: List[TaskNode], status: Dict[str, str], summaries: Dict[str, str],
+                durations: Dict[str, float]) -> Dict[str, Dict[str, Any]]:
+        """Merge per-task outcomes and check that every written file exists"""
+        results: Dict[str, Dict[str, Any]] = {}
+        for task in tasks:
+            files = sorted(self.locks.touched.get(task.id, ()))
+            missing = [os.path.relpath(p, self.root) for p in files if not os.path.exists(p)]
+            state = status.get(task.id, 'failed')
+            if state == 'ok' and missing:
+                state = 'unverified'
+            results[task.id] = {
+                'title': task.title,
+                'status': state,
+                'summary': summaries.get(task.id, '')[:500],
+                'files': [os.path.relpath(p, self.root) for p in files],
+                'seconds': durations.get(task.id),
+            }
+            if missing:
+                results[task.id]['missing'] = missing
+        return results
@@ -0,0 +1,21 @@
+"""HTTP/WebSocket API server"""
+
+from typing import TYPE_CHECKING
+
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .server import create_app, serve
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "create_app": ".server",
+    "serve": ".server",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "create_app",
+    "serve"
+]
@@ -0,0 +1,362 @@
+"""Asyncio HTTP/WebSocket API in front of run_agent_async"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from ..config import get_settings
+from ..models import rate_limit_metrics
+from ..tools import get_workspace
+from ..services import (
+    PRIORITY_INTERACTIVE, RemoteSessionManager, SchedulerSaturated, SessionManager, StreamChunk, StreamStats, TurnHandle,
+    create_remote_session_manager, create_session_manager, get_memory_accountant, get_scheduler, get_worker_pool,
+    merge_snapshots, prompt_cache_metrics, run_agent_in_worker, stream_chunks
+)
+
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[str, str, Optional[str]], Awaitable[SessionManager]]
+
+
+class CreateSessionRequest(BaseModel):
+    """Body of POST /sessions"""
+    user_id: str = 'api'
+    target_folder: Optional[str] = None
+
+
+class ProjectRequest(BaseModel):
+    """Body of PUT /sessions/{session_id}/project"""
+    target_folder: Optional[str] = None
+
+
+class MessageRequest(BaseModel):
+    """Body of POST /sessions/{session_id}/messages"""
+    message: str
+    # Cancel the session's running turn instead of waiting for it
+    interrupt: bool = False
+
+
+class _Session:
+    """A session manager plus the lock that serializes its turns and the turn running now"""
+
+    def __init__(self, manager: SessionManager, user_id: str):
+        self.manager = manager
+        self.user_id = user_id
+        self.lock = asyncio.Lock()
+        self.turn: Optional[TurnHandle] = None
+        self.last_used = time.monotonic()
+        # Open WebSockets
+        self.connections = 0
+
+    def cancel_turn(self) -> bool:
+        """Cancel the running turn, if any; returns whether there was one"""
+        if self.turn is None or self.turn.finished:
+            return False
+        self.turn.cancel()
+        return True
+
+
+def _chunk_payload(chunk) -> Dict[str, Any]:
+    return {'kind': chunk.kind, 'text': chunk.text, 'name': chunk.name, 'author': chunk.author}
+
+
+def _done_payload(stats: StreamStats) -> Dict[str, Any]:
+    return {
+        'kind': 'done',
+        'queue_wait': stats.queue_wait,
+        'time_to_first_token': stats.time_to_first_token,
+        'duration': stats.duration,
+        'tool_calls': stats.tool_calls,
+    }
+
+
+def create_app(session_factory: Optional[SessionFactory] = None) -> FastAPI:
+    """
+    Build the API application
+
+    Every session keeps its own SessionManager; turns of one session run
+    one at a time while different sessions run concurrently on the same
+    event loop, admitted by the shared TurnScheduler at interactive
+    priority. A saturated scheduler answers 503 with Retry-After. A session
+    can switch to another project of the workspace between turns; toolsets
+    of idle projects are closed by a periodic sweep, and sessions without
+    requests for API_SESSION_IDLE_SECONDS are closed by another.
+
+    Args:
+        session_factory: async (session_id, user_id, target_folder) -> SessionManager,
+            defaults to create_session_manager, or create_remote_session_manager
+            when AGENT_WORKERS runs turns in worker processes (tests pass a
+            stub-model one)
+
+    Returns:
+        FastAPI application
+    """
+    from main import run_agent_async
+
+    workspace = get_workspace()
+    pool = get_worker_pool()
+    session_idle_seconds = get_settings().api_session_idle_seconds
+    sessions: Dict[str, _Session] = {}
+
+    async def close_session(session_id: str) -> bool:
+        """Cancel the session's turn, release its resources and forget it"""
+        session = sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.cancel_turn()
+        await session.manager.cleanup()
+        get_memory_accountant().forget(session.manager.session.id)
+        return True
+
+    async def sweep_idle_projects():
+        while True:
+            await asyncio.sleep(max(workspace.idle_seconds / 4, 1.0))
+            await workspace.evict_idle()
+
+    async def sweep_idle_sessions():
+        while True:
+            await asyncio.sleep(max(session_idle_seconds / 4, 1.0))
+            cutoff = time.monotonic() - session_idle_seconds
+            idle = [
+                session_id for session_id, session in sessions.items()
+                if session.last_used < cutoff and not session.connections and not session.lock.locked()
+            ]
+            for session_id in idle:
+                try:
+                    await close_session(session_id)
+                except Exception as e:
+                    logger.warning(f"Closing idle session {session_id} failed: {e}")
+            if idle:
+                logger.info(f"Closed {len(idle)} idle session(s)")
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI):
+        sweepers = [asyncio.create_task(sweep_idle_projects()), asyncio.create_task(sweep_idle_sessions())]
+        try:
+            yield
+        finally:
+            for sweeper in sweepers:
+                sweeper.cancel()
+            await workspace.close_all()
+            if pool is not None:
+                pool.shutdown()
+
+    app = FastAPI(title='Tashkil Coder API', lifespan=lifespan)
+
+    async def default_factory(session_id: str, user_id: str, target_folder: Optional[str] = None):
+        create = create_remote_session_manager if pool is not None else create_session_manager
+        return await create(session_id=session_id, user_id=user_id, target_folder=target_folder)
+
+    factory = session_factory or default_factory
+    scheduler = get_scheduler()
+
+    def get_session(session_id: str) -> _Session:
+        session = sessions.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail=f'Unknown session {session_id}')
+        session.last_used = time.monotonic()
+        return session
+
+    async def run_turn(session: _Session, message: str, stats: StreamStats, interrupt: bool = False):
+        if interrupt and session.cancel_turn():
+            # Let the old turn unwind (leases, tool commands) before the new one starts
+            await session.turn.wait()
+        async with session.lock:
+            # Only the session's current turn holds a place in the scheduler queue
+            ticket = await scheduler.acquire(session.user_id, PRIORITY_INTERACTIVE)
+            stats.queue_wait = ticket.queue_wait
+            run_agent = run_agent_in_worker if isinstance(session.manager, RemoteSessionManager) else run_agent_async
+            turn = session.turn = TurnHandle(run_agent, message, session.manager)
+            try:
+                # A client that goes away closes this generator, which cancels the turn
+                async for chunk in stream_chunks(turn.events(), stats):
+                    yield chunk
+                if turn.status == 'cancelled':
+                    yield StreamChunk('error', text='Turn cancelled')
+            finally:
+                turn.cancel()
+                session.turn = None
+                session.last_used = time.monotonic()
+                ticket.release()
+
+    def saturated_response(error: SchedulerSaturated) -> JSONResponse:
+        return JSONResponse(
+            status_code=503,
+            content={'detail': str(error), 'queued': error.queued},
+            headers={'Retry-After': str(int(error.retry_after + 0.5))},
+        )
+
+    @app.get('/health')
+    async def health():
+        return {
+            'status': 'ok',
+            'sessions': len(sessions),
+            'scheduler': scheduler.snapshot(),
+            'models': rate_limit_metrics(),
+        }
+
+    @app.get('/metrics')
+    async def metrics():
+        memory = get_memory_accountant().snapshot()
+        if pool is not None:
+            # Turns, and so their sessions' memory, are accounted in the workers
+            memory = merge_snapshots([memory, *await pool.memory_snapshots()])
+        return {
+            'sessions': len(sessions),
+            'scheduler': scheduler.snapshot(),
+            'models': rate_limit_metrics(),
+            'memory': memory,
+            'prompt_cache': prompt_cache_metrics(),
+            'workspace': workspace.snapshot(),
+            'workers': pool.snapshot() if pool is not None else None,
+        }
+
+    @app.get('/projects')
+    async def list_projects():
+        return {'base': workspace.base, 'projects': workspace.list_projects()}
+
+    @app.post('/sessions')
+    async def create_session(request: CreateSessionRequest):
+        session_id = uuid.uuid4().hex
+        try:
+            workspace.resolve(request.target_folder)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        manager = await factory(session_id, request.user_id, request.target_folder)
+        sessions[session_id] = _Session(manager, request.user_id)
+        return {'session_id': session_id, 'user_id': request.user_id, 'target_folder': manager.target_folder}
+
+    @app.put('/sessions/{session_id}/project')
+    async def select_project(session_id: str, request: ProjectRequest):
+        """Point a session at another project; waits for its running turn to finish"""
+        session = get_session(session_id)
+        try:
+            workspace.resolve(request.target_folder)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        async with session.lock:
+            root = session.manager.select_project(request.target_folder)
+        return {'session_id': session_id, 'target_folder': root}
+
+    @app.post('/sessions/{session_id}/cancel')
+    async def cancel_turn(session_id: str):
+        """Stop the session's running turn: model streams, tool calls and their commands"""
+        session = get_session(session_id)
+        return {'session_id': session_id, 'cancelled': session.cancel_turn()}
+
+    @app.delete('/sessions/{session_id}')
+    async def delete_session(session_id: str):
+        if not await close_session(session_id):
+            raise HTTPException(status_code=404, detail=f'Unknown session {session_id}')
+        return {'deleted': session_id}
+
+    @app.post('/sessions/{session_id}/messages')
+    async def post_message(session_id: str, request: MessageRequest):
+        """Submit a message and stream the turn back as server-sent events"""
+        session = get_session(session_id)
+        try:
+            scheduler.check_capacity()
+        except SchedulerSaturated as e:
+            return saturated_response(e)
+
+        async def event_stream():
+            stats = StreamStats()
+            try:
+                # Closed right away when the client disconnects, which cancels the turn
+                async with aclosing(run_turn(session, request.message, stats, request.interrupt)) as chunks:
+                    async for chunk in chunks:
+                        yield f"event: {chunk.kind}\ndata: {json.dumps(_chunk_payload(chunk), ensure_ascii=False)}\n\n"
+                yield f"event: done\ndata: {json.dumps(_done_payload(stats))}\n\n"
+            except Exception as e:
+                logger.error(f"Turn failed for session {session_id}: {e}")
+                yield f"event: error\ndata: {json.dumps({'kind': 'error', 'text': str(e)})}\n\n"
+
+        return StreamingResponse(event_stream(), media_type='text/event-stream')
+
+    @app.websocket('/sessions/{session_id}/ws')
+    async def session_socket(websocket: WebSocket, session_id: str):
+        """
+        Receive {"message": ...} frames and stream every turn back as JSON frames
+
+        Frames are read while a turn streams: a message queues behind the
+        running turn, or replaces it with "interrupt": true, and a frame
+        with only {"interrupt": true} cancels the running turn. A frame
+        that is not a JSON object gets an error frame and the socket stays
+        open. A disconnect cancels the session's turns right away.
+        """
+        session = sessions.get(session_id)
+        if session is None:
+            await websocket.close(code=4404)
+            return
+        await websocket.accept()
+        send_lock = asyncio.Lock()
+        streams: Set[asyncio.Task] = set()
+
+        async def send(payload: Dict[str, Any]):
+            async with send_lock:
+                await websocket.send_json(payload)
+
+        async def stream_turn(message: str, interrupt: bool):
+            stats = StreamStats()
+            try:
+                async with aclosing(run_turn(session, message, stats, interrupt)) as chunks:
+                    async for chunk in chunks:
+                        await send(_chunk_payload(chunk))
+                await send(_done_payload(stats))
+            except WebSocketDisconnect:
+                pass
+            except SchedulerSaturated as e:
+                await send({'kind': 'error', 'text': str(e), 'retry_after': e.retry_after})
+            except Exception as e:
+                logger.error(f"Turn failed for session {session_id}: {e}")
+                await send({'kind': 'error', 'text': str(e)})
+
+        session.connections += 1
+        try:
+            while True:
+                text = await websocket.receive_text()
+                session.last_used = time.monotonic()
+                try:
+                    data = json.loads(text)
+                except json.JSONDecodeError as e:
+                    await send({'kind': 'error', 'text': f'Frame is not valid JSON: {e}'})
+                    continue
+                if not isinstance(data, dict):
+                    await send({'kind': 'error', 'text': 'Frame must be a JSON object'})
+                    continue
+                if data.get('message') and not isinstance(data['message'], str):
+                    await send({'kind': 'error', 'text': 'Frame message must be a string'})
+                elif data.get('message'):
+                    task = asyncio.create_task(stream_turn(data['message'], data.get('interrupt', False)))
+                    streams.add(task)
+                    task.add_done_callback(streams.discard)
+                elif data.get('interrupt'):
+                    await send({'kind': 'cancelled', 'cancelled': session.cancel_turn()})
+                else:
+                    await send({'kind': 'error', 'text': 'Frame has no message'})
+        except WebSocketDisconnect:
+            logger.info(f"WebSocket closed for session {session_id}")
+        finally:
+            session.connections -= 1
+            # Closing the turn streams cancels their turns
+            for task in streams:
+                task.cancel()
+            await asyncio.gather(*streams, return_exceptions=True)
+
+    return app
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000, session_factory: Optional[SessionFactory] = None):
+    """Run the API server with uvicorn on a single event loop"""
+    import uvicorn
+
+    uvicorn.run(create_app(session_factory), host=host, port=port, log_level='info')
@@ -1,5 +1,21 @@
 """Configuration module for Tashkil Coder"""
 
-from .settings import Settings, get_settings
+from typing import TYPE_CHECKING
 
-__all__ = ["Settings", "get_settings"]
\ No newline at end of file
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .settings import Settings, get_settings
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "Settings": ".settings",
+    "get_settings": ".settings",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "Settings",
+    "get_settings"
+]
@@ -17,10 +17,28 @@ class Settings(BaseModel):
     model: str = os.getenv('MODEL', 'gemini-1.5-flash')
     text_generation_model: str = os.getenv('TEXT_GENERATION_MODEL', 'gemini-1.5-flash')
     advanced_programming_model: str = os.getenv('ADVANCED_PROGRAMMING_MODEL', 'gemini-1.5-pro')
+    
+    # Client-side model rate limits; entries in the models config file with
+    # "rpm", "tpm" or "max_concurrency" override these per model (0 disables a bucket)
+    models_config_path: str = os.getenv('MODELS_CONFIG_PATH', './models.json')
+    rate_limit_enabled: bool = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    model_rpm: float = float(os.getenv('MODEL_RPM', '60'))
+    model_tpm: float = float(os.getenv('MODEL_TPM', '1000000'))
+    model_max_concurrency: int = int(os.getenv('MODEL_MAX_CONCURRENCY', '4'))
+    turn_timeout: float = float(os.getenv('TURN_TIMEOUT', '900'))
+    
+    # Provider context caching of static prompt prefixes ("off", "implicit" measures
+    # provider cache hits only, "explicit" also creates Gemini cached contents)
+    context_cache: str = os.getenv('CONTEXT_CACHE', 'implicit')
+    context_cache_ttl: int = int(os.getenv('CONTEXT_CACHE_TTL', '3600'))
+    context_cache_min_tokens: int = int(os.getenv('CONTEXT_CACHE_MIN_TOKENS', '4096'))
+    
     # Paths
     target_folder_path: str = os.getenv('TARGET_FOLDER_PATH', './output')
     react_manage_project_mcp_path: str = os.getenv('REACT_MANAGE_PROJECT_MCP_PATH', './tools.py')
     parent_project_path: str = os.getenv('PARENT_PROJECT_PATH', './react_parent_project/tachkill-project-template')
+    # Manifest of the template's UI components, rebuilt when the template's hash changes
+    component_catalog_path: str = os.getenv('COMPONENT_CATALOG_PATH', './.tashkil/component_catalog.json')
     
     # Session Configuration
     app_name: str = "tashkil_coder"
@@ -31,9 +49,56 @@ class Settings(BaseModel):
     log_level: str = os.getenv('LOG_LEVEL', 'INFO')
     log_file: str = os.getenv('LOG_FILE', 'logs.log')
     
+    # Streaming (token-level partial responses to the UI)
+    stream_responses: bool = os.getenv('STREAM_RESPONSES', 'true').lower() in ('1', 'true', 'yes')
+    
+    # Chat UI (newest messages rendered in full, transcripts kept per browser session)
+    chat_history_window: int = int(os.getenv('CHAT_HISTORY_WINDOW', '20'))
+    chat_history_max_messages: int = int(os.getenv('CHAT_HISTORY_MAX_MESSAGES', '1000'))
+    chat_max_transcripts: int = int(os.getenv('CHAT_MAX_TRANSCRIPTS', '256'))
+    chat_transcript_idle_seconds: float = float(os.getenv('CHAT_TRANSCRIPT_IDLE_SECONDS', '1800'))
+    
     # MCP Configuration
     mcp_timeout: int = int(os.getenv('MCP_TIMEOUT', '120'))
     
+    # Workspace (per-project toolsets and dev servers are closed after this long idle)
+    workspace_idle_seconds: float = float(os.getenv('WORKSPACE_IDLE_SECONDS', '900'))
+    dev_server_port: int = int(os.getenv('DEV_SERVER_PORT', '8080'))
+    
+    # API sessions without requests or open WebSockets for this long are closed
+    api_session_idle_seconds: float = float(os.getenv('API_SESSION_IDLE_SECONDS', '3600'))
+    
+    # Agent worker processes (0 runs turns in the UI process) and the session
+    # store they share ("sqlite:///sessions.db" etc.; empty keeps sessions in memory)
+    agent_workers: int = int(os.getenv('AGENT_WORKERS', '0'))
+    session_db_url: str = os.getenv('SESSION_DB_URL', '')
+    
+    # Append-only event log per session, indexed by turn (empty disables);
+    # buffered records are written every flush interval and fsynced every fsync interval
+    event_log_dir: str = os.getenv('EVENT_LOG_DIR', '')
+    event_log_flush_interval: float = float(os.getenv('EVENT_LOG_FLUSH_INTERVAL', '0.2'))
+    event_log_fsync_interval: float = float(os.getenv('EVENT_LOG_FSYNC_INTERVAL', '1.0'))
+    
+    # Turn scheduler (worker slots shared by all sessions, waiting turns before rejecting)
+    scheduler_workers: int = int(os.getenv('SCHEDULER_WORKERS', '4'))
+    scheduler_max_queue: int = int(os.getenv('SCHEDULER_MAX_QUEUE', '64'))
+    
+    # Memory accounting (older session events spill to disk above the caps)
+    session_memory_cap_mb: float = float(os.getenv('SESSION_MEMORY_CAP_MB', '64'))
+    global_memory_cap_mb: float = float(os.getenv('GLOBAL_MEMORY_CAP_MB', '1024'))
+    memory_keep_events: int = int(os.getenv('MEMORY_KEEP_EVENTS', '40'))
+    memory_spill_dir: str = os.getenv('MEMORY_SPILL_DIR', './session_spill')
+    memory_tracing: bool = os.getenv('MEMORY_TRACING', 'false').lower() in ('1', 'true', 'yes')
+    memory_sample_interval: float = float(os.getenv('MEMORY_SAMPLE_INTERVAL', '60'))
+    
+    # Parallel task execution (0 disables the task executor)
+    parallel_task_workers: int = int(os.getenv('PARALLEL_TASK_WORKERS', '0'))
+    task_lock_timeout: float = float(os.getenv('TASK_LOCK_TIMEOUT', '120'))
+    
+    # Record/replay ("record", "replay", "replay-timed", "replay-model"; empty disables)
+    cassette_mode: str = os.getenv('CASSETTE_MODE', '')
+    cassette_path: str = os.getenv('CASSETTE_PATH', 'session.cassette.jsonl.gz')
+    
     def __post_init__(self):
         """Set up environment variables after initialization"""
         if self.gemini_api_key:
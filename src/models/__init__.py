@@ -0,0 +1,35 @@
+"""Model backends"""
+
+from typing import TYPE_CHECKING
+
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .stub_llm import StubLlm
+    from .rate_limiter import (
+        RateLimitedLlm, RateLimitTimeout, create_rate_limited_model, get_model_limiter,
+        rate_limit_metrics, set_turn_deadline
+    )
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "StubLlm": ".stub_llm",
+    "RateLimitedLlm": ".rate_limiter",
+    "RateLimitTimeout": ".rate_limiter",
+    "create_rate_limited_model": ".rate_limiter",
+    "get_model_limiter": ".rate_limiter",
+    "rate_limit_metrics": ".rate_limiter",
+    "set_turn_deadline": ".rate_limiter",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "StubLlm",
+    "RateLimitedLlm",
+    "RateLimitTimeout",
+    "create_rate_limited_model",
+    "get_model_limiter",
+    "rate_limit_metrics",
+    "set_turn_deadline"
+]
@@ -0,0 +1,364 @@
+"""Client-side rate limiting and adaptive concurrency for model calls"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Deque, Dict, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+from ..config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Absolute time.monotonic() by which the current turn must finish
+_turn_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar('turn_deadline', default=None)
+
+
+class RateLimitTimeout(TimeoutError):
+    """Raised when a model call cannot be admitted or retried before the turn deadline"""
+
+
+def set_turn_deadline(seconds: Optional[float]) -> contextvars.Token:
+    """
+    Set the deadline of the current turn for model calls made from this context
+
+    Args:
+        seconds: Seconds from now, None or 0 for no deadline
+
+    Returns:
+        Token for resetting the previous deadline
+    """
+    return _turn_deadline.set(time.monotonic() + seconds if seconds else None)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the turn deadline, None without a deadline"""
+    deadline = _turn_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+# Status names and exception classes providers use for "slow down"
+THROTTLING_STATUSES = {'RESOURCE_EXHAUSTED', 'TOO_MANY_REQUESTS'}
+THROTTLING_ERRORS = {'RateLimitError', 'ResourceExhausted', 'TooManyRequests'}
+
+
+def is_throttling_error(error: BaseException) -> bool:
+    """
+    Whether a provider error means "slow down" (HTTP 429 / resource exhausted)
+
+    Only the status code, status name or exception type is checked: a
+    message that merely mentions 429 or a quota is not a throttle.
+    """
+    response = getattr(error, 'response', None)
+    for code in (getattr(error, 'code', None), getattr(error, 'status_code', None),
+                 getattr(response, 'status_code', None)):
+        if code == 429:
+            return True
+    status = getattr(error, 'status', None)
+    if isinstance(status, str) and status.upper() in THROTTLING_STATUSES:
+        return True
+    return any(cls.__name__ in THROTTLING_ERRORS for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """
+    Refills `rate` units per minute up to `capacity`; taking more than is left waits
+
+    Limiters are shared by every thread and event loop of the process (the
+    Streamlit app runs each session on its own), so the counters are
+    guarded by a threading lock and waiting happens outside of it: a take
+    reserves its units at once, letting the balance go negative, and
+    sleeps until the refill has covered the reservation.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until `amount` units are available"""
+        with self._lock:
+            self._refill()
+            return self._delay(min(amount, self.capacity))
+
+    def _delay(self, amount: float) -> float:
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    async def take(self, amount: float) -> float:
+        """
+        Take `amount` units, waiting for the refill if needed
+
+        Raises:
+            RateLimitTimeout: If the wait would pass the turn deadline
+
+        Returns:
+            Seconds waited
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            delay = self._delay(amount)
+            left = remaining_time()
+            if delay and left is not None and delay > left:
+                raise RateLimitTimeout(f"Rate limit wait of {delay:.1f}s exceeds the turn deadline")
+            self.tokens -= amount
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                self.settle(-amount)
+                raise
+        return delay
+
+    def settle(self, extra: float):
+        """Charge (or refund) the difference between estimated and actual usage"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - extra)
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency cap that halves on throttling and grows back by one slot
+    after `limit` consecutive successes (additive increase, multiplicative decrease)
+
+    Callers may run on different threads and event loops: the counters are
+    guarded by a threading lock and each waiter parks on a future of its
+    own loop, which a release wakes thread-safely.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.active = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    async def acquire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.active < self.limit:
+                    self.active += 1
+                    return
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await waiter[1]
+            finally:
+                with self._lock:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(self, throttled: bool):
+        with self._lock:
+            self.active -= 1
+            if throttled:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+            waiters, self._waiters = self._waiters, deque()
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, future)
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ModelLimiter:
+    """Request/token buckets, concurrency cap and metrics of one model"""
+
+    def __init__(self, model: str, rpm: float, tpm: float, max_concurrency: int):
+        self.model = model
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.metrics = {'calls': 0, 'throttled': 0, 'retries': 0, 'wait_seconds': 0.0, 'tokens': 0}
+        self._metrics_lock = threading.Lock()
+
+    def count(self, name: str, value: float = 1):
+        """Add to a metric; calls from several threads update the same limiter"""
+        with self._metrics_lock:
+            self.metrics[name] += value
+
+    async def admit(self, estimated_tokens: int) -> float:
+        """Wait for a request slot, token budget and concurrency slot; returns seconds waited"""
+        started = time.monotonic()
+        if self.requests:
+            await self.requests.take(1)
+        if self.tokens:
+            await self.tokens.take(estimated_tokens)
+        await self.concurrency.acquire()
+        waited = time.monotonic() - started
+        self.count('wait_seconds', waited)
+        return waited
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        return {
+            **metrics,
+            'wait_seconds': round(metrics['wait_seconds'], 3),
+            'concurrency_limit': self.concurrency.limit,
+            'active': self.concurrency.active,
+        }
+
+
+def _model_config(model: str) -> Dict[str, Any]:
+    """Limits of a model from the models config file (rpm/tpm/max_concurrency keys), if listed"""
+    path = get_settings().models_config_path
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    for entry in entries:
+        if entry.get('model') == model:
+            return entry
+    return {}
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_model_limiter(model: str) -> ModelLimiter:
+    """
+    Get the limiter of a model (one per model name per process)
+
+    Limits come from the model's entry in the models config file when it
+    has "rpm", "tpm" or "max_concurrency", otherwise from settings.
+
+    Args:
+        model: Model name
+
+    Returns:
+        Shared ModelLimiter
+    """
+    limiter = _limiters.get(model)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model)
+            if limiter is None:
+                settings = get_settings()
+                config = _model_config(model)
+                limiter = ModelLimiter(
+                    model,
+                    rpm=float(config.get('rpm', settings.model_rpm)),
+                    tpm=float(config.get('tpm', settings.model_tpm)),
+                    max_concurrency=int(config.get('max_concurrency', settings.model_max_concurrency)),
+                )
+                _limiters[model] = limiter
+    return limiter
+
+
+def rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """Throttle, retry and wait metrics of every model used so far"""
+    return {model: limiter.snapshot() for model, limiter in list(_limiters.items())}
+
+
+def _estimate_tokens(llm_request: LlmRequest) -> int:
+    size = sum(len(content.model_dump_json(exclude_none=True)) for content in llm_request.contents or [])
+    return max(1, size // 4)
+
+
+class RateLimitedLlm(BaseLlm):
+    """
+    Wraps a model so every call passes the model's limiter
+
+    Throttling errors raised before any output was produced are retried
+    with full-jitter exponential backoff, as long as the retry still fits
+    in the turn deadline; each throttle also halves the model's
+    concurrency cap.
+    """
+
+    inner: BaseLlm
+    max_retries: int = 4
+    backoff_base: float = 1.0
+    backoff_cap: float = 30.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        limiter = get_model_limiter(self.model)
+        estimated = _estimate_tokens(llm_request)
+        attempt = 0
+        while True:
+            await limiter.admit(estimated)
+            limiter.count('calls')
+            produced = False
+            throttled = False
+            try:
+                async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                    produced = True
+                    usage = response.usage_metadata
+                    if not response.partial and usage and usage.total_token_count:
+                        limiter.count('tokens', usage.total_token_count)
+                        if limiter.tokens:
+                            limiter.tokens.settle(usage.total_token_count - estimated)
+                    yield response
+                return
+            except Exception as e:
+                if produced or not is_throttling_error(e):
+                    raise
+                throttled = True
+                limiter.count('throttled')
+                attempt += 1
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                left = remaining_time()
+                if attempt > self.max_retries or (left is not None and delay > left):
+                    raise
+                limiter.count('retries')
+                logger.warning(f"{self.model} throttled, retry {attempt} in {delay:.1f}s")
+            finally:
+                limiter.concurrency.release(throttled)
+            await asyncio.sleep(delay)
+
+    def connect(self, llm_request: LlmRequest):
+        return self.inner.connect(llm_request)
+
+
+def create_rate_limited_model(model: str) -> BaseLlm:
+    """
+    Build the model instance agents use, rate limited unless disabled in settings
+
+    Args:
+        model: Model name as accepted by LlmAgent
+
+    Returns:
+        RateLimitedLlm wrapping the registered backend, or the plain backend
+    """
+    inner = LLMRegistry.new_llm(model)
+    if not get_settings().rate_limit_enabled:
+        return inner
+    return RateLimitedLlm(model=model, inner=inner)
@@ -0,0 +1,114 @@
+"""Deterministic local model backend for offline benchmarks and tests"""
+
+import asyncio
+import json
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+
+
+class StubLlm(BaseLlm):
+    """
+    Scripted model that never touches the network
+
+    The script is a list of steps, each either {"tool": name, "args": {...}}
+    (one function call), {"tools": [{"tool": ..., "args": ...}, ...]} (several
+    calls in one response) or {"text": "..."} (final answer). The step is
+    chosen from the number of model turns since the last user message, so
+    every user turn replays the script from the start. Once the script is
+    exhausted the model echoes the user message.
+    """
+
+    script: List[Dict[str, Any]] = []
+    latency: float = 0.0
+    chunk_size: int = 4
+
+    @classmethod
+    def supported_models(cls) -> List[str]:
+        return [r'stub/.*']
+
+    @staticmethod
+    def _turn_state(llm_request: LlmRequest):
+        """Model turns since the last user text message, and that message"""
+        model_turns = 0
+        user_text = ''
+        for content in reversed(llm_request.contents or []):
+            parts = content.parts or []
+            if content.role == 'user' and any(part.text for part in parts):
+                user_text = ''.join(part.text or '' for part in parts)
+                break
+            if content.role == 'model':
+                model_turns += 1
+        return model_turns, user_text
+
+    def _step(self, llm_request: LlmRequest) -> Dict[str, Any]:
+        model_turns, user_text = self._turn_state(llm_request)
+        if model_turns < len(self.script):
+            return self.script[model_turns]
+        return {'text': f'Done: {user_text[:200]}'}
+
+    @staticmethod
+    def _prompt_chars(llm_request: LlmRequest) -> int:
+        """Rough prompt size from the parts themselves, without serializing the history"""
+        chars = 0
+        for content in llm_request.contents or []:
+            for part in content.parts or []:
+                if part.text:
+                    chars += len(part.text)
+                elif part.function_call:
+                    chars += len(part.function_call.name or '') + len(str(part.function_call.args or ''))
+                elif part.function_response:
+                    chars += len(part.function_response.name or '') + len(str(part.function_response.response or ''))
+        return chars
+
+    @classmethod
+    def _usage(cls, llm_request: LlmRequest, output: str) -> types.GenerateContentResponseUsageMetadata:
+        prompt_tokens = cls._prompt_chars(llm_request) // 4
+        output_tokens = len(output) // 4
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        step = self._step(llm_request)
+
+        calls = step.get('tools') or ([step] if 'tool' in step else [])
+        if calls:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=call['tool'], args=call.get('args', {})))
+                for call in calls
+            ]
+            yield LlmResponse(
+                content=types.Content(role='model', parts=parts),
+                usage_metadata=self._usage(llm_request, json.dumps(calls)),
+            )
+            return
+
+        text = step.get('text', '')
+        if stream:
+            words = text.split(' ')
+            for start in range(0, len(words), self.chunk_size):
+                chunk = ' '.join(words[start:start + self.chunk_size])
+                if start + self.chunk_size < len(words):
+                    chunk += ' '
+                yield LlmResponse(
+                    content=types.Content(role='model', parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+        yield LlmResponse(
+            content=types.Content(role='model', parts=[types.Part(text=text)]),
+            usage_metadata=self._usage(llm_request, text),
+        )
+
+
+LLMRegistry.register(StubLlm)
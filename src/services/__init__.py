@@ -1,5 +1,104 @@
 """Services module for session and artifact management"""
 
-from .session_service import SessionManager, create_session_manager
+from typing import TYPE_CHECKING
 
-__all__ = ["SessionManager", "create_session_manager"]
\ No newline at end of file
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .session_service import SessionManager, create_session_manager, get_runner_plugins
+    from .batch_runner import run_batch
+    from .recorder import CassettePlayer, CassetteRecorder, create_cassette_plugin
+    from .streaming import StreamChunk, StreamStats, stream_chunks
+    from .turns import TurnHandle, TurnTimeout
+    from .transcript import Transcript, TranscriptStore, get_transcript_store
+    from .workers import (
+        AgentWorkerPool, RemoteSessionManager, WorkerError, create_remote_session_manager, get_worker_pool,
+        run_agent_in_worker
+    )
+    from .event_log import EventLogPlugin, EventLogReader, EventLogWriter, get_event_log, restore_session
+    from .memory import MemoryAccountant, get_memory_accountant, merge_snapshots
+    from .prompt_cache import PromptCachePlugin, prompt_cache_metrics
+    from .scheduler import (
+        PRIORITY_BATCH, PRIORITY_INTERACTIVE, SchedulerSaturated, TurnScheduler, get_scheduler
+    )
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "SessionManager": ".session_service",
+    "create_session_manager": ".session_service",
+    "get_runner_plugins": ".session_service",
+    "run_batch": ".batch_runner",
+    "CassettePlayer": ".recorder",
+    "CassetteRecorder": ".recorder",
+    "create_cassette_plugin": ".recorder",
+    "StreamChunk": ".streaming",
+    "StreamStats": ".streaming",
+    "stream_chunks": ".streaming",
+    "TurnHandle": ".turns",
+    "TurnTimeout": ".turns",
+    "Transcript": ".transcript",
+    "TranscriptStore": ".transcript",
+    "get_transcript_store": ".transcript",
+    "AgentWorkerPool": ".workers",
+    "RemoteSessionManager": ".workers",
+    "WorkerError": ".workers",
+    "create_remote_session_manager": ".workers",
+    "get_worker_pool": ".workers",
+    "run_agent_in_worker": ".workers",
+    "EventLogPlugin": ".event_log",
+    "EventLogReader": ".event_log",
+    "EventLogWriter": ".event_log",
+    "get_event_log": ".event_log",
+    "restore_session": ".event_log",
+    "MemoryAccountant": ".memory",
+    "get_memory_accountant": ".memory",
+    "merge_snapshots": ".memory",
+    "PromptCachePlugin": ".prompt_cache",
+    "prompt_cache_metrics": ".prompt_cache",
+    "PRIORITY_BATCH": ".scheduler",
+    "PRIORITY_INTERACTIVE": ".scheduler",
+    "SchedulerSaturated": ".scheduler",
+    "TurnScheduler": ".scheduler",
+    "get_scheduler": ".scheduler",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "SessionManager",
+    "create_session_manager",
+    "get_runner_plugins",
+    "run_batch",
+    "CassettePlayer",
+    "CassetteRecorder",
+    "create_cassette_plugin",
+    "StreamChunk",
+    "StreamStats",
+    "stream_chunks",
+    "TurnHandle",
+    "TurnTimeout",
+    "Transcript",
+    "TranscriptStore",
+    "get_transcript_store",
+    "AgentWorkerPool",
+    "RemoteSessionManager",
+    "WorkerError",
+    "create_remote_session_manager",
+    "get_worker_pool",
+    "run_agent_in_worker",
+    "EventLogPlugin",
+    "EventLogReader",
+    "EventLogWriter",
+    "get_event_log",
+    "restore_session",
+    "MemoryAccountant",
+    "get_memory_accountant",
+    "merge_snapshots",
+    "PromptCachePlugin",
+    "prompt_cache_metrics",
+    "PRIORITY_BATCH",
+    "PRIORITY_INTERACTIVE",
+    "SchedulerSaturated",
+    "TurnScheduler",
+    "get_scheduler"
+]
@@ -0,0 +1,242 @@
+"""Headless batch processing of JSONL requests"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, Callable, Dict, Iterator, Optional, Set
+
+from .memory import get_memory_accountant
+from .scheduler import PRIORITY_BATCH, get_scheduler
+from .session_service import create_session_manager
+from .turns import TurnHandle
+from ..tools import get_workspace
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_requests(input_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream requests from a JSONL file
+
+    Each line needs an id ("request_id" or "id") and a prompt, given either
+    as "query"/"prompt" or as "title" and "body". A line that is not a JSON
+    object or has no prompt is yielded with an "error" key instead of
+    stopping the batch, so it is reported as a failed result.
+
+    Args:
+        input_path: Path to the JSONL file
+
+    Yields:
+        Request dicts with request_id and query keys (and error for invalid lines)
+    """
+    with open(input_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {'request_id': f'line-{line_number}', 'query': '', 'error': f'Invalid JSON: {e}'}
+                continue
+            if not isinstance(data, dict):
+                yield {'request_id': f'line-{line_number}', 'query': '', 'error': 'Line is not a JSON object'}
+                continue
+            request_id = str(data.get('request_id') or data.get('id') or f'line-{line_number}')
+            query = data.get('query') or data.get('prompt')
+            if not query:
+                query = '\n\n'.join(str(part) for part in (data.get('title'), data.get('body')) if part)
+            if not query:
+                yield {'request_id': request_id, 'query': '', 'error': 'Request has no query, prompt, title or body'}
+                continue
+            yield {'request_id': request_id, 'query': str(query)}
+
+
+def load_finished(output_path: str, retry_failed: bool = False) -> Set[str]:
+    """
+    Read ids that already have a result, so an interrupted run can resume
+
+    Args:
+        output_path: Results JSONL file
+        retry_failed: Only count successful results as finished
+
+    Returns:
+        Request ids to skip
+    """
+    finished: Set[str] = set()
+    if not os.path.exists(output_path):
+        return finished
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut off by the interruption
+                continue
+            if result.get('status') == 'ok' or not retry_failed:
+                finished.add(result.get('request_id'))
+    return finished
+
+
+def _folder_name(request_id: str) -> str:
+    """Readable folder name of a request; the hash keeps ids like "a/b" and "a_b" apart"""
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', request_id).strip('._') or 'request'
+    return f"{slug}-{hashlib.sha256(request_id.encode('utf-8')).hexdigest()[:8]}"
+
+
+async def _process(
+    request: Dict[str, Any],
+    run_agent: Callable[..., AsyncGenerator],
+    output_root: str
+) -> Dict[str, Any]:
+    """Run one request in its own session and project folder"""
+    request_id = request['request_id']
+    if request.get('error'):
+        logger.error(f"Batch request {request_id} is invalid: {request['error']}")
+        return {
+            'request_id': request_id,
+            'output_folder': None,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'status': 'failed',
+            'error': request['error'],
+            'events': 0,
+            'duration_seconds': 0.0,
+        }
+    name = _folder_name(request_id)
+    folder = os.path.abspath(os.path.join(output_root, name))
+    os.makedirs(folder, exist_ok=True)
+
+    started = time.perf_counter()
+    result: Dict[str, Any] = {
+        'request_id': request_id,
+        'output_folder': folder,
+        'started_at': datetime.now(timezone.utc).isoformat(),
+    }
+    events = 0
+    first_event = None
+    final_text = ''
+    ticket = None
+    try:
+        session_manager = await create_session_manager(
+            session_id=f'batch-{name}',
+            user_id='batch',
+            target_folder=folder
+        )
+        # Batch turns yield to interactive ones and wait instead of being rejected
+        ticket = await get_scheduler().acquire('batch', PRIORITY_BATCH, wait_for_space=True)
+        # Runs under the turn deadline; an interrupted batch cancels the turn and its npm commands
+        turn = TurnHandle(run_agent, request['query'], session_manager, streaming=False)
+        async for event in turn.events():
+            events += 1
+            if first_event is None:
+                first_event = time.perf_counter() - started
+            if event.is_final_response() and event.content and event.content.parts:
+                final_text = ''.join(part.text or '' for part in event.content.parts)
+        result.update(status='ok', response=final_text)
+    except Exception as e:
+        logger.error(f"Batch request {request_id} failed: {e}")
+        result.update(status='failed', error=f'{type(e).__name__}: {e}')
+    finally:
+        if ticket is not None:
+            ticket.release()
+        get_memory_accountant().forget(f'batch-{name}')
+        # Every request has its own project folder; its MCP servers are not needed again
+        try:
+            await get_workspace().evict(get_workspace().resolve(folder))
+        except Exception as e:
+            logger.error(f"Batch request {request_id}: could not release project {folder}: {e}")
+
+    result.update(
+        events=events,
+        queue_wait_seconds=None if ticket is None or ticket.queue_wait is None else round(ticket.queue_wait, 3),
+        first_event_seconds=None if first_event is None else round(first_event, 3),
+        duration_seconds=round(time.perf_counter() - started, 3),
+    )
+    return result
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    run_agent: Callable[..., AsyncGenerator],
+    concurrency: int = 2,
+    output_root: str = './batch_output',
+    retry_failed: bool = False,
+    limit: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Process a JSONL file of requests with bounded concurrency
+
+    Requests are read lazily, each one runs with its own session and
+    output folder, and every result is appended to output_path as soon as
+    it finishes. Requests already present in output_path are skipped.
+
+    Args:
+        input_path: Requests JSONL file
+        output_path: Results JSONL file (appended to)
+        run_agent: Async generator function, normally main.run_agent_async
+        concurrency: Maximum requests in flight
+        output_root: Parent folder of the per-request project folders
+        retry_failed: Re-run requests whose previous result failed
+        limit: Stop after this many new requests
+
+    Returns:
+        Counters of processed, failed and skipped requests
+    """
+    finished = load_finished(output_path, retry_failed)
+    os.makedirs(output_root, exist_ok=True)
+    get_workspace().add_root(output_root)
+    counters = {'processed': 0, 'failed': 0, 'skipped': 0}
+    requests = iter_requests(input_path)
+    write_lock = asyncio.Lock()
+    source_lock = asyncio.Lock()
+    started = time.perf_counter()
+    taken = 0
+
+    async def next_request() -> Optional[Dict[str, Any]]:
+        nonlocal taken
+        async with source_lock:
+            for request in requests:
+                if limit is not None and taken >= limit:
+                    return None
+                if request['request_id'] in finished:
+                    counters['skipped'] += 1
+                    continue
+                finished.add(request['request_id'])
+                taken += 1
+                return request
+            return None
+
+    # Terminate a line left half-written by an interrupted run
+    if os.path.exists(output_path) and os.path.getsize(output_path):
+        with open(output_path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+
+    with open(output_path, 'a', encoding='utf-8') as output:
+        async def worker():
+            while True:
+                request = await next_request()
+                if request is None:
+                    return
+                result = await _process(request, run_agent, output_root)
+                async with write_lock:
+                    output.write(json.dumps(result, ensure_ascii=False) + '\n')
+                    output.flush()
+                    counters['processed' if result['status'] == 'ok' else 'failed'] += 1
+                logger.info(
+                    f"[{result['request_id']}] {result['status']} in {result['duration_seconds']}s "
+                    f"({counters['processed'] + counters['failed']} done)"
+                )
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    counters['seconds'] = round(time.perf_counter() - started, 1)
+    return counters
@@ -0,0 +1,551 @@
+"""Append-only per-session event logs, indexed by turn"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.plugins.base_plugin import BasePlugin
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TKEL\x01\n'
+LOG_SUFFIX = '.evlog'
+INDEX_SUFFIX = '.evidx'
+
+# Record: payload length, kind (| FLAG_ZLIB), turn, crc32 of the first three fields and the payload
+RECORD = struct.Struct('<IBII')
+RECORD_PREFIX = struct.Struct('<IBI')
+# Index entry: turn, first and end offset in the log, record count, start time, completed
+INDEX_ENTRY = struct.Struct('<IQQIdB')
+
+TURN_START = 1
+EVENT = 2
+TURN_END = 3
+KIND_NAMES = {TURN_START: 'turn_start', EVENT: 'event', TURN_END: 'turn_end'}
+FLAG_ZLIB = 0x80
+COMPRESS_MIN_BYTES = 512
+MAX_RECORD_BYTES = 64 * 1024 * 1024
+IDLE_CLOSE_SECONDS = 60.0
+
+
+def _file_name(session_id: str) -> str:
+    return re.sub(r'[^\w.-]', '_', session_id)
+
+
+def log_path(directory: str, session_id: str) -> str:
+    """Log file of a session"""
+    return os.path.join(directory, _file_name(session_id) + LOG_SUFFIX)
+
+
+def encode_record(kind: int, turn: int, payload: bytes) -> bytes:
+    """
+    Frame one record, compressing larger payloads
+
+    Args:
+        kind: TURN_START, EVENT or TURN_END
+        turn: Turn number the record belongs to
+        payload: Compact JSON
+
+    Returns:
+        Header and payload, ready to append
+    """
+    if len(payload) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(payload, 1)
+        if len(compressed) < len(payload):
+            payload = compressed
+            kind |= FLAG_ZLIB
+    prefix = RECORD_PREFIX.pack(len(payload), kind, turn)
+    return RECORD.pack(len(payload), kind, turn, zlib.crc32(payload, zlib.crc32(prefix))) + payload
+
+
+def scan_records(f, start: int, end: Optional[int] = None) -> Iterator[Tuple[int, int, int, int, bytes]]:
+    """
+    Read framed records from an open log, stopping at a torn or corrupt record
+
+    Args:
+        f: Log opened in binary mode
+        start: Offset of the first record
+        end: Stop before this offset (default: end of file)
+
+    Yields:
+        (offset, end offset, kind, turn, decompressed payload)
+    """
+    offset = start
+    f.seek(offset)
+    while end is None or offset < end:
+        header = f.read(RECORD.size)
+        if len(header) < RECORD.size:
+            return
+        length, kind, turn, crc = RECORD.unpack(header)
+        if length > MAX_RECORD_BYTES:
+            return
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload, zlib.crc32(header[:RECORD_PREFIX.size])) != crc:
+            return
+        if kind & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        next_offset = offset + RECORD.size + length
+        yield offset, next_offset, kind & ~FLAG_ZLIB, turn, payload
+        offset = next_offset
+
+
+def _read_index(index_path: str, log_size: int) -> List[Tuple]:
+    """
+    Index entries up to the first one that points past the end of the log
+
+    Log and index are fsynced together, so after a crash the index can
+    reach further than the log; that entry and any later ones are dropped
+    and their turns found again by scanning the log.
+    """
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return []
+    entries = []
+    for i in range(0, len(data) - len(data) % INDEX_ENTRY.size, INDEX_ENTRY.size):
+        entry = INDEX_ENTRY.unpack_from(data, i)
+        if entry[2] > log_size:
+            break
+        entries.append(entry)
+    return entries
+
+
+class _SessionLog:
+    """Write side of one session's log; only touched by the writer thread"""
+
+    def __init__(self, directory: str, session_id: str):
+        self.path = log_path(directory, session_id)
+        self.index_path = self.path[:-len(LOG_SUFFIX)] + INDEX_SUFFIX
+        self.open_turns: Dict[str, List] = {}
+        self.pending = bytearray()
+        self.pending_index = bytearray()
+        self.unsynced = False
+        self.used = time.monotonic()
+        self._recover()
+        self._log = open(self.path, 'ab')
+        self._index = open(self.index_path, 'ab')
+
+    def _recover(self):
+        """
+        Find the end of the last intact record and the next turn number
+
+        Records after the last indexed turn are scanned: a torn tail from a
+        crash is cut off, and turns that never got an index entry are
+        indexed as incomplete. A missing index is rebuilt from the whole log.
+        """
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < len(MAGIC):
+            with open(self.path, 'wb') as f:
+                f.write(MAGIC)
+            with open(self.index_path, 'wb'):
+                pass
+            self.size = len(MAGIC)
+            self.next_turn = 1
+            return
+        entries = _read_index(self.index_path, os.path.getsize(self.path))
+        with open(self.index_path, 'ab') as f:
+            f.truncate(len(entries) * INDEX_ENTRY.size)
+        scan_from = max((entry[2] for entry in entries), default=len(MAGIC))
+        last_turn = max((entry[0] for entry in entries), default=0)
+        tail: Dict[int, List] = {}
+        end = scan_from
+        with open(self.path, 'r+b') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not an event log: {self.path}")
+            for offset, end, kind, turn, payload in scan_records(f, scan_from):
+                entry = tail.setdefault(turn, [turn, offset, end, 0, 0.0, 0])
+                entry[2] = end
+                entry[3] += 1
+                if kind == TURN_START:
+                    entry[4] = json.loads(payload).get('at', 0.0)
+                elif kind == TURN_END:
+                    entry[5] = 1
+            if end < os.path.getsize(self.path):
+                logger.warning(f"Truncating torn tail of {self.path} at {end}")
+                f.truncate(end)
+        if tail:
+            with open(self.index_path, 'ab') as f:
+                for entry in tail.values():
+                    f.write(INDEX_ENTRY.pack(*entry))
+        self.size = end
+        self.next_turn = max([last_turn, *tail]) + 1
+
+    def append(self, kind: int, invocation_id: str, payload: bytes, at: float):
+        self.used = time.monotonic()
+        if kind == TURN_START:
+            # A turn that never ended was cancelled or failed
+            for other in list(self.open_turns):
+                self._end_turn(other, completed=False)
+            self.open_turns[invocation_id] = [self.next_turn, self.size, self.size, 0, at]
+            self.next_turn += 1
+        turn = self.open_turns.get(invocation_id)
+        if turn is None:
+            return
+        record = encode_record(kind, turn[0], payload)
+        self.pending += record
+        self.size += len(record)
+        turn[2] = self.size
+        turn[3] += 1
+        if kind == TURN_END:
+            self._end_turn(invocation_id, completed=True)
+
+    def _end_turn(self, invocation_id: str, completed: bool):
+        turn, start, end, records, started = self.open_turns.pop(invocation_id)
+        self.pending_index += INDEX_ENTRY.pack(turn, start, end, records, started, int(completed))
+
+    def write(self):
+        """Hand buffered bytes to the OS; the index only after the records it points to"""
+        if self.pending:
+            self._log.write(self.pending)
+            self._log.flush()
+            self.pending.clear()
+            self.unsynced = True
+        if self.pending_index:
+            self._index.write(self.pending_index)
+            self._index.flush()
+            self.pending_index.clear()
+            self.unsynced = True
+
+    def sync(self):
+        if self.unsynced:
+            os.fsync(self._log.fileno())
+            os.fsync(self._index.fileno())
+            self.unsynced = False
+
+    def close(self):
+        for invocation_id in list(self.open_turns):
+            self._end_turn(invocation_id, completed=False)
+        self.write()
+        self.sync()
+        self._log.close()
+        self._index.close()
+
+
+class EventLogWriter:
+    """
+    Buffered writer for the event logs of every session in the process
+
+    Callbacks on the event loop only serialize the event and queue the
+    bytes. A background thread frames and compresses queued records,
+    writes them every flush_interval seconds (sooner once max_buffer bytes
+    are waiting) and fsyncs at most every fsync_interval seconds, so a
+    crash loses at most that much history and streaming never waits on
+    disk. Logs idle for a minute are closed and reopened on demand.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval: float = 0.2,
+        fsync_interval: float = 1.0,
+        max_buffer: int = 256 * 1024
+    ):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.max_buffer = max_buffer
+        os.makedirs(directory, exist_ok=True)
+        self._queue: Deque[Tuple[str, int, str, bytes, float]] = deque()
+        self._queued_bytes = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._synced: Optional[threading.Event] = None
+        self._logs: Dict[str, _SessionLog] = {}
+        self._last_sync = time.monotonic()
+        self.stats = {'records': 0, 'bytes': 0, 'flushes': 0, 'fsyncs': 0, 'errors': 0}
+        self._thread = threading.Thread(target=self._run, name='tashkil-event-log', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, session_id: str, kind: int, invocation_id: str, payload: Union[Dict[str, Any], bytes]):
+        """
+        Queue one record; never blocks on I/O
+
+        Args:
+            session_id: Session whose log gets the record
+            kind: TURN_START, EVENT or TURN_END
+            invocation_id: Turn the record belongs to
+            payload: JSON bytes, or a dict to encode compactly
+        """
+        if not isinstance(payload, bytes):
+            payload = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        with self._lock:
+            if self._closed:
+                return
+            self._queue.append((session_id, kind, invocation_id, payload, time.time()))
+            self._queued_bytes += len(payload)
+            full = self._queued_bytes >= self.max_buffer
+        if full:
+            self._wake.set()
+
+    def _drain(self, sync: bool):
+        with self._lock:
+            queue, self._queue = self._queue, deque()
+            self._queued_bytes = 0
+        touched = set()
+        for session_id, kind, invocation_id, payload, at in queue:
+            try:
+                log = self._logs.get(session_id)
+                if log is None:
+                    log = self._logs[session_id] = _SessionLog(self.directory, session_id)
+                log.append(kind, invocation_id, payload, at)
+                touched.add(session_id)
+                self.stats['records'] += 1
+                self.stats['bytes'] += len(payload)
+            except (OSError, ValueError) as e:
+                self.stats['errors'] += 1
+                logger.error(f"Event log for session {session_id} failed: {e}")
+        for session_id in touched:
+            self._logs[session_id].write()
+        if touched:
+            self.stats['flushes'] += 1
+        if sync:
+            now = time.monotonic()
+            for session_id, log in list(self._logs.items()):
+                log.sync()
+                if not log.open_turns and now - log.used > IDLE_CLOSE_SECONDS:
+                    log.close()
+                    del self._logs[session_id]
+            self._last_sync = now
+            self.stats['fsyncs'] += 1
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                closed = self._closed
+                synced, self._synced = self._synced, None
+            try:
+                self._drain(sync=closed or synced is not None or time.monotonic() - self._last_sync >= self.fsync_interval)
+            except OSError as e:
+                self.stats['errors'] += 1
+                logger.error(f"Event log flush failed: {e}")
+            if synced is not None:
+                synced.set()
+            if closed:
+                return
+
+    def flush(self, timeout: float = 10.0):
+        """Write and fsync everything queued so far (blocks; not for the event loop)"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._synced is None:
+                self._synced = threading.Event()
+            synced = self._synced
+        self._wake.set()
+        synced.wait(timeout)
+
+    def close(self):
+        """Write and fsync queued records, end open turns as incomplete and close every log"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._wake.set()
+        self._thread.join()
+        for log in self._logs.values():
+            try:
+                log.close()
+            except OSError as e:
+                logger.error(f"Closing event log {log.path} failed: {e}")
+        self._logs.clear()
+
+
+class EventLogReader:
+    """Read side of one session's log"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path[:-len(LOG_SUFFIX)] + INDEX_SUFFIX if path.endswith(LOG_SUFFIX) else path + INDEX_SUFFIX
+
+    def turns(self) -> List[Dict[str, Any]]:
+        """
+        Turns of the session, from the index
+
+        Returns:
+            One dict per turn: turn, start and end offset, records, started
+            (epoch seconds) and completed. Turns still running, or written
+            by a process that crashed, are found by scanning past the index.
+        """
+        entries = [list(entry) for entry in _read_index(self.index_path, os.path.getsize(self.path))]
+        scan_from = max((entry[2] for entry in entries), default=len(MAGIC))
+        tail: Dict[int, List] = {}
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not an event log: {self.path}")
+            for offset, end, kind, turn, payload in scan_records(f, scan_from):
+                entry = tail.setdefault(turn, [turn, offset, end, 0, 0.0, 0])
+                entry[2] = end
+                entry[3] += 1
+                if kind == TURN_START:
+                    entry[4] = json.loads(payload).get('at', 0.0)
+                elif kind == TURN_END:
+                    entry[5] = 1
+        keys = ('turn', 'start', 'end', 'records', 'started', 'completed')
+        result = [dict(zip(keys, entry)) for entry in entries + list(tail.values())]
+        for entry in result:
+            entry['completed'] = bool(entry['completed'])
+        return sorted(result, key=lambda entry: entry['turn'])
+
+    def records(self, turn: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Decoded records, of one turn or of the whole log
+
+        Args:
+            turn: Turn number; reads only that turn's byte range of the log
+
+        Returns:
+            Dicts with kind, turn and data (the JSON payload)
+        """
+        start, end = len(MAGIC), None
+        if turn is not None:
+            entry = next((entry for entry in self.turns() if entry['turn'] == turn), None)
+            if entry is None:
+                return []
+            start, end = entry['start'], entry['end']
+        result = []
+        with open(self.path, 'rb') as f:
+            for _, _, kind, record_turn, payload in scan_records(f, start, end):
+                if turn is None or record_turn == turn:
+                    result.append({'kind': KIND_NAMES.get(kind, kind), 'turn': record_turn, 'data': json.loads(payload)})
+        return result
+
+    def events(self, turn: Optional[int] = None) -> List[Event]:
+        """
+        Session events in log order, including the user message that started each turn
+
+        Args:
+            turn: Only this turn
+
+        Returns:
+            ADK events, ready to append to a session
+        """
+        from google.genai import types
+
+        events = []
+        for record in self.records(turn):
+            data = record['data']
+            if record['kind'] == 'turn_start' and data.get('user'):
+                events.append(Event(
+                    invocation_id=data['invocation_id'],
+                    author='user',
+                    content=types.Content.model_validate(data['user']),
+                    timestamp=data['at'],
+                ))
+            elif record['kind'] == 'event':
+                events.append(Event.model_validate(data))
+        return events
+
+
+async def restore_session(session_service, app_name: str, user_id: str, session_id: str, directory: str):
+    """
+    Rebuild a session from its event log, e.g. after a restart with an in-memory store
+
+    Args:
+        session_service: Session store to create the session in
+        app_name: Application name
+        user_id: User identifier
+        session_id: Session identifier
+        directory: Event log directory
+
+    Returns:
+        The restored session, or None when the session has no log
+    """
+    path = log_path(directory, session_id)
+    if not os.path.exists(path):
+        return None
+    session = await session_service.create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+    for event in EventLogReader(path).events():
+        await session_service.append_event(session, event)
+    return session
+
+
+class EventLogPlugin(BasePlugin):
+    """
+    Appends every turn of every session to its event log
+
+    The user message is logged when the turn starts, then each final event
+    (streamed partial chunks are left out, their text is repeated in the
+    final event) and a turn end marker when the run completes.
+    """
+
+    def __init__(self, writer: 'EventLogWriter'):
+        super().__init__(name='event_log')
+        self.writer = writer
+
+    async def before_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        user = invocation_context.user_content
+        self.writer.submit(invocation_context.session.id, TURN_START, invocation_context.invocation_id, {
+            'invocation_id': invocation_context.invocation_id,
+            'at': time.time(),
+            'user': user.model_dump(mode='json', exclude_none=True) if user else None,
+        })
+        return None
+
+    async def on_event_callback(self, *, invocation_context: InvocationContext, event: Event) -> Optional[Event]:
+        if not event.partial:
+            self.writer.submit(
+                invocation_context.session.id, EVENT, invocation_context.invocation_id,
+                event.model_dump_json(exclude_none=True).encode('utf-8')
+            )
+        return None
+
+    async def after_run_callback(self, *, invocation_context: InvocationContext) -> None:
+        self.writer.submit(invocation_context.session.id, TURN_END, invocation_context.invocation_id, {'at': time.time()})
+
+
+_event_log: Optional[EventLogWriter] = None
+
+
+def get_event_log() -> Optional[EventLogWriter]:
+    """Get the process-wide event log writer, None when EVENT_LOG_DIR is empty (singleton pattern)"""
+    global _event_log
+    if _event_log is None:
+        from ..config import get_settings
+        settings = get_settings()
+        if not settings.event_log_dir:
+            return None
+        _event_log = EventLogWriter(
+            settings.event_log_dir,
+            flush_interval=settings.event_log_flush_interval,
+            fsync_interval=settings.event_log_fsync_interval,
+        )
+    return _event_log
+
+
+def main(argv: Optional[List[str]] = None):
+    """Inspect a log: python -m src.services.event_log FILE [--turn N]"""
+    parser = argparse.ArgumentParser(description='Summarize a session event log, or print one turn as JSON lines')
+    parser.add_argument('path')
+    parser.add_argument('--turn', type=int)
+    args = parser.parse_args(argv)
+    reader = EventLogReader(args.path)
+    if args.turn is not None:
+        for record in reader.records(args.turn):
+            print(json.dumps(record, ensure_ascii=False))
+        return
+    for entry in reader.turns():
+        started = datetime.fromtimestamp(entry['started']).isoformat(timespec='seconds') if entry['started'] else '-'
+        status = 'completed' if entry['completed'] else 'incomplete'
+        print(f"turn {entry['turn']}: {started} {entry['records']} records, "
+              f"{entry['end'] - entry['start']} bytes, {status}")
+
+
+if __name__ == '__main__':
+    main()
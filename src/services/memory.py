@@ -0,0 +1,338 @@
+"""Memory accounting per session and enforcement of memory caps"""
+
+import gzip
+import json
+import logging
+import os
+import resource
+import threading
+import time
+import tracemalloc
+import weakref
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from ..config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Allocation sites (path fragments) attributed to each category in tracemalloc samples
+CATEGORIES = {
+    'events': ('google/adk/events', 'google/genai/types', 'google/adk/flows'),
+    'sessions': ('google/adk/sessions',),
+    'artifacts': ('google/adk/artifacts',),
+    'caches': ('src/tools/', 'functools'),
+    'models': ('google/adk/models', 'httpx', 'h11', 'ssl'),
+}
+
+
+@dataclass
+class SessionUsage:
+    """Estimated memory held by one session"""
+    session_id: str
+    events: int = 0
+    event_bytes: int = 0
+    state_bytes: int = 0
+    artifact_bytes: int = 0
+    spilled_events: int = 0
+    last_used: float = 0.0
+
+    @property
+    def total_bytes(self) -> int:
+        return self.event_bytes + self.state_bytes + self.artifact_bytes
+
+
+def _json_size(value: Any) -> int:
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _stored_session(manager) -> Optional[Any]:
+    """The session object the InMemorySessionService actually keeps (get_session returns copies)"""
+    session = manager.session
+    sessions = getattr(manager.session_service, 'sessions', None)
+    try:
+        return sessions[session.app_name][session.user_id][session.id]
+    except (KeyError, TypeError):
+        return None
+
+
+def _artifact_bytes(manager) -> int:
+    total = 0
+    for versions in (getattr(manager.artifacts_service, 'artifacts', None) or {}).values():
+        for part in versions:
+            inline = getattr(part, 'inline_data', None)
+            if inline is not None and inline.data:
+                total += len(inline.data)
+            total += len(getattr(part, 'text', None) or '')
+    return total
+
+
+class MemoryAccountant:
+    """
+    Attributes memory to sessions and keeps it under configured caps
+
+    Session figures are estimates from the serialized size of each
+    session's events, state and artifacts; event sizes are cached by event
+    id so accounting after a turn only measures the new events. When
+    tracing is enabled, sampled tracemalloc snapshots additionally split
+    live Python allocations by category (events, sessions, artifacts,
+    caches, models).
+
+    A session over its cap, or the least recently used sessions while the
+    process is over the global cap, have their older events spilled to a
+    gzip JSONL file and dropped from memory. The most recent events are kept,
+    and every cut happens at a user message, so tool calls stay paired with
+    their results.
+
+    Session managers are held by weak reference: a session that its owner
+    drops without calling forget() (a closed Streamlit page) is forgotten
+    when its manager is garbage collected.
+
+    The accountant is shared by sessions running on other threads (each
+    Streamlit page has its own), so its tables are guarded by a re-entrant
+    lock: after_turn spills and re-measures while holding it, and a
+    garbage collected manager may be forgotten on a thread that holds it.
+    """
+
+    def __init__(
+        self,
+        session_cap_bytes: int,
+        global_cap_bytes: int,
+        keep_events: int = 40,
+        spill_dir: str = './session_spill',
+        tracing: bool = False,
+        sample_interval: float = 60.0
+    ):
+        self.session_cap_bytes = session_cap_bytes
+        self.global_cap_bytes = global_cap_bytes
+        self.keep_events = keep_events
+        self.spill_dir = spill_dir
+        self.sample_interval = sample_interval
+        self._sessions: Dict[str, weakref.ref] = {}
+        self._usage: Dict[str, SessionUsage] = {}
+        self._event_sizes: Dict[str, Dict[str, int]] = {}
+        self._sample: Dict[str, Any] = {}
+        self._sampled_at = 0.0
+        self._lock = threading.RLock()
+        self.stats = {'spills': 0, 'spilled_events': 0, 'spilled_bytes': 0}
+        if tracing and not tracemalloc.is_tracing():
+            tracemalloc.start(1)
+
+    # Accounting ----------------------------------------------------------
+
+    def register(self, manager):
+        """Track a session manager until forget() is called for it or it is garbage collected"""
+        session_id = manager.session.id
+        with self._lock:
+            ref = self._sessions.get(session_id)
+            if ref is None or ref() is not manager:
+                self._sessions[session_id] = weakref.ref(manager, lambda dead: self._collected(session_id, dead))
+
+    def _collected(self, session_id: str, ref: weakref.ref):
+        with self._lock:
+            # Only if the session was not re-registered with a newer manager
+            if self._sessions.get(session_id) is ref:
+                self.forget(session_id)
+
+    def _manager(self, session_id: str) -> Optional[Any]:
+        ref = self._sessions.get(session_id)
+        return ref() if ref is not None else None
+
+    def forget(self, session_id: str):
+        """Stop tracking a session that was closed"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._usage.pop(session_id, None)
+            self._event_sizes.pop(session_id, None)
+
+    def measure(self, manager) -> SessionUsage:
+        """Update and return the usage estimate of one session"""
+        session_id = manager.session.id
+        with self._lock:
+            usage = self._usage.get(session_id) or SessionUsage(session_id)
+            stored = _stored_session(manager) or manager.session
+            events = getattr(stored, 'events', None) or []
+            sizes = self._event_sizes.setdefault(session_id, {})
+            event_bytes = 0
+            for event in events:
+                size = sizes.get(event.id)
+                if size is None:
+                    size = len(event.model_dump_json(exclude_none=True))
+                    sizes[event.id] = size
+                event_bytes += size
+            usage.events = len(events)
+            usage.event_bytes = event_bytes
+            usage.state_bytes = _json_size(getattr(stored, 'state', None) or {})
+            usage.artifact_bytes = _artifact_bytes(manager)
+            self._usage[session_id] = usage
+            return usage
+
+    def after_turn(self, manager):
+        """Account a session after a turn and enforce the caps"""
+        with self._lock:
+            self.register(manager)
+            usage = self.measure(manager)
+            usage.last_used = time.monotonic()
+            if usage.total_bytes > self.session_cap_bytes:
+                self.spill(manager)
+            self.enforce_global()
+
+    # Enforcement ---------------------------------------------------------
+
+    def _cut_index(self, events: List[Any]) -> int:
+        """Index of the first kept event: the user message closest to keep_events from the end"""
+        start = max(0, len(events) - self.keep_events)
+        for index in range(start, len(events)):
+            if events[index].author == 'user':
+                return index
+        # One long turn: keep it whole, back to the user message that started it
+        for index in range(start - 1, 0, -1):
+            if events[index].author == 'user':
+                return index
+        return 0
+
+    def spill(self, manager) -> int:
+        """
+        Move a session's older events to disk
+
+        Returns:
+            Number of events spilled
+        """
+        with self._lock:
+            stored = _stored_session(manager)
+            if stored is None:
+                return 0
+            cut = self._cut_index(stored.events)
+            if cut <= 0:
+                return 0
+            spilled = stored.events[:cut]
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f'{manager.session.id}.events.jsonl.gz')
+            sizes = self._event_sizes.get(manager.session.id, {})
+            written = 0
+            with gzip.open(path, 'at', encoding='utf-8') as f:
+                for event in spilled:
+                    line = event.model_dump_json(exclude_none=True)
+                    f.write(line + '\n')
+                    written += len(line)
+                    sizes.pop(event.id, None)
+            del stored.events[:cut]
+
+            usage = self.measure(manager)
+            usage.spilled_events += len(spilled)
+            self.stats['spills'] += 1
+            self.stats['spilled_events'] += len(spilled)
+            self.stats['spilled_bytes'] += written
+            logger.info(f"Spilled {len(spilled)} events ({written / MB:.1f} MB) of session {manager.session.id} to {path}")
+            return len(spilled)
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(usage.total_bytes for usage in self._usage.values())
+
+    def enforce_global(self):
+        """Spill least recently used sessions while the total is over the global cap"""
+        with self._lock:
+            if self.total_bytes() <= self.global_cap_bytes:
+                return
+            for usage in sorted(self._usage.values(), key=lambda u: u.last_used):
+                manager = self._manager(usage.session_id)
+                if manager is None:
+                    self.forget(usage.session_id)
+                    continue
+                self.spill(manager)
+                if self.total_bytes() <= self.global_cap_bytes:
+                    return
+            logger.warning(f"Session memory still over the global cap: {self.total_bytes() / MB:.1f} MB")
+
+    # Reporting -----------------------------------------------------------
+
+    def sample(self, force: bool = False) -> Dict[str, Any]:
+        """Allocation totals by category from a tracemalloc snapshot, at most once per interval"""
+        if not tracemalloc.is_tracing():
+            return {}
+        now = time.monotonic()
+        if not force and self._sample and now - self._sampled_at < self.sample_interval:
+            return self._sample
+        totals = {name: 0 for name in CATEGORIES}
+        totals['other'] = 0
+        for stat in tracemalloc.take_snapshot().statistics('filename'):
+            filename = stat.traceback[0].filename.replace(os.sep, '/')
+            category = next((name for name, parts in CATEGORIES.items() if any(p in filename for p in parts)), 'other')
+            totals[category] += stat.size
+        current, peak = tracemalloc.get_traced_memory()
+        self._sample = {
+            'categories_mb': {name: round(size / MB, 2) for name, size in totals.items()},
+            'traced_mb': round(current / MB, 2),
+            'traced_peak_mb': round(peak / MB, 2),
+        }
+        self._sampled_at = now
+        return self._sample
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Memory figures for the metrics endpoint"""
+        with self._lock:
+            live = [SessionUsage(**asdict(usage)) for usage in self._usage.values()]
+            stats = dict(self.stats)
+        live.sort(key=lambda u: u.total_bytes, reverse=True)
+        return {
+            'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            'sessions_mb': round(sum(u.total_bytes for u in live) / MB, 2),
+            'session_cap_mb': round(self.session_cap_bytes / MB, 1),
+            'global_cap_mb': round(self.global_cap_bytes / MB, 1),
+            'sessions': len(live),
+            'largest_sessions': [{**asdict(u), 'total_bytes': u.total_bytes} for u in live[:10]],
+            **stats,
+            'tracemalloc': self.sample(),
+        }
+
+
+def merge_snapshots(snapshots: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine MemoryAccountant.snapshot() figures from several processes
+
+    Used when agent turns run in worker processes: each worker accounts its
+    own sessions, and the API process reports their sum.
+
+    Args:
+        snapshots: Snapshots of this process and of each worker
+
+    Returns:
+        Totals over all processes, the largest sessions overall and the
+        per-process figures under 'processes'
+    """
+    merged = dict(snapshots[0])
+    for key in ('max_rss_mb', 'sessions_mb', 'sessions', 'spills', 'spilled_events', 'spilled_bytes'):
+        merged[key] = round(sum(snapshot.get(key, 0) for snapshot in snapshots), 2)
+    largest = [session for snapshot in snapshots for session in snapshot.get('largest_sessions', [])]
+    largest.sort(key=lambda session: session['total_bytes'], reverse=True)
+    merged['largest_sessions'] = largest[:10]
+    merged['processes'] = [
+        {key: value for key, value in snapshot.items() if key != 'largest_sessions'} for snapshot in snapshots
+    ]
+    return merged
+
+
+_accountant: Optional[MemoryAccountant] = None
+
+
+def get_memory_accountant() -> MemoryAccountant:
+    """Get the process-wide memory accountant (singleton pattern)"""
+    global _accountant
+    if _accountant is None:
+        settings = get_settings()
+        _accountant = MemoryAccountant(
+            session_cap_bytes=int(settings.session_memory_cap_mb * MB),
+            global_cap_bytes=int(settings.global_memory_cap_mb * MB),
+            keep_events=settings.memory_keep_events,
+            spill_dir=settings.memory_spill_dir,
+            tracing=settings.memory_tracing,
+            sample_interval=settings.memory_sample_interval,
+        )
+    return _accountant
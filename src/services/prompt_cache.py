@@ -0,0 +1,173 @@
+"""Prompt prefix stability, provider context caching and cache-hit metrics per agent"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+
+from ..agents.base import PROJECT_CONTEXT_MARKER
+
+
+logger = logging.getLogger(__name__)
+
+
+def _system_text(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if instruction is None:
+        return ''
+    if isinstance(instruction, str):
+        return instruction
+    parts = getattr(instruction, 'parts', None) or []
+    return ''.join(part.text or '' for part in parts)
+
+
+def _tools_json(llm_request: LlmRequest) -> str:
+    tools = llm_request.config.tools if llm_request.config else None
+    if not tools:
+        return ''
+    return json.dumps(
+        [tool.model_dump(mode='json', exclude_none=True) if hasattr(tool, 'model_dump') else str(tool) for tool in tools],
+        sort_keys=True,
+    )
+
+
+class PromptCachePlugin(BasePlugin):
+    """
+    Tracks the static prompt prefix of every agent and the provider's cache hits
+
+    The static prefix is the system instruction up to the project context
+    marker. A prefix that changes between calls of the same agent defeats
+    provider-side caching and is counted as a prefix break. Cache hits and
+    saved prefill tokens come from the cached_content_token_count that
+    Gemini reports for implicit and explicit caches.
+
+    With explicit=True, Gemini requests whose system instruction and tool
+    declarations are at least min_tokens long are served from an explicit
+    cached content created once per distinct prefix and kept for ttl
+    seconds. The instruction and tools are then omitted from each request.
+    """
+
+    def __init__(self, explicit: bool = False, ttl: int = 3600, min_tokens: int = 4096):
+        super().__init__(name='prompt_cache')
+        self.explicit = explicit
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.metrics: Dict[str, Dict[str, Any]] = {}
+        self._prefixes: Dict[str, str] = {}
+        # (model, digest) -> (cache name, expiry); None marks a prefix that cannot be cached
+        self._caches: Dict[Tuple[str, str], Optional[Tuple[str, float]]] = {}
+        self._client = None
+
+    def _agent_metrics(self, agent: str) -> Dict[str, Any]:
+        return self.metrics.setdefault(agent, {
+            'calls': 0, 'cache_hits': 0, 'prompt_tokens': 0, 'cached_tokens': 0,
+            'prefix_breaks': 0, 'prefix_chars': 0, 'explicit_cache_calls': 0,
+        })
+
+    async def _explicit_cache(self, llm_request: LlmRequest, digest: str, chars: int) -> Optional[str]:
+        """Name of a live cached content for this prefix, creating it if needed"""
+        key = (llm_request.model, digest)
+        if key in self._caches:
+            entry = self._caches[key]
+            if entry is None:
+                return None
+            name, expires = entry
+            if expires - time.time() > 60:
+                return name
+        if chars // 4 < self.min_tokens:
+            self._caches[key] = None
+            return None
+        try:
+            from google import genai
+            from google.genai import types
+
+            if self._client is None:
+                self._client = genai.Client()
+            cache = await self._client.aio.caches.create(
+                model=llm_request.model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=llm_request.config.system_instruction,
+                    tools=llm_request.config.tools,
+                    tool_config=llm_request.config.tool_config,
+                    ttl=f'{self.ttl}s',
+                ),
+            )
+        except Exception as e:
+            logger.warning(f"Explicit context cache unavailable for {llm_request.model}: {e}")
+            self._caches[key] = None
+            return None
+        self._caches[key] = (cache.name, time.time() + self.ttl)
+        logger.info(f"Created context cache {cache.name} for {llm_request.model}")
+        return cache.name
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        metrics = self._agent_metrics(callback_context.agent_name)
+        metrics['calls'] += 1
+
+        system = _system_text(llm_request)
+        static = system.split(PROJECT_CONTEXT_MARKER, 1)[0]
+        prefix_digest = hashlib.sha256(static.encode('utf-8')).hexdigest()[:16]
+        previous = self._prefixes.get(callback_context.agent_name)
+        if previous is not None and previous != prefix_digest:
+            metrics['prefix_breaks'] += 1
+            logger.info(f"Static prompt prefix of {callback_context.agent_name} changed; provider cache will miss")
+        self._prefixes[callback_context.agent_name] = prefix_digest
+        metrics['prefix_chars'] = len(static)
+
+        if self.explicit and (llm_request.model or '').startswith('gemini') and llm_request.config:
+            tools = _tools_json(llm_request)
+            digest = hashlib.sha256((system + '\0' + tools).encode('utf-8')).hexdigest()[:16]
+            name = await self._explicit_cache(llm_request, digest, len(system) + len(tools))
+            if name:
+                # Gemini rejects requests that set these next to cached_content
+                llm_request.config.cached_content = name
+                llm_request.config.system_instruction = None
+                llm_request.config.tools = None
+                llm_request.config.tool_config = None
+                metrics['explicit_cache_calls'] += 1
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if llm_response.partial or usage is None:
+            return None
+        metrics = self._agent_metrics(callback_context.agent_name)
+        metrics['prompt_tokens'] += usage.prompt_token_count or 0
+        cached = usage.cached_content_token_count or 0
+        if cached:
+            metrics['cache_hits'] += 1
+            metrics['cached_tokens'] += cached
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent hit rate and prefill tokens served from cache"""
+        report = {}
+        for agent, metrics in self.metrics.items():
+            calls = metrics['calls']
+            prompt = metrics['prompt_tokens']
+            report[agent] = {
+                **metrics,
+                'hit_rate': round(metrics['cache_hits'] / calls, 3) if calls else 0.0,
+                'prefill_tokens_saved_ratio': round(metrics['cached_tokens'] / prompt, 3) if prompt else 0.0,
+            }
+        return report
+
+
+def prompt_cache_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of the runner's prompt cache plugin, empty when it is disabled"""
+    from .session_service import get_runner_plugins
+
+    for plugin in get_runner_plugins():
+        if isinstance(plugin, PromptCachePlugin):
+            return plugin.snapshot()
+    return {}
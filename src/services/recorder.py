@@ -0,0 +1,285 @@
+"""Record and replay of model and tool traffic for agent sessions"""
+
+import asyncio
+import atexit
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 2
+# Version 1 stored one 'response' per entry
+READABLE_VERSIONS = (1, 2)
+
+
+def _open(path: str, mode: str):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+
+def _dump(model) -> Dict[str, Any]:
+    return model.model_dump(mode='json', exclude_none=True)
+
+
+def _request_digest(contents: List[Dict[str, Any]]) -> str:
+    """
+    Digest of request contents that survives a replay
+
+    Function call ids are dropped (ADK generates them anew on every run) and
+    consecutive contents of one role are joined, since a replayed model call
+    yields as one content what the recording may have received as several.
+    """
+    stable: List[Tuple[Optional[str], List[Dict[str, Any]]]] = []
+    for content in contents:
+        parts = []
+        for part in content.get('parts') or []:
+            part = dict(part)
+            for key in ('function_call', 'function_response'):
+                if isinstance(part.get(key), dict):
+                    part[key] = {k: v for k, v in part[key].items() if k != 'id'}
+            parts.append(part)
+        if stable and stable[-1][0] == content.get('role'):
+            stable[-1][1].extend(parts)
+        else:
+            stable.append((content.get('role'), parts))
+    return _digest(stable)
+
+
+def _merge_responses(responses: List[Dict[str, Any]]) -> LlmResponse:
+    """One response carrying the parts of every recorded response of a model call, in order"""
+    merged = LlmResponse.model_validate(responses[-1])
+    if len(responses) > 1:
+        parts = [part for response in responses for part in (response.get('content') or {}).get('parts') or []]
+        merged.content = types.Content.model_validate({'role': 'model', 'parts': parts})
+    return merged
+
+
+class CassetteRecorder(BasePlugin):
+    """
+    Captures every model request/response and tool call/result into a cassette
+
+    A cassette is a JSONL file (gzip compressed when it ends in .gz) with a
+    header line followed by one entry per model call or tool call. A model
+    entry holds every non-partial response of the call: with streaming,
+    Gemini returns the text and then the function calls as two. Model
+    requests are stored as a digest of the whole request plus the newest
+    content only, which keeps cassettes small; the player compares the
+    digest to detect a replay that diverged from the recording.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(name='cassette_recorder')
+        self.path = path
+        self._file = _open(path, 'w')
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        # Open model call per invocation and agent: written when the agent's next call starts or it ends
+        self._model_calls: Dict[str, Dict[str, Any]] = {}
+        self._tool_started: Dict[Tuple[str, str], float] = {}
+        self._write({'kind': 'header', 'version': CASSETTE_VERSION, 'created': time.time()})
+        # gzip only writes its trailer on close
+        atexit.register(self.close)
+
+    def _write(self, entry: Dict[str, Any]):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n')
+            self._file.flush()
+
+    def _flush_call(self, key: str):
+        entry = self._model_calls.pop(key, None)
+        if entry is not None and entry['responses']:
+            self._write(entry)
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        key = callback_context.invocation_id + callback_context.agent_name
+        self._flush_call(key)
+        contents = [_dump(content) for content in llm_request.contents or []]
+        self._model_calls[key] = {
+            'kind': 'model',
+            'agent': callback_context.agent_name,
+            'at': round(time.perf_counter() - self._started, 4),
+            'duration': 0.0,
+            'request': {
+                'model': llm_request.model,
+                'digest': _request_digest(contents),
+                'contents': len(contents),
+                'last': contents[-1] if contents else None,
+            },
+            'responses': [],
+        }
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        entry = self._model_calls.get(callback_context.invocation_id + callback_context.agent_name)
+        if entry is None:
+            return None
+        entry['responses'].append(_dump(llm_response))
+        entry['duration'] = round(time.perf_counter() - self._started - entry['at'], 4)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context: CallbackContext):
+        self._flush_call(callback_context.invocation_id + agent.name)
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict]:
+        self._tool_started[(tool_context.function_call_id or '', tool.name)] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: Dict
+    ) -> Optional[Dict]:
+        now = time.perf_counter()
+        started = self._tool_started.pop((tool_context.function_call_id or '', tool.name), now)
+        self._write({
+            'kind': 'tool',
+            'agent': tool_context.agent_name,
+            'tool': tool.name,
+            'args_digest': _digest(tool_args),
+            'args': tool_args,
+            'at': round(started - self._started, 4),
+            'duration': round(now - started, 4),
+            'result': json.loads(json.dumps(result, default=str)),
+        })
+        return None
+
+    def close(self):
+        for key in list(self._model_calls):
+            self._flush_call(key)
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+class CassettePlayer(BasePlugin):
+    """
+    Replays a cassette instead of calling the model (and optionally the tools)
+
+    Model responses are served per agent in recorded order; a call recorded
+    as several responses is replayed as one response with all their parts.
+    A request whose digest differs from the recorded one is counted as a
+    miss (the conversation diverged) but still answered. Tool results are
+    matched on agent, tool name and argument digest. With timed=True every
+    replayed call sleeps for its recorded duration, which reproduces the
+    original pacing so orchestration overhead can be profiled in isolation.
+    With replay_tools=False tools run for real and only the model is replayed.
+    """
+
+    def __init__(self, path: str, timed: bool = False, replay_tools: bool = True):
+        super().__init__(name='cassette_player')
+        self.timed = timed
+        self.replay_tools = replay_tools
+        self._models: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._tools: Dict[Tuple[str, str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.stats = {'model_replays': 0, 'tool_replays': 0, 'misses': 0}
+
+        for entry in self._read(path):
+            if entry['kind'] == 'header' and entry.get('version') not in READABLE_VERSIONS:
+                raise ValueError(f"Unsupported cassette version {entry.get('version')}")
+            if entry['kind'] == 'model':
+                entry.setdefault('responses', [entry.pop('response', None)])
+                self._models[entry['agent']].append(entry)
+            elif entry['kind'] == 'tool':
+                self._tools[(entry['agent'], entry['tool'], entry['args_digest'])].append(entry)
+
+    @staticmethod
+    def _read(path: str):
+        """Yield cassette entries, tolerating a recording that was cut off"""
+        with _open(path, 'r') as f:
+            try:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+            except EOFError:
+                return
+
+    async def _pace(self, entry: Dict[str, Any]):
+        if self.timed and entry.get('duration'):
+            await asyncio.sleep(entry['duration'])
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        queue = self._models.get(callback_context.agent_name)
+        if not queue:
+            self.stats['misses'] += 1
+            raise RuntimeError(f"Cassette has no more model responses for {callback_context.agent_name}")
+        entry = queue.popleft()
+        recorded = (entry.get('request') or {}).get('digest')
+        digest = _request_digest([_dump(content) for content in llm_request.contents or []])
+        if recorded and recorded != digest:
+            self.stats['misses'] += 1
+            logger.warning(f"Model request of {callback_context.agent_name} differs from the recording, replay diverged")
+        await self._pace(entry)
+        self.stats['model_replays'] += 1
+        return _merge_responses(entry['responses'])
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict]:
+        if not self.replay_tools:
+            return None
+        queue = self._tools.get((tool_context.agent_name, tool.name, _digest(tool_args)))
+        if not queue:
+            self.stats['misses'] += 1
+            logger.warning(f"Cassette miss for tool {tool.name}, running it for real")
+            return None
+        entry = queue.popleft()
+        await self._pace(entry)
+        self.stats['tool_replays'] += 1
+        return entry['result']
+
+
+def create_cassette_plugin(mode: str, path: str) -> Optional[BasePlugin]:
+    """
+    Build the plugin for a cassette mode
+
+    Args:
+        mode: "record", "replay" (full speed), "replay-timed" (recorded pacing)
+              or "replay-model" (recorded pacing, tools run for real); empty disables
+        path: Cassette file
+
+    Returns:
+        Plugin instance, or None when disabled
+    """
+    if not mode:
+        return None
+    if mode == 'record':
+        return CassetteRecorder(path)
+    if mode == 'replay':
+        return CassettePlayer(path)
+    if mode == 'replay-timed':
+        return CassettePlayer(path, timed=True)
+    if mode == 'replay-model':
+        return CassettePlayer(path, timed=True, replay_tools=False)
+    raise ValueError(f"Unknown cassette mode: {mode}")
@@ -0,0 +1,259 @@
+"""Turn scheduling: bounded worker pool with priorities, fairness and backpressure"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, Optional
+
+from ..config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+
+class SchedulerSaturated(RuntimeError):
+    """Raised when the queue is full and the caller asked not to wait"""
+
+    def __init__(self, queued: int, retry_after: float):
+        super().__init__(f"Scheduler saturated: {queued} turns queued")
+        self.queued = queued
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A queued or running turn; release() frees its worker slot"""
+
+    def __init__(self, scheduler: 'TurnScheduler', user_id: str, priority: int):
+        self.scheduler = scheduler
+        self.user_id = user_id
+        self.priority = priority
+        self.enqueued = time.perf_counter()
+        self.started: Optional[float] = None
+        self.released = False
+        self._granted = asyncio.get_running_loop().create_future()
+
+    @property
+    def queue_wait(self) -> Optional[float]:
+        """Seconds spent waiting for a worker, None while still queued"""
+        if self.started is None:
+            return None
+        return self.started - self.enqueued
+
+    async def wait(self):
+        """Wait until a worker slot is granted; cancelling gives the place back"""
+        try:
+            await asyncio.shield(self._granted)
+        except asyncio.CancelledError:
+            self.scheduler._abandon(self)
+            raise
+
+    def release(self):
+        if not self.released and self.started is not None:
+            self.released = True
+            self.scheduler._release(self)
+
+
+class TurnScheduler:
+    """
+    Admits agent turns into a bounded pool of workers
+
+    Turns wait in one queue per priority class; a lower class number always
+    goes first (interactive before batch). Inside a class users are served
+    round-robin, so one user with many queued turns cannot starve the others.
+    When max_queue turns are already waiting, new turns are rejected with
+    SchedulerSaturated (or wait for room when wait_for_space is set), which
+    keeps queueing delay bounded instead of letting it grow without limit.
+    max_queue=0 disables queueing: a turn is admitted only while a worker is
+    free.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 64):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.running = 0
+        self._queues: Dict[int, 'OrderedDict[str, Deque[Ticket]]'] = {}
+        self._queued = 0
+        # Set whenever a worker or queue place frees up; waiters clear it and re-check
+        self._space: Optional[asyncio.Event] = None
+        self.stats = {'admitted': 0, 'rejected': 0, 'completed': 0, 'wait_total': 0.0, 'wait_max': 0.0}
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def saturated(self) -> bool:
+        return self.running >= self.max_workers and self._queued >= self.max_queue
+
+    def _space_event(self) -> asyncio.Event:
+        if self._space is None:
+            self._space = asyncio.Event()
+        return self._space
+
+    def retry_after(self) -> float:
+        """Rough seconds until a queued slot frees up, from the average wait so far"""
+        admitted = self.stats['admitted']
+        average = self.stats['wait_total'] / admitted if admitted else 1.0
+        return round(max(1.0, average), 1)
+
+    def check_capacity(self):
+        """
+        Raise SchedulerSaturated if a new turn would be rejected right now
+
+        Lets callers answer with backpressure before doing any work.
+        """
+        if self.saturated:
+            self.stats['rejected'] += 1
+            raise SchedulerSaturated(self._queued, self.retry_after())
+
+    def submit(self, user_id: str, priority: int = PRIORITY_INTERACTIVE) -> Ticket:
+        """
+        Queue a turn without waiting
+
+        Args:
+            user_id: Owner of the turn, used for fairness
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BATCH (lower runs first)
+
+        Returns:
+            Ticket to await with wait() and release() when the turn ends
+
+        Raises:
+            SchedulerSaturated: If the queue is full
+        """
+        self.check_capacity()
+        ticket = Ticket(self, user_id, priority)
+        if self.running < self.max_workers and not self._queued:
+            self._grant(ticket)
+            return ticket
+        users = self._queues.setdefault(priority, OrderedDict())
+        users.setdefault(user_id, deque()).append(ticket)
+        self._queued += 1
+        return ticket
+
+    async def acquire(
+        self,
+        user_id: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        wait_for_space: bool = False
+    ) -> Ticket:
+        """
+        Queue a turn and wait for a worker slot
+
+        Args:
+            user_id: Owner of the turn
+            priority: Priority class
+            wait_for_space: Wait for room in a full queue instead of raising
+
+        Returns:
+            Granted ticket
+        """
+        while wait_for_space and self.saturated:
+            space = self._space_event()
+            space.clear()
+            await space.wait()
+        ticket = self.submit(user_id, priority)
+        await ticket.wait()
+        return ticket
+
+    async def run(
+        self,
+        run_agent: Callable[..., AsyncGenerator],
+        query: str,
+        session_manager: Any,
+        user_id: str,
+        priority: int = PRIORITY_INTERACTIVE,
+        wait_for_space: bool = False,
+        **kwargs
+    ) -> AsyncGenerator[Any, None]:
+        """Run one turn through the scheduler, yielding the agent's events"""
+        ticket = await self.acquire(user_id, priority, wait_for_space)
+        try:
+            async for event in run_agent(query, session_manager, **kwargs):
+                yield event
+        finally:
+            ticket.release()
+
+    def _grant(self, ticket: Ticket):
+        self.running += 1
+        ticket.started = time.perf_counter()
+        wait = ticket.queue_wait
+        self.stats['admitted'] += 1
+        self.stats['wait_total'] += wait
+        self.stats['wait_max'] = max(self.stats['wait_max'], wait)
+        if wait > 1.0:
+            logger.info(f"Turn for {ticket.user_id} waited {wait:.2f}s in queue (priority {ticket.priority})")
+        ticket._granted.set_result(None)
+
+    def _next(self) -> Optional[Ticket]:
+        for priority in sorted(self._queues):
+            users = self._queues[priority]
+            if not users:
+                continue
+            user_id, tickets = next(iter(users.items()))
+            ticket = tickets.popleft()
+            if tickets:
+                users.move_to_end(user_id)
+            else:
+                del users[user_id]
+            self._queued -= 1
+            return ticket
+        return None
+
+    def _dispatch(self):
+        while self.running < self.max_workers:
+            ticket = self._next()
+            if ticket is None:
+                break
+            self._grant(ticket)
+        if not self.saturated:
+            self._space_event().set()
+
+    def _release(self, ticket: Ticket):
+        self.running -= 1
+        self.stats['completed'] += 1
+        self._dispatch()
+
+    def _abandon(self, ticket: Ticket):
+        """Drop a ticket whose waiter was cancelled"""
+        if ticket._granted.done():
+            ticket.release()
+            return
+        ticket._granted.cancel()
+        tickets = self._queues.get(ticket.priority, {}).get(ticket.user_id)
+        if tickets and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._queues[ticket.priority][ticket.user_id]
+            self._queued -= 1
+            self._dispatch()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load and queue-wait metrics"""
+        admitted = self.stats['admitted']
+        return {
+            'running': self.running,
+            'queued': self._queued,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'admitted': admitted,
+            'rejected': self.stats['rejected'],
+            'completed': self.stats['completed'],
+            'queue_wait_avg': round(self.stats['wait_total'] / admitted, 3) if admitted else 0.0,
+            'queue_wait_max': round(self.stats['wait_max'], 3),
+        }
+
+
+_scheduler: Optional[TurnScheduler] = None
+
+
+def get_scheduler() -> TurnScheduler:
+    """Get the process-wide turn scheduler (singleton pattern)"""
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = TurnScheduler(settings.scheduler_workers, settings.scheduler_max_queue)
+    return _scheduler
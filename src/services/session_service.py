@@ -1,26 +1,86 @@
 """Session management service"""
 
 import logging
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
-from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import BaseSessionService, InMemorySessionService
 from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
 from google.adk.runners import Runner
+from google.adk.plugins.base_plugin import BasePlugin
 
 from ..config import get_settings
 from ..agents import create_dev_flow_agent
+from ..tools import get_workspace
+from .event_log import EventLogPlugin, get_event_log, restore_session
+from .prompt_cache import PromptCachePlugin
+from .recorder import create_cassette_plugin
 
 logger = logging.getLogger(__name__)
 
+# Runner plugins are shared by every session of the process
+_plugins: Optional[List[BasePlugin]] = None
+# Database session store shared by every session of the process, when configured
+_database_service: Optional[BaseSessionService] = None
+
+
+def get_runner_plugins() -> List[BasePlugin]:
+    """
+    Get the plugins every runner is created with (singleton pattern)
+    
+    Returns:
+        Configured plugins, e.g. the cassette recorder or player, the
+        prompt cache plugin and the event log
+    """
+    global _plugins
+    if _plugins is None:
+        settings = get_settings()
+        _plugins = []
+        cassette = create_cassette_plugin(settings.cassette_mode, settings.cassette_path)
+        if cassette:
+            _plugins.append(cassette)
+            logger.info(f"Cassette {settings.cassette_mode}: {settings.cassette_path}")
+        if settings.context_cache != 'off':
+            # After the cassette player, so replayed calls never create provider caches
+            _plugins.append(PromptCachePlugin(
+                explicit=settings.context_cache == 'explicit',
+                ttl=settings.context_cache_ttl,
+                min_tokens=settings.context_cache_min_tokens,
+            ))
+        event_log = get_event_log()
+        if event_log:
+            _plugins.append(EventLogPlugin(event_log))
+            logger.info(f"Event log: {settings.event_log_dir}")
+    return _plugins
+
+
+def _get_session_service() -> BaseSessionService:
+    """
+    Session store of a new session
+    
+    Returns:
+        The shared DatabaseSessionService when SESSION_DB_URL is set, so any
+        process can resume a session; otherwise a private in-memory store
+    """
+    global _database_service
+    settings = get_settings()
+    if not settings.session_db_url:
+        return InMemorySessionService()
+    if _database_service is None:
+        from google.adk.sessions import DatabaseSessionService
+
+        _database_service = DatabaseSessionService(db_url=settings.session_db_url)
+    return _database_service
+
 
 class SessionManager(BaseModel):
     """Manages session, artifacts, and runner for the application"""
     
-    session_service: InMemorySessionService
+    session_service: BaseSessionService
     artifacts_service: InMemoryArtifactService
     session: object
     runner: Optional[Runner] = None
+    target_folder: Optional[str] = None
     
     model_config = {"arbitrary_types_allowed": True}
     
@@ -33,19 +93,40 @@ class SessionManager(BaseModel):
         """
         if self.runner is None:
             settings = get_settings()
-            dev_agent = create_dev_flow_agent()
+            dev_agent = create_dev_flow_agent(self.target_folder)
             
             self.runner = Runner(
                 app_name=settings.app_name,
                 agent=dev_agent,
                 artifact_service=self.artifacts_service,
                 session_service=self.session_service,
+                plugins=get_runner_plugins(),
             )
             
             logger.info("Runner initialized successfully")
         
         return self.runner
     
+    def select_project(self, project: Optional[str] = None) -> str:
+        """
+        Switch the session to another project root
+        
+        The conversation is kept; the next turn builds the agents for the new
+        root on top of the workspace's cached toolsets for it.
+        
+        Args:
+            project: Folder name under the workspace base or absolute path
+            
+        Returns:
+            Resolved project root
+        """
+        root = get_workspace().resolve(project)
+        if root != self.target_folder:
+            self.target_folder = root
+            self.runner = None
+            logger.info(f"Session {self.session.id} switched to project {root}")
+        return root
+    
     async def cleanup(self):
         """Clean up resources"""
         try:
@@ -57,30 +138,56 @@ class SessionManager(BaseModel):
             logger.warning(f"Error during cleanup: {e}")
 
 
-async def create_session_manager() -> SessionManager:
+async def create_session_manager(
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    target_folder: Optional[str] = None
+) -> SessionManager:
     """
     Create and configure a session manager
     
+    Args:
+        session_id: Session identifier (defaults to settings)
+        user_id: User identifier (defaults to settings)
+        target_folder: Project folder for this session, a folder name under the
+            workspace base or an absolute path (defaults to the workspace base)
+        
     Returns:
         Configured SessionManager instance
     """
     settings = get_settings()
+    session_id = session_id or settings.session_id
+    user_id = user_id or settings.user_id
     
     # Create services
-    session_service = InMemorySessionService()
+    session_service = _get_session_service()
     artifacts_service = InMemoryArtifactService()
     
-    # Create session
-    session = await session_service.create_session(
+    # Resume the session from a durable store, or create it
+    session = await session_service.get_session(
         app_name=settings.app_name,
-        user_id=settings.user_id,
-        session_id=settings.session_id
+        user_id=user_id,
+        session_id=session_id
     )
-    
-    logger.info(f"Session created: {settings.session_id}")
+    if session is None and settings.event_log_dir:
+        session = await restore_session(
+            session_service, settings.app_name, user_id, session_id, settings.event_log_dir
+        )
+        if session is not None:
+            logger.info(f"Session restored from event log: {session_id} ({len(session.events)} events)")
+    if session is None:
+        session = await session_service.create_session(
+            app_name=settings.app_name,
+            user_id=user_id,
+            session_id=session_id
+        )
+        logger.info(f"Session created: {session_id}")
+    else:
+        logger.info(f"Session resumed: {session_id} ({len(session.events)} events)")
     
     return SessionManager(
         session_service=session_service,
         artifacts_service=artifacts_service,
-        session=session
+        session=session,
+        target_folder=get_workspace().resolve(target_folder)
     )
\ No newline at end of file
@@ -0,0 +1,104 @@
+"""Conversion of runner events into UI stream chunks"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterable, Optional, Set, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StreamChunk:
+    """A piece of a streamed turn, routed by kind"""
+    kind: str  # "text", "tool_call", "tool_result" or "error"
+    text: str = ''
+    name: str = ''
+    author: str = ''
+
+
+class StreamStats:
+    """Timing of a streamed turn"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queue_wait: Optional[float] = None
+        self.first_token_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.text_chunks = 0
+        self.tool_calls = 0
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        """Seconds until the first visible text, None if no text was streamed"""
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started
+
+
+def _event_text(event: Any) -> str:
+    """Visible text of an event, skipping thought parts"""
+    if not event.content or not event.content.parts:
+        return ''
+    return ''.join(part.text for part in event.content.parts if part.text and not getattr(part, 'thought', False))
+
+
+async def stream_chunks(
+    events: AsyncIterable[Any],
+    stats: Optional[StreamStats] = None
+) -> AsyncGenerator[StreamChunk, None]:
+    """
+    Turn runner events into text deltas and tool notifications
+
+    With SSE streaming the runner emits partial events carrying text deltas
+    followed by one final event that repeats the aggregated text; the
+    repeat is dropped so every token is shown exactly once. Parallel task
+    workers interleave their events, so this is tracked per author and
+    branch. Events without text (function calls/responses, state updates)
+    never break the stream.
+
+    Args:
+        events: Events from run_agent_async
+        stats: Optional StreamStats updated while streaming
+
+    Yields:
+        StreamChunk objects
+    """
+    stats = stats or StreamStats()
+    # (author, branch) pairs with deltas streamed since their last final event
+    streamed_partial: Set[Tuple[str, str]] = set()
+    try:
+        async for event in events:
+            if getattr(event, 'error_message', None):
+                yield StreamChunk('error', text=event.error_message, author=event.author)
+                continue
+            for call in event.get_function_calls():
+                stats.tool_calls += 1
+                yield StreamChunk('tool_call', name=call.name, author=event.author)
+            for response in event.get_function_responses():
+                yield StreamChunk('tool_result', name=response.name, author=event.author)
+
+            text = _event_text(event)
+            if not text:
+                continue
+            source = (event.author or '', getattr(event, 'branch', None) or '')
+            if event.partial:
+                streamed_partial.add(source)
+            elif source in streamed_partial:
+                # Aggregated copy of the deltas already streamed
+                streamed_partial.discard(source)
+                continue
+            if stats.first_token_at is None:
+                stats.first_token_at = time.perf_counter()
+                logger.info(f"Time to first token: {stats.time_to_first_token:.2f}s")
+            stats.text_chunks += 1
+            yield StreamChunk('text', text=text, author=event.author)
+    finally:
+        stats.finished_at = time.perf_counter()
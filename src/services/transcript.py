@@ -0,0 +1,154 @@
+"""Chat transcripts of the Streamlit UI, kept outside st.session_state"""
+
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+from ..config import get_settings
+
+
+SUMMARY_CHARS = 80
+MARKUP = re.compile(r'[*_`#>|]')
+
+
+@dataclass
+class TranscriptMessage:
+    """One chat bubble; body is final once the turn that produced it has finished"""
+    role: str
+    content: str = ''
+    caption: str = ''
+    final: bool = False
+    _summary: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def summary(self) -> str:
+        """First line of the message, shortened; computed once the message is final"""
+        if self._summary is not None:
+            return self._summary
+        lines = (MARKUP.sub('', line).strip(' -') for line in self.content.splitlines())
+        first = next((line for line in lines if line), '')
+        summary = first if len(first) <= SUMMARY_CHARS else first[:SUMMARY_CHARS - 1].rstrip() + '…'
+        if self.final:
+            self._summary = summary
+        return summary
+
+
+class Transcript:
+    """
+    Messages of one chat, newest last
+
+    The page only keeps the transcript id in st.session_state, so a rerun
+    does not copy or diff the conversation, and renders a window of the
+    newest messages from here. At most max_messages are kept; older ones
+    are dropped and only counted. `expired` is set on the empty transcript
+    that replaces one the store evicted, so the page can say so.
+    """
+
+    def __init__(self, transcript_id: str, max_messages: int = 1000, expired: bool = False):
+        self.id = transcript_id
+        self._messages: Deque[TranscriptMessage] = deque(maxlen=max_messages)
+        self.dropped = 0
+        self.expired = expired
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def append(self, role: str, content: str = '', final: bool = True) -> TranscriptMessage:
+        """Add a message; pass final=False for an assistant reply that is still streaming"""
+        message = TranscriptMessage(role=role, content=content, final=final)
+        with self._lock:
+            if len(self._messages) == self._messages.maxlen:
+                self.dropped += 1
+            self._messages.append(message)
+        return message
+
+    def window(self, size: int) -> Tuple[List[TranscriptMessage], List[TranscriptMessage]]:
+        """
+        Split the transcript for rendering
+
+        Args:
+            size: Number of newest messages rendered in full
+
+        Returns:
+            (older messages, shown as summaries only; newest messages)
+        """
+        with self._lock:
+            messages = list(self._messages)
+        split = max(0, len(messages) - size)
+        return messages[:split], messages[split:]
+
+
+class TranscriptStore:
+    """
+    Transcripts by id
+
+    Beyond max_transcripts, the least recently used transcripts are dropped,
+    but only those idle for idle_seconds. A page still in use is never
+    emptied, so the store can hold more while many pages are active. The
+    ids of dropped transcripts are remembered, and a page that comes back
+    to one gets an empty transcript marked `expired`.
+    """
+
+    def __init__(self, max_transcripts: int = 256, max_messages: int = 1000, idle_seconds: float = 1800.0):
+        self.max_transcripts = max_transcripts
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self._transcripts: 'OrderedDict[str, Transcript]' = OrderedDict()
+        self._evicted: 'OrderedDict[str, None]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict_idle(self, now: float):
+        while len(self._transcripts) > self.max_transcripts:
+            oldest_id, oldest = next(iter(self._transcripts.items()))
+            if now - oldest.last_used < self.idle_seconds:
+                return
+            del self._transcripts[oldest_id]
+            self._evicted[oldest_id] = None
+            while len(self._evicted) > self.max_transcripts * 4:
+                self._evicted.popitem(last=False)
+
+    def get(self, transcript_id: Optional[str] = None) -> Transcript:
+        """
+        Get a transcript, creating it if the id is unknown (or was evicted)
+
+        Args:
+            transcript_id: Id kept in the browser session; a new one when None
+
+        Returns:
+            The transcript; `expired` is True when it replaces an evicted one
+        """
+        now = time.monotonic()
+        with self._lock:
+            transcript_id = transcript_id or uuid.uuid4().hex
+            transcript = self._transcripts.get(transcript_id)
+            if transcript is None:
+                expired = transcript_id in self._evicted
+                self._evicted.pop(transcript_id, None)
+                transcript = Transcript(transcript_id, max_messages=self.max_messages, expired=expired)
+                self._transcripts[transcript_id] = transcript
+            transcript.last_used = now
+            self._transcripts.move_to_end(transcript_id)
+            self._evict_idle(now)
+            return transcript
+
+
+_transcript_store: Optional[TranscriptStore] = None
+
+
+def get_transcript_store() -> TranscriptStore:
+    """Get the process-wide transcript store (singleton pattern)"""
+    global _transcript_store
+    if _transcript_store is None:
+        settings = get_settings()
+        _transcript_store = TranscriptStore(
+            max_transcripts=settings.chat_max_transcripts,
+            max_messages=settings.chat_history_max_messages,
+            idle_seconds=settings.chat_transcript_idle_seconds,
+        )
+    return _transcript_store
@@ -0,0 +1,150 @@
+"""Cancellable turns with a deadline that reaches model calls, MCP tools and their subprocesses"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from ..config import get_settings
+from ..tools import get_workspace
+from ..tools.commands import request_cancel, set_deadline
+
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class TurnTimeout(TimeoutError):
+    """Raised from TurnHandle.events() when the turn ran past its deadline"""
+
+
+class TurnHandle:
+    """
+    One agent turn running in its own task
+
+    The runner, the model streams and the MCP tool calls of the turn are
+    all awaited inside that task, so cancel() stops them at whatever they
+    are waiting on and unwinds the workspace lease and scheduler slot on
+    the way out. The tool server of the project is then told to kill the
+    commands it started (npm etc.), unless another turn is still working
+    on the same project.
+
+    The turn's deadline is applied at three levels: model retries and rate
+    limit waits give up once it is near (set_turn_deadline), commands in the
+    tool server are killed when it passes (set_deadline), and the task
+    itself is cancelled at the deadline.
+    """
+
+    def __init__(
+        self,
+        run_agent: Callable[..., AsyncGenerator[Any, None]],
+        query: str,
+        session_manager,
+        timeout: Optional[float] = None,
+        streaming: Optional[bool] = None
+    ):
+        self.run_agent = run_agent
+        self.query = query
+        self.session_manager = session_manager
+        self.timeout = get_settings().turn_timeout if timeout is None else timeout
+        self.streaming = streaming
+        self.status = 'pending'  # running, done, failed, cancelled, timed_out
+        self.error: Optional[BaseException] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def root(self) -> str:
+        return self.session_manager.target_folder or get_workspace().base
+
+    @property
+    def finished(self) -> bool:
+        return self._task is not None and self._task.done()
+
+    def start(self) -> 'TurnHandle':
+        """Start the turn task (events() does this on first use)"""
+        if self._task is not None:
+            return self
+        self.status = 'running'
+        if self.timeout:
+            set_deadline(self.root, time.time() + self.timeout)
+            self._timer = asyncio.get_running_loop().call_later(self.timeout, self._expire)
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    def _expire(self):
+        if not self.finished:
+            logger.warning(f"Turn of session {self.session_manager.session.id} passed its {self.timeout:g}s deadline")
+            self.status = 'timed_out'
+            self._task.cancel()
+
+    async def _run(self):
+        try:
+            async for event in self.run_agent(
+                self.query, self.session_manager, raise_errors=True, streaming=self.streaming
+            ):
+                self._queue.put_nowait(event)
+            self.status = 'done'
+        except asyncio.CancelledError:
+            if self.status != 'timed_out':
+                self.status = 'cancelled'
+            # The turn's leases are released by now; stop its commands unless the project is still busy.
+            # A worker process does this itself for the turns it runs.
+            if not getattr(self.session_manager, 'pool', None) and not get_workspace().active_turns(self.root):
+                request_cancel(self.root)
+            logger.info(f"Turn of session {self.session_manager.session.id} {self.status}")
+        except Exception as e:
+            self.status = 'failed'
+            self.error = e
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._queue.put_nowait(_DONE)
+
+    def cancel(self):
+        """
+        Stop the turn
+
+        Only requests cancellation, so it is safe to call from a finally
+        block that is itself being cancelled; await wait() to let the turn
+        finish unwinding.
+        """
+        if self._task is None:
+            self.status = 'cancelled'
+            return
+        if not self._task.done():
+            self._task.cancel()
+
+    async def wait(self):
+        """Wait until the turn task has finished, whatever the outcome"""
+        if self._task is not None:
+            await asyncio.wait({self._task})
+
+    async def events(self) -> AsyncGenerator[Any, None]:
+        """
+        Events of the turn as they are produced
+
+        Leaving the iteration early (client gone, new prompt) cancels the turn.
+
+        Raises:
+            TurnTimeout: If the deadline passed
+            Exception: The error the turn failed with
+        """
+        self.start()
+        completed = False
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _DONE:
+                    break
+                yield item
+            completed = True
+        finally:
+            if not completed:
+                self.cancel()
+        if self.status == 'timed_out':
+            raise TurnTimeout(f"Turn did not finish within {self.timeout:g}s")
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,461 @@
+"""Agent turns run in a pool of worker processes, with events streamed back over local sockets"""
+
+import asyncio
+import atexit
+import importlib
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import uuid
+from multiprocessing.connection import Connection
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+from ..tools import get_workspace
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENTRY = 'main:run_agent_async'
+DEFAULT_SESSION_FACTORY = 'src.services.session_service:create_session_manager'
+# Folder holding main.py and the src package, importable from the worker
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class WorkerError(RuntimeError):
+    """A turn failed in its worker process, or the worker exited during the turn"""
+
+
+def _import(path: str):
+    module, name = path.split(':')
+    return getattr(importlib.import_module(module), name)
+
+
+# Worker process --------------------------------------------------------------
+
+def _worker_main(fd: str, entry: str, session_factory: str):
+    """Process entry point: serve the UI process's requests on the inherited socket until told to stop"""
+    from ..utils import setup_logging
+
+    conn = Connection(int(fd))
+    setup_logging()
+    asyncio.run(_serve(conn, _import(entry), _import(session_factory)))
+
+
+async def _serve(conn, run_agent, create_session):
+    from .memory import get_memory_accountant
+
+    loop = asyncio.get_running_loop()
+    inbox: asyncio.Queue = asyncio.Queue()
+    send_lock = threading.Lock()
+    managers: Dict[str, Any] = {}
+    turns: Dict[str, asyncio.Task] = {}
+
+    def send(message: Tuple):
+        with send_lock:
+            conn.send(message)
+
+    def receive():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ('stop',)
+            loop.call_soon_threadsafe(inbox.put_nowait, message)
+            if message[0] == 'stop':
+                return
+
+    async def run_turn(turn_id: str, spec: Dict[str, Any]):
+        manager = managers.get(spec['session_id'])
+        try:
+            if manager is None:
+                manager = managers[spec['session_id']] = await create_session(
+                    session_id=spec['session_id'], user_id=spec['user_id'], target_folder=spec['target_folder']
+                )
+            elif spec['target_folder'] != manager.target_folder:
+                manager.select_project(spec['target_folder'])
+            async for event in run_agent(spec['query'], manager, raise_errors=True, streaming=spec['streaming']):
+                # Serialized here, so the UI process only parses finished JSON
+                send(('event', turn_id, event.model_dump_json(exclude_none=True, by_alias=True)))
+            send(('done', turn_id, None))
+        except asyncio.CancelledError:
+            from ..tools.commands import request_cancel
+
+            root = manager.target_folder if manager is not None else spec['target_folder']
+            if root and not get_workspace().active_turns(root):
+                request_cancel(root)
+            send(('cancelled', turn_id, None))
+        except Exception as e:
+            logger.exception(f"Turn {turn_id} failed in worker")
+            send(('error', turn_id, f'{type(e).__name__}: {e}'))
+        finally:
+            turns.pop(turn_id, None)
+
+    threading.Thread(target=receive, name='tashkil-worker-inbox', daemon=True).start()
+    send(('ready', None, None))
+    while True:
+        message = await inbox.get()
+        kind = message[0]
+        if kind == 'run':
+            turns[message[1]] = asyncio.create_task(run_turn(message[1], message[2]))
+        elif kind == 'cancel':
+            task = turns.get(message[1])
+            if task is not None:
+                task.cancel()
+        elif kind == 'close':
+            manager = managers.pop(message[1], None)
+            if manager is not None:
+                await manager.cleanup()
+            get_memory_accountant().forget(message[1])
+        elif kind == 'memory':
+            send(('memory', message[1], get_memory_accountant().snapshot()))
+        elif kind == 'stop':
+            break
+    for task in list(turns.values()):
+        task.cancel()
+    await asyncio.gather(*turns.values(), return_exceptions=True)
+    await get_workspace().close_all()
+
+
+# UI process ------------------------------------------------------------------
+
+class _Worker:
+    """
+    One worker process, its socket and the turns it is running for this process
+
+    The worker is started with `python -m src.services.workers` rather than
+    multiprocessing, which would re-run the UI's main script (streamlit,
+    main.py --serve) in the child. The two ends of a Unix socket pair carry
+    pickled messages through multiprocessing Connection objects.
+    """
+
+    def __init__(self, index: int, entry: str, session_factory: str):
+        self.index = index
+        ours, theirs = socket.socketpair()
+        env = {**os.environ, 'PYTHONPATH': os.pathsep.join(filter(None, [PROJECT_DIR, os.environ.get('PYTHONPATH')]))}
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'src.services.workers', str(theirs.fileno()), entry, session_factory],
+            env=env,
+            pass_fds=[theirs.fileno()],
+        )
+        theirs.close()
+        self.conn = Connection(ours.detach())
+        self.turns: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        # Pending replies to requests that are not turns (memory snapshots)
+        self.replies: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self.completed = 0
+        self._disconnected = False
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name=f'tashkil-worker-{index}-reader', daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self._disconnected and self.process.poll() is None
+
+    def send(self, message: Tuple):
+        with self._send_lock:
+            self.conn.send(message)
+
+    def _deliver(self, turn_id: str, item: Tuple[str, Any], waiting: Optional[Dict] = None):
+        waiting = self.turns if waiting is None else waiting
+        target = waiting.get(turn_id)
+        if target is None:
+            return
+        loop, queue = target
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            # The page or request that started the turn closed its loop
+            waiting.pop(turn_id, None)
+
+    def _read(self):
+        while True:
+            try:
+                kind, turn_id, payload = self.conn.recv()
+            except (EOFError, OSError):
+                self._disconnected = True
+                break
+            if kind == 'ready':
+                logger.info(f"Agent worker {self.index} ready (pid {self.process.pid})")
+                continue
+            if kind == 'memory':
+                self._deliver(turn_id, (kind, payload), self.replies)
+                continue
+            if kind != 'event':
+                self.completed += 1
+            self._deliver(turn_id, (kind, payload))
+        for turn_id in list(self.turns):
+            self._deliver(turn_id, ('error', f'Agent worker {self.index} exited'))
+        for request_id in list(self.replies):
+            self._deliver(request_id, ('error', f'Agent worker {self.index} exited'), self.replies)
+
+    def stop(self, timeout: float = 10.0):
+        try:
+            self.send(('stop',))
+        except (OSError, ValueError):
+            pass
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.terminate()
+        self.conn.close()
+
+
+class RemoteSessionManager:
+    """
+    Stand-in for a SessionManager whose session lives in a worker process
+
+    Carries what the UI process needs (ids and the project root); the
+    runner, agents and MCP toolsets are created in the worker the session
+    is pinned to.
+    """
+
+    def __init__(self, session_id: str, user_id: str, target_folder: str, pool: 'AgentWorkerPool'):
+        self.session = SimpleNamespace(id=session_id, user_id=user_id)
+        self.target_folder = target_folder
+        self.runner = None
+        self.pool = pool
+
+    def select_project(self, project: Optional[str] = None) -> str:
+        """Switch the session to another project root; the worker picks it up on the next turn"""
+        self.target_folder = get_workspace().resolve(project)
+        return self.target_folder
+
+    async def cleanup(self):
+        """Drop the session from its worker"""
+        self.pool.close_session(self.session.id)
+
+
+class AgentWorkerPool:
+    """
+    Worker processes that run agent turns outside the UI process
+
+    Each session is pinned to one worker on its first turn (the one with
+    the fewest pinned sessions) and stays there, so its runner, agents and
+    MCP connections are built once, in that worker. Events are serialized
+    to JSON in the worker and sent back over the worker's socket; a reader
+    thread per worker hands them to the event loop of the turn that is
+    waiting for them. Model calls, tool round-trips and event
+    serialization therefore never hold the UI process's GIL.
+
+    A worker that exits fails its running turns and is replaced on next
+    use. With SESSION_DB_URL set, the replacement restores the
+    conversation from the database session store; otherwise it starts a
+    fresh conversation.
+    """
+
+    def __init__(self, workers: int, entry: str = DEFAULT_ENTRY, session_factory: str = DEFAULT_SESSION_FACTORY):
+        self.size = max(1, workers)
+        self.entry = entry
+        self.session_factory = session_factory
+        self._workers: Dict[int, _Worker] = {}
+        self._pins: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _worker(self, index: int) -> _Worker:
+        worker = self._workers.get(index)
+        if worker is None or not worker.alive:
+            if worker is not None:
+                self.restarts += 1
+                logger.warning(f"Agent worker {index} exited, starting a new one")
+                worker.conn.close()
+            worker = self._workers[index] = _Worker(index, self.entry, self.session_factory)
+        return worker
+
+    def worker_for(self, session_id: str) -> _Worker:
+        """The worker a session is pinned to, pinning it to the least loaded one on first use"""
+        with self._lock:
+            index = self._pins.get(session_id)
+            if index is None:
+                load = {i: 0 for i in range(self.size)}
+                for pinned in self._pins.values():
+                    load[pinned] += 1
+                index = self._pins[session_id] = min(load, key=lambda i: (load[i], i))
+            return self._worker(index)
+
+    def create_session(self, session_id: str, user_id: str, target_folder: Optional[str] = None) -> RemoteSessionManager:
+        return RemoteSessionManager(session_id, user_id, get_workspace().resolve(target_folder), self)
+
+    async def run(self, query: str, session_manager, streaming: Optional[bool] = None) -> AsyncGenerator[str, None]:
+        """
+        Run one turn in the session's worker
+
+        Leaving the iteration early cancels the turn in the worker.
+
+        Yields:
+            Events as JSON
+
+        Raises:
+            WorkerError: If the turn failed or its worker exited
+        """
+        worker = self.worker_for(session_manager.session.id)
+        turn_id = uuid.uuid4().hex
+        queue: asyncio.Queue = asyncio.Queue()
+        worker.turns[turn_id] = (asyncio.get_running_loop(), queue)
+        finished = False
+        try:
+            try:
+                worker.send(('run', turn_id, {
+                    'session_id': session_manager.session.id,
+                    'user_id': session_manager.session.user_id,
+                    'target_folder': session_manager.target_folder,
+                    'query': query,
+                    'streaming': streaming,
+                }))
+            except OSError as e:
+                finished = True
+                raise WorkerError(f'Agent worker {worker.index} is not reachable: {e}') from e
+            while True:
+                kind, payload = await queue.get()
+                if kind == 'event':
+                    yield payload
+                    continue
+                finished = True
+                if kind == 'error':
+                    raise WorkerError(payload)
+                return
+        finally:
+            worker.turns.pop(turn_id, None)
+            if not finished and worker.alive:
+                # Plain socket write, safe in a finally block that is being cancelled
+                try:
+                    worker.send(('cancel', turn_id))
+                except OSError:
+                    pass
+
+    def close_session(self, session_id: str):
+        with self._lock:
+            index = self._pins.pop(session_id, None)
+            worker = self._workers.get(index) if index is not None else None
+        if worker is not None and worker.alive:
+            try:
+                worker.send(('close', session_id))
+            except OSError:
+                pass
+
+    async def memory_snapshots(self, timeout: float = 5.0) -> List[Dict[str, Any]]:
+        """
+        Memory figures of each live worker, where the sessions' turns are accounted
+
+        Returns:
+            get_memory_accountant().snapshot() of each worker that replied
+            within the timeout, with the worker's index
+        """
+        loop = asyncio.get_running_loop()
+        pending = []
+        for worker in list(self._workers.values()):
+            if not worker.alive:
+                continue
+            request_id = uuid.uuid4().hex
+            queue: asyncio.Queue = asyncio.Queue()
+            worker.replies[request_id] = (loop, queue)
+            try:
+                worker.send(('memory', request_id))
+            except OSError:
+                worker.replies.pop(request_id, None)
+                continue
+            pending.append((worker, request_id, queue))
+        async def reply(worker: _Worker, request_id: str, queue: asyncio.Queue) -> Optional[Dict[str, Any]]:
+            try:
+                kind, payload = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Agent worker {worker.index} did not report its memory within {timeout}s")
+                return None
+            finally:
+                worker.replies.pop(request_id, None)
+            return {'worker': worker.index, **payload} if kind == 'memory' else None
+
+        replies = await asyncio.gather(*(reply(*request) for request in pending))
+        snapshots = [snapshot for snapshot in replies if snapshot is not None]
+        return snapshots
+
+    def shutdown(self):
+        for worker in list(self._workers.values()):
+            worker.stop()
+        self._workers.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Workers, pinned sessions and running turns for the metrics endpoint"""
+        return {
+            'size': self.size,
+            'restarts': self.restarts,
+            'workers': [
+                {
+                    'index': index,
+                    'pid': worker.process.pid,
+                    'alive': worker.alive,
+                    'sessions': sum(1 for pinned in self._pins.values() if pinned == index),
+                    'running_turns': len(worker.turns),
+                    'completed_turns': worker.completed,
+                }
+                for index, worker in sorted(self._workers.items())
+            ],
+        }
+
+
+_pool: Optional[AgentWorkerPool] = None
+
+
+def get_worker_pool() -> Optional[AgentWorkerPool]:
+    """Get the process-wide worker pool, None when AGENT_WORKERS is 0 (singleton pattern)"""
+    global _pool
+    settings = get_settings()
+    if _pool is None and settings.agent_workers > 0:
+        _pool = AgentWorkerPool(settings.agent_workers)
+        atexit.register(_pool.shutdown)
+    return _pool
+
+
+async def create_remote_session_manager(
+    session_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    target_folder: Optional[str] = None
+) -> RemoteSessionManager:
+    """
+    Create a session whose turns run in the worker pool
+
+    Same arguments as create_session_manager.
+    """
+    settings = get_settings()
+    return get_worker_pool().create_session(
+        session_id or uuid.uuid4().hex, user_id or settings.user_id, target_folder
+    )
+
+
+async def run_agent_in_worker(
+    query: str,
+    session_manager: RemoteSessionManager,
+    raise_errors: bool = False,
+    streaming: Optional[bool] = None
+):
+    """
+    Drop-in replacement for run_agent_async that runs the turn in the session's worker
+
+    Args:
+        query: User input query
+        session_manager: Session from create_remote_session_manager
+        raise_errors: Re-raise errors instead of only logging them
+        streaming: Emit partial (token-level) events; defaults to settings
+
+    Yields:
+        Runner events, rebuilt from the worker's JSON
+    """
+    from google.adk.events import Event
+
+    try:
+        async for data in session_manager.pool.run(query, session_manager, streaming):
+            yield Event.model_validate_json(data)
+    except WorkerError as e:
+        logger.error(f"Error in worker turn: {e}")
+        if raise_errors:
+            raise
+
+
+if __name__ == '__main__':
+    _worker_main(*sys.argv[1:4])
@@ -1,5 +1,31 @@
 """Tools module for MCP and other utilities"""
 
-from .mcp_tools import create_filesystem_toolset, create_react_project_toolset
+from typing import TYPE_CHECKING
 
-__all__ = ["create_filesystem_toolset", "create_react_project_toolset"]
\ No newline at end of file
+from ..utils.lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .mcp_tools import create_filesystem_toolset, create_react_project_toolset
+    from .workspace import Workspace, get_workspace
+    from .component_catalog import format_catalog, get_component_catalog
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "create_filesystem_toolset": ".mcp_tools",
+    "create_react_project_toolset": ".mcp_tools",
+    "Workspace": ".workspace",
+    "get_workspace": ".workspace",
+    "format_catalog": ".component_catalog",
+    "get_component_catalog": ".component_catalog",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "create_filesystem_toolset",
+    "create_react_project_toolset",
+    "Workspace",
+    "get_workspace",
+    "format_catalog",
+    "get_component_catalog"
+]
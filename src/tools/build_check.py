@@ -0,0 +1,239 @@
+"""Incremental type checking through a persistent TypeScript watch process"""
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# tsc output with --pretty false: "src/App.tsx(12,5): error TS2322: Type ..."
+DIAGNOSTIC_RE = re.compile(
+    r'^(?P<file>[^\s(][^(]*)\((?P<line>\d+),(?P<column>\d+)\): '
+    r'(?P<severity>error|warning) (?P<code>TS\d+): (?P<message>.*)$'
+)
+CYCLE_START_RE = re.compile(r'Starting (?:incremental )?compilation|File change detected')
+CYCLE_END_RE = re.compile(r'Found (\d+) errors?')
+
+MAX_DIAGNOSTICS = 30
+MAX_MESSAGE_CHARS = 200
+
+Diagnostic = Tuple[str, int, int, str, str]  # file, line, column, code, message
+
+
+def find_typescript_project(root: str, path: Optional[str] = None) -> Optional[str]:
+    """
+    Locate the folder holding tsconfig.json
+
+    Args:
+        root: Project root folder
+        path: Optional folder relative to root; otherwise root itself or,
+              failing that, the first direct child with a tsconfig.json
+
+    Returns:
+        Absolute folder path, or None when there is no TypeScript project
+    """
+    if path:
+        folder = os.path.abspath(os.path.join(root, path))
+        if os.path.commonpath([folder, os.path.abspath(root)]) != os.path.abspath(root):
+            return None
+        return folder if os.path.exists(os.path.join(folder, 'tsconfig.json')) else None
+    if os.path.exists(os.path.join(root, 'tsconfig.json')):
+        return os.path.abspath(root)
+    for entry in sorted(os.scandir(root), key=lambda e: e.name) if os.path.isdir(root) else []:
+        if entry.is_dir() and entry.name != 'node_modules' and os.path.exists(os.path.join(entry.path, 'tsconfig.json')):
+            return os.path.abspath(entry.path)
+    return None
+
+
+def _tsc_command(project: str) -> List[str]:
+    local = os.path.join(project, 'node_modules', '.bin', 'tsc')
+    tsc = [local] if os.path.exists(local) else [shutil.which('npx') or 'npx', '--no-install', 'tsc']
+    try:
+        with open(os.path.join(project, 'tsconfig.json'), 'r', encoding='utf-8') as f:
+            solution = '"references"' in f.read()
+    except OSError:
+        solution = False
+    # Vite templates use a solution tsconfig with references, checked in build mode
+    mode = ['-b'] if solution else ['--noEmit']
+    return tsc + mode + ['--watch', '--preserveWatchOutput', '--pretty', 'false']
+
+
+class TypeCheckWatcher:
+    """
+    Keeps `tsc --watch` running for one project and collects its diagnostics
+
+    tsc rechecks only the files affected by a change, so after the first
+    full pass a check costs roughly the time of one incremental cycle. Each
+    completed cycle replaces the current diagnostics; check() waits for the
+    cycle triggered by the latest edits and reports what changed since the
+    previous check.
+    """
+
+    def __init__(self, project: str):
+        self.project = project
+        self._process: Optional[subprocess.Popen] = None
+        self._condition = threading.Condition()
+        # Concurrent tool calls share the watcher; checks run one at a time
+        self._check_lock = threading.Lock()
+        self._pending: List[Diagnostic] = []
+        self._diagnostics: List[Diagnostic] = []
+        self._cycles = 0
+        self._started_cycles = 0
+        self._reported: set = set()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self):
+        if self.running:
+            return
+        with self._condition:
+            # A restarted tsc begins with a full pass; counts and diagnostics of the exited one would be stale
+            self._pending = []
+            self._diagnostics = []
+            self._cycles = 0
+            self._started_cycles = 0
+            self._reported = set()
+            process = self._process = subprocess.Popen(
+                _tsc_command(self.project),
+                cwd=self.project,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+            )
+        threading.Thread(target=self._read_output, args=(process,), name='tsc-watch', daemon=True).start()
+        logger.info(f"Started tsc watcher for {self.project}")
+
+    def _read_output(self, process: subprocess.Popen):
+        for line in process.stdout:
+            line = line.rstrip()
+            with self._condition:
+                if process is not self._process:
+                    # Output left over from a process that was replaced
+                    continue
+                match = DIAGNOSTIC_RE.match(line)
+                if match:
+                    self._pending.append((
+                        match['file'].replace('\\', '/'),
+                        int(match['line']),
+                        int(match['column']),
+                        match['code'],
+                        match['message'][:MAX_MESSAGE_CHARS],
+                    ))
+                elif CYCLE_START_RE.search(line):
+                    self._started_cycles += 1
+                    self._pending = []
+                elif CYCLE_END_RE.search(line):
+                    self._diagnostics = self._pending
+                    self._pending = []
+                    self._cycles += 1
+                    self._condition.notify_all()
+        with self._condition:
+            self._condition.notify_all()
+
+    def _wait(self, timeout: float, settle: float, first: bool) -> bool:
+        """
+        Wait until the edits made before this call have been checked
+
+        tsc notices file changes after a short debounce, so a cycle that
+        starts within `settle` seconds counts as the one for these edits.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            cycles = self._cycles
+            started = self._started_cycles
+            if first:
+                cycles = 0
+            # First full pass, or a cycle already running
+            if cycles == 0 or self._started_cycles > self._cycles:
+                return self._condition.wait_for(
+                    lambda: self._cycles > cycles or not self.running, max(0.0, deadline - time.monotonic())
+                ) and self.running
+            self._condition.wait_for(
+                lambda: self._started_cycles > started or not self.running, min(settle, timeout)
+            )
+            if self._started_cycles == started:
+                return self.running
+            return self._condition.wait_for(
+                lambda: self._cycles > cycles or not self.running, max(0.0, deadline - time.monotonic())
+            ) and self.running
+
+    def check(self, timeout: float = 60.0, settle: float = 0.6) -> Dict[str, Any]:
+        """
+        Report diagnostics of the current project state
+
+        Args:
+            timeout: Maximum seconds to wait for the cycle to finish
+            settle: Seconds to wait for tsc to pick up recent file changes
+
+        Returns:
+            Compact result with total errors, new diagnostics since the
+            previous check and the number fixed since then
+        """
+        with self._check_lock:
+            return self._check(timeout, settle)
+
+    def _check(self, timeout: float, settle: float) -> Dict[str, Any]:
+        started = time.monotonic()
+        first = not self.running
+        self.start()
+        if not self._wait(timeout, settle, first):
+            if not self.running:
+                return {'success': False, 'message': 'Type checker exited; is typescript installed in the project?'}
+            return {'success': False, 'message': f'Type check did not finish within {timeout:.0f}s, try again'}
+
+        with self._condition:
+            diagnostics = list(self._diagnostics)
+        current = set(diagnostics)
+        new = [d for d in diagnostics if d not in self._reported]
+        fixed = len(self._reported - current)
+        self._reported = current
+
+        return {
+            'success': True,
+            'message': 'No type errors' if not diagnostics else f'{len(diagnostics)} type errors',
+            'errors': len(diagnostics),
+            'new': [f'{file}:{line}:{column} {code} {message}' for file, line, column, code, message in new[:MAX_DIAGNOSTICS]],
+            'new_truncated': max(0, len(new) - MAX_DIAGNOSTICS),
+            'fixed': fixed,
+            'full_check': first,
+            'seconds': round(time.monotonic() - started, 2),
+        }
+
+    def stop(self):
+        if self.running:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+_watchers: Dict[str, TypeCheckWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def get_type_checker(project: str) -> TypeCheckWatcher:
+    """Get the watcher of a project folder, one per folder per process"""
+    with _watchers_lock:
+        watcher = _watchers.get(project)
+        if watcher is None:
+            watcher = TypeCheckWatcher(project)
+            _watchers[project] = watcher
+        return watcher
+
+
+def stop_type_checkers():
+    """Terminate every watcher process"""
+    for watcher in _watchers.values():
+        watcher.stop()
+    _watchers.clear()
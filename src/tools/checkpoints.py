@@ -0,0 +1,357 @@
+"""Content-addressed checkpoints of the project folder"""
+
+import difflib
+import hashlib
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .file_cache import IGNORED_DIRS
+
+
+STORE_DIR = '.tashkil'
+MAX_DIFF_LINES = 200
+
+# path -> [sha256, size, mtime_ns, mode]
+Manifest = Dict[str, List[Any]]
+
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class CheckpointStore:
+    """
+    Snapshots of a project folder, deduplicated by content
+
+    File contents are stored once per SHA-256 under objects/, and every
+    checkpoint is a manifest mapping paths to content hashes. Taking a
+    checkpoint only hashes files whose size or mtime changed since the
+    previous one, and restoring or diffing compares manifests, so disk
+    work is proportional to the files that differ. node_modules, build
+    output and the store itself are never included.
+
+    Paths written by the tools, and changes reported by the file watcher,
+    mark paths dirty. Once this store has scanned the tree, a checkpoint
+    only stats the dirty paths; without a watcher, after a watcher
+    overflow, or when another process moved the head, it walks the whole
+    tree. The log and the head's manifest are kept in memory.
+    """
+
+    def __init__(self, root: str, store: Optional[str] = None):
+        self.root = os.path.realpath(root)
+        self.store = store or os.path.join(self.root, STORE_DIR, 'checkpoints')
+        self.objects = os.path.join(self.store, 'objects')
+        self.manifests = os.path.join(self.store, 'manifests')
+        self.log_path = os.path.join(self.store, 'log.jsonl')
+        self.watched = False
+        self._dirty: Set[str] = set()
+        self._rescan = False
+        # Head whose manifest matched the tree when the dirty set was last emptied
+        self._synced: Optional[str] = None
+        self._log: List[Dict[str, Any]] = []
+        self._log_offset = 0
+        self._head_manifest: Tuple[Optional[str], Manifest] = (None, {})
+        self._lock = threading.Lock()
+
+    # Changes -------------------------------------------------------------
+
+    def mark_dirty(self, path: str):
+        """File watcher and tool callback: a file or directory changed"""
+        with self._lock:
+            self._dirty.add(os.path.realpath(path))
+
+    def mark_all_dirty(self):
+        """File watcher overflow: changes were lost, scan the whole tree"""
+        with self._lock:
+            self._rescan = True
+
+    def _changes(self, head: Optional[str], consume: bool) -> Tuple[Optional[Set[str]], bool]:
+        """Dirty paths since the head was recorded, or None when the whole tree must be scanned"""
+        with self._lock:
+            dirty = self._dirty if consume else set(self._dirty)
+            rescan = self._rescan or not self.watched or head is None or head != self._synced
+            if consume:
+                self._dirty, self._rescan = set(), False
+        return (None if rescan else dirty), rescan
+
+    # Objects -------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def _store_file(self, path: str) -> str:
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            _atomic_write(object_path, zlib.compress(data, 6))
+        return digest
+
+    def _load_object(self, digest: str) -> bytes:
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    # Manifests -----------------------------------------------------------
+
+    def _load_manifest(self, checkpoint_id: str) -> Manifest:
+        path = os.path.join(self.manifests, f'{checkpoint_id}.json')
+        if not os.path.exists(path):
+            raise ValueError(f'Unknown checkpoint {checkpoint_id}')
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _manifest(self, checkpoint_id: Optional[str]) -> Manifest:
+        """Manifest of a checkpoint, the head's from memory"""
+        if checkpoint_id is None:
+            return {}
+        cached_id, manifest = self._head_manifest
+        if cached_id == checkpoint_id:
+            return manifest
+        return self._load_manifest(checkpoint_id)
+
+    def history(self) -> List[Dict[str, Any]]:
+        """Checkpoint records, oldest first"""
+        with self._lock:
+            # Only the lines appended since the last call (possibly by another process) are read
+            try:
+                size = os.path.getsize(self.log_path)
+            except OSError:
+                size = 0
+            if size < self._log_offset:
+                self._log, self._log_offset = [], 0
+            if size > self._log_offset:
+                with open(self.log_path, 'rb') as f:
+                    f.seek(self._log_offset)
+                    data = f.read(size - self._log_offset)
+                complete = data.rfind(b'\n') + 1
+                self._log.extend(json.loads(line) for line in data[:complete].splitlines() if line.strip())
+                self._log_offset += complete
+            return list(self._log)
+
+    def head(self) -> Optional[str]:
+        records = self.history()
+        return records[-1]['id'] if records else None
+
+    def _ignored(self, relative: str) -> bool:
+        parts = relative.split('/')
+        return (relative == '..' or relative.startswith('../')
+                or any(part in IGNORED_DIRS or part == STORE_DIR for part in parts)
+                or parts[-1].startswith('.tashkil-'))
+
+    def _files(self, top: str) -> Iterable[str]:
+        for directory, dirs, files in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS and d != STORE_DIR]
+            for name in files:
+                yield os.path.join(directory, name)
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _update(self, manifest: Manifest, previous: Manifest, path: str) -> Optional[str]:
+        """Record one file's current state in the manifest, or drop it when it is gone"""
+        relative = self._relative(path)
+        try:
+            info = os.lstat(path)
+        except OSError:
+            manifest.pop(relative, None)
+            return None
+        if not stat.S_ISREG(info.st_mode) or self._ignored(relative):
+            manifest.pop(relative, None)
+            return None
+        known = previous.get(relative)
+        if known and known[1] == info.st_size and known[2] == info.st_mtime_ns:
+            digest = known[0]
+        else:
+            digest = self._store_file(path)
+        manifest[relative] = [digest, info.st_size, info.st_mtime_ns, stat.S_IMODE(info.st_mode)]
+        return relative
+
+    def _scan(self, previous: Manifest, dirty: Optional[Set[str]] = None) -> Manifest:
+        """
+        Manifest of the working tree, reusing hashes of unchanged files
+
+        Args:
+            previous: Manifest to compare sizes and mtimes with
+            dirty: Only check these paths and keep the rest of `previous`;
+                   None walks the whole tree
+        """
+        if dirty is None:
+            manifest: Manifest = {}
+            for path in self._files(self.root):
+                self._update(manifest, previous, path)
+            return manifest
+        manifest = dict(previous)
+        for path in sorted(dirty):
+            relative = self._relative(path)
+            if relative == '.':
+                return self._scan(previous)
+            if self._ignored(relative):
+                continue
+            prefix = relative + '/'
+            present = set()
+            if os.path.isdir(path):
+                present = {self._update(manifest, previous, child) for child in self._files(path)}
+            else:
+                self._update(manifest, previous, path)
+            # A removed or replaced directory shows up as one path; drop what is no longer below it
+            for stale in [r for r in manifest if r.startswith(prefix) and r not in present]:
+                del manifest[stale]
+        return manifest
+
+    def checkpoint(self, label: str = '') -> Dict[str, Any]:
+        """
+        Record the current state of the project
+
+        Args:
+            label: Short description, e.g. the module that was just built
+
+        Returns:
+            Checkpoint record; when nothing changed since the last
+            checkpoint that one is returned with "unchanged": True
+        """
+        head = self.head()
+        dirty, rescan = self._changes(head, consume=True)
+        try:
+            previous = self._manifest(head)
+            manifest = self._scan(previous, dirty)
+            content = json.dumps({path: entry[0] for path, entry in sorted(manifest.items())}).encode('utf-8')
+            checkpoint_id = hashlib.sha256(content).hexdigest()[:12]
+            if checkpoint_id == head:
+                self._synced = head
+                return {**self.history()[-1], 'unchanged': True}
+
+            changes = self._compare(previous, manifest)
+            _atomic_write(os.path.join(self.manifests, f'{checkpoint_id}.json'), json.dumps(manifest).encode('utf-8'))
+            record = {
+                'id': checkpoint_id,
+                'parent': head,
+                'label': label[:200],
+                'created': time.time(),
+                'files': len(manifest),
+                'added': len(changes['added']),
+                'modified': len(changes['modified']),
+                'deleted': len(changes['deleted']),
+            }
+            os.makedirs(self.store, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        except BaseException:
+            # Nothing was recorded; the next checkpoint must see these changes again
+            with self._lock:
+                self._dirty |= dirty or set()
+                self._rescan = self._rescan or rescan
+            raise
+        self._head_manifest = (checkpoint_id, manifest)
+        self._synced = checkpoint_id
+        return record
+
+    @staticmethod
+    def _compare(old: Manifest, new: Manifest) -> Dict[str, List[str]]:
+        return {
+            'added': sorted(path for path in new if path not in old),
+            'modified': sorted(path for path in new if path in old and new[path][0] != old[path][0]),
+            'deleted': sorted(path for path in old if path not in new),
+        }
+
+    def diff(self, from_id: str, to_id: Optional[str] = None, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Compare two checkpoints, or a checkpoint with the working tree
+
+        Args:
+            from_id: Older checkpoint
+            to_id: Newer checkpoint (defaults to the current files)
+            path: Also return a unified diff of this one file
+
+        Returns:
+            Added, modified and deleted paths, plus the file diff if asked
+        """
+        old = self._load_manifest(from_id)
+        if to_id:
+            new = self._load_manifest(to_id)
+        else:
+            head = self.head()
+            dirty, _ = self._changes(head, consume=False)
+            new = self._scan(self._manifest(head) if head else old, dirty)
+        result: Dict[str, Any] = {'from': from_id, 'to': to_id or 'working tree', **self._compare(old, new)}
+        if path:
+            before = self._load_object(old[path][0]).decode('utf-8', errors='replace') if path in old else ''
+            after = self._load_object(new[path][0]).decode('utf-8', errors='replace') if path in new else ''
+            lines = list(difflib.unified_diff(
+                before.splitlines(keepends=True), after.splitlines(keepends=True),
+                fromfile=f'a/{path}', tofile=f'b/{path}',
+            ))
+            result['diff'] = ''.join(lines[:MAX_DIFF_LINES])
+            result['diff_truncated'] = len(lines) > MAX_DIFF_LINES
+        return result
+
+    def restore(self, checkpoint_id: str, on_change: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Bring the project back to a checkpoint
+
+        The current state is checkpointed first, so a restore can itself be
+        undone. Only files that differ from the checkpoint are rewritten or
+        removed, and directories left empty by the removals are removed too.
+
+        Args:
+            checkpoint_id: Checkpoint to restore
+            on_change: Optional callable(path) invoked for every touched file
+
+        Returns:
+            Restored, removed paths and the id of the pre-restore checkpoint
+        """
+        target = self._load_manifest(checkpoint_id)
+        backup = self.checkpoint(f'before restore of {checkpoint_id}')
+        current = self._manifest(backup['id'])
+        changes = self._compare(current, target)
+
+        for relative in changes['added'] + changes['modified']:
+            digest, _, _, mode = target[relative]
+            path = os.path.join(self.root, relative)
+            _atomic_write(path, self._load_object(digest))
+            os.chmod(path, mode)
+            self.mark_dirty(path)
+            if on_change:
+                on_change(path)
+        for relative in changes['deleted']:
+            path = os.path.join(self.root, relative)
+            if os.path.exists(path):
+                os.unlink(path)
+            self.mark_dirty(path)
+            if on_change:
+                on_change(path)
+            self._remove_empty_parents(path)
+
+        # Record the restored state so the next checkpoint diffs against it
+        record = self.checkpoint(f'restored {checkpoint_id}')
+        return {
+            'restored': changes['added'] + changes['modified'],
+            'removed': changes['deleted'],
+            'backup': backup['id'],
+            'checkpoint': record['id'],
+        }
+
+    def _remove_empty_parents(self, path: str):
+        """Remove the directories above a removed file that are now empty, up to the project root"""
+        directory = os.path.dirname(path)
+        while directory != self.root and directory.startswith(self.root + os.sep):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return
+            directory = os.path.dirname(directory)
@@ -0,0 +1,268 @@
+"""Trigram index for literal and regular expression search over the project tree"""
+
+import fnmatch
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from .file_cache import IGNORED_DIRS
+
+
+MAX_FILE_BYTES = 1024 * 1024
+MAX_LINE_CHARS = 200
+DEFAULT_LIMIT = 50
+DEFINITION_RE = r'\b(?:export|function|const|let|var|class|interface|type|enum|def)\s+(?:default\s+)?{name}\b'
+
+
+def trigrams(text: str) -> Set[str]:
+    """Lowercased three-character substrings of a text"""
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _literal_runs(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Substrings every match of a regular expression must contain
+
+    Only literal characters that are concatenated at the top level (or
+    inside plain groups) count; alternations, classes and optional parts
+    end a run. An empty list means the index cannot narrow the search.
+    """
+    runs: List[str] = []
+    current: List[str] = []
+
+    def flush():
+        if current:
+            runs.append(''.join(current))
+            current.clear()
+
+    def walk(items):
+        for op, value in items:
+            name = str(op)
+            if name == 'LITERAL':
+                current.append(chr(value))
+            elif name == 'SUBPATTERN':
+                walk(value[-1])
+            elif name in ('MAX_REPEAT', 'MIN_REPEAT') and value[0] >= 1:
+                # The first repetition is required; anything after it is not contiguous
+                flush()
+                walk(value[2])
+                flush()
+            elif name == 'AT':
+                continue
+            else:
+                flush()
+
+    try:
+        walk(sre_parse.parse(pattern, flags))
+    except (re.error, TypeError, ValueError):
+        return []
+    flush()
+    return [run for run in runs if len(run) >= 3]
+
+
+class TrigramIndex:
+    """
+    Trigram index of the text files below a project root
+
+    Each file's lowercased trigrams are posted to an inverted index, so a
+    query reads only files that contain every trigram of its literal parts
+    before the exact pattern is checked line by line. File contents are
+    not kept in memory. Changes reported by the file watcher mark paths
+    dirty; dirty paths are reindexed at the start of the next search, so
+    an edit costs one file read. Without a watcher every search first
+    compares the tree's mtimes with the index.
+    """
+
+    def __init__(self, root: str, max_file_bytes: int = MAX_FILE_BYTES):
+        self.root = os.path.realpath(root)
+        self.max_file_bytes = max_file_bytes
+        self.watched = False
+        self._files: Dict[str, Tuple[int, int, Set[str]]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._dirty: Set[str] = set()
+        self._built = False
+        self._rescan = False
+        self._lock = threading.Lock()
+        self.stats = {'files': 0, 'trigrams': 0, 'reindexed': 0, 'searches': 0}
+
+    # Maintenance ---------------------------------------------------------
+
+    def mark_dirty(self, path: str):
+        """File watcher callback: a file or directory changed"""
+        with self._lock:
+            self._dirty.add(os.path.realpath(path))
+
+    def mark_all_dirty(self):
+        """File watcher overflow: changes were lost, compare the whole tree"""
+        with self._lock:
+            self._rescan = True
+
+    def _walk(self, top: str) -> Iterable[str]:
+        for directory, dirs, files in os.walk(top):
+            dirs[:] = [d for d in dirs if d not in IGNORED_DIRS]
+            for name in files:
+                yield os.path.join(directory, name)
+
+    def _ignored(self, path: str) -> bool:
+        relative = os.path.relpath(path, self.root)
+        return relative.startswith('..') or any(part in IGNORED_DIRS for part in relative.split(os.sep))
+
+    def _remove(self, relative: str):
+        entry = self._files.pop(relative, None)
+        if entry is None:
+            return
+        for gram in entry[2]:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(relative)
+                if not posting:
+                    del self._postings[gram]
+
+    def _update(self, path: str):
+        """Index, reindex or drop one file depending on its current state"""
+        relative = os.path.relpath(path, self.root)
+        try:
+            info = os.stat(path)
+        except OSError:
+            self._remove(relative)
+            return
+        known = self._files.get(relative)
+        if known and known[0] == info.st_mtime_ns and known[1] == info.st_size:
+            return
+        self._remove(relative)
+        if info.st_size > self.max_file_bytes:
+            return
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        if b'\0' in data[:8192]:
+            return
+        grams = trigrams(data.decode('utf-8', errors='replace'))
+        self._files[relative] = (info.st_mtime_ns, info.st_size, grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(relative)
+        self.stats['reindexed'] += 1
+
+    def _sync_tree(self):
+        present = set()
+        for path in self._walk(self.root):
+            present.add(os.path.relpath(path, self.root))
+            self._update(path)
+        for relative in [r for r in self._files if r not in present]:
+            self._remove(relative)
+
+    def refresh(self):
+        """Bring the index up to date with the tree"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rescan = self._rescan or not self._built or not self.watched
+            self._rescan = False
+            if rescan:
+                self._sync_tree()
+                self._built = True
+            else:
+                for path in dirty:
+                    if self._ignored(path):
+                        continue
+                    if os.path.isdir(path):
+                        for child in self._walk(path):
+                            self._update(child)
+                    else:
+                        # A removed directory shows up as one path; drop everything below it
+                        prefix = os.path.relpath(path, self.root) + os.sep
+                        for relative in [r for r in self._files if r.startswith(prefix)]:
+                            self._remove(relative)
+                        self._update(path)
+            self.stats['files'] = len(self._files)
+            self.stats['trigrams'] = len(self._postings)
+
+    # Search --------------------------------------------------------------
+
+    def _candidates(self, literals: List[str]) -> List[str]:
+        with self._lock:
+            if not literals:
+                return sorted(self._files)
+            result: Optional[Set[str]] = None
+            for gram in sorted(set().union(*(trigrams(literal) for literal in literals)),
+                               key=lambda g: len(self._postings.get(g, ()))):
+                posting = self._postings.get(gram, set())
+                result = set(posting) if result is None else result & posting
+                if not result:
+                    return []
+            return sorted(result or [])
+
+    def search(
+        self,
+        query: str,
+        regex: bool = False,
+        case_sensitive: bool = False,
+        path_glob: Optional[str] = None,
+        limit: int = DEFAULT_LIMIT
+    ) -> Dict[str, Any]:
+        """
+        Find lines matching a literal string or a regular expression
+
+        Args:
+            query: Text or pattern to look for
+            regex: Treat query as a Python regular expression
+            case_sensitive: Match case exactly
+            path_glob: Only search paths matching this glob, e.g. "src/**/*.tsx"
+            limit: Maximum number of matching lines returned
+
+        Returns:
+            Matches as "path:line: text", grouped by file in rank order
+            (definitions, then files with the most hits), and counts
+        """
+        self.refresh()
+        self.stats['searches'] += 1
+        flags = 0 if case_sensitive else re.IGNORECASE
+        pattern = re.compile(query if regex else re.escape(query), flags)
+        literals = _literal_runs(query, flags) if regex else ([query] if len(query) >= 3 else [])
+        candidates = self._candidates(literals)
+        if path_glob:
+            candidates = [r for r in candidates if fnmatch.fnmatch(r.replace(os.sep, '/'), path_glob)]
+
+        name = re.escape(query) if not regex else None
+        definition = re.compile(DEFINITION_RE.format(name=name), flags) if name and re.fullmatch(r'\w+', query) else None
+
+        ranked = []
+        for relative in candidates:
+            try:
+                with open(os.path.join(self.root, relative), 'r', encoding='utf-8', errors='replace') as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                continue
+            hits = [(number, line) for number, line in enumerate(lines, 1) if pattern.search(line)]
+            if not hits:
+                continue
+            defines = definition is not None and any(definition.search(line) for _, line in hits)
+            in_name = bool(pattern.search(os.path.basename(relative)))
+            score = (defines, in_name, len(hits), -relative.count(os.sep))
+            ranked.append((score, relative, hits))
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        matches = []
+        total = 0
+        for _, relative, hits in ranked:
+            total += len(hits)
+            for number, line in hits:
+                if len(matches) < limit:
+                    matches.append(f"{relative}:{number}: {line.strip()[:MAX_LINE_CHARS]}")
+        return {
+            'query': query,
+            'matches': matches,
+            'files_matched': len(ranked),
+            'total_matches': total,
+            'truncated': total > len(matches),
+            'files_scanned': len(candidates),
+            'files_indexed': self.stats['files'],
+        }
@@ -0,0 +1,142 @@
+"""Subprocesses of tools that stop when their turn is cancelled or runs out of time"""
+
+import json
+import os
+import signal
+import subprocess
+import time
+from typing import List, Optional
+
+
+CONTROL_DIR = '.tashkil'
+CANCEL_FILE = 'cancel'
+DEADLINE_FILE = 'deadline.json'
+POLL_INTERVAL = 0.25
+
+
+class CommandResult:
+    """Outcome of run_command, shaped like subprocess.CompletedProcess"""
+
+    def __init__(self, args: List[str], returncode: int, stdout: str, stderr: str, stopped: Optional[str] = None):
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        # "cancelled" or "deadline" when the command was killed
+        self.stopped = stopped
+
+
+def _control_path(root: str, name: str) -> str:
+    return os.path.join(root, CONTROL_DIR, name)
+
+
+def request_cancel(root: str):
+    """
+    Ask the tool server of a project to kill the commands it is running
+
+    Commands started before this call are stopped; later ones are not
+    affected, so the marker never needs to be removed.
+
+    Args:
+        root: Project root the tool server works in
+    """
+    path = _control_path(root, CANCEL_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(str(time.time()))
+
+
+def set_deadline(root: str, deadline: float):
+    """
+    Publish the wall-clock time by which a turn on this project must finish
+
+    An existing deadline that is later and still ahead is kept, since
+    another turn on the same project may still be running.
+
+    Args:
+        root: Project root the tool server works in
+        deadline: time.time() value
+    """
+    current = read_deadline(root)
+    if current is not None and current > deadline and current > time.time():
+        return
+    path = _control_path(root, DEADLINE_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'deadline': deadline}, f)
+
+
+def read_deadline(root: str) -> Optional[float]:
+    try:
+        with open(_control_path(root, DEADLINE_FILE), 'r', encoding='utf-8') as f:
+            return float(json.load(f)['deadline'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _cancelled_since(root: str, started: float) -> bool:
+    try:
+        return os.path.getmtime(_control_path(root, CANCEL_FILE)) >= started
+    except OSError:
+        return False
+
+
+def _kill(process: subprocess.Popen):
+    """Stop the command and everything it spawned (npm runs scripts in child processes)"""
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=3)
+    except ProcessLookupError:
+        return
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def run_command(args: List[str], cwd: str, root: Optional[str] = None, timeout: Optional[float] = None) -> CommandResult:
+    """
+    Run a command like subprocess.run(capture_output=True, text=True), but stoppable
+
+    The command runs in its own process group. It is killed when the turn
+    that started it is cancelled (request_cancel), when the turn deadline
+    published for the project passes, or after timeout seconds.
+
+    Args:
+        args: Command and arguments
+        cwd: Working directory
+        root: Project root whose cancel marker and deadline apply (defaults to cwd)
+        timeout: Optional upper bound in seconds
+
+    Returns:
+        CommandResult with output, exit status and why it was stopped, if it was
+    """
+    root = root or cwd
+    started = time.time()
+    limit = started + timeout if timeout else None
+    deadline = read_deadline(root)
+    if deadline is not None and deadline > started and (limit is None or deadline < limit):
+        limit = deadline
+    process = subprocess.Popen(
+        args,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    stopped = None
+    stdout = stderr = ''
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        if _cancelled_since(root, started):
+            stopped = 'cancelled'
+        elif limit is not None and time.time() >= limit:
+            stopped = 'deadline'
+        if stopped:
+            _kill(process)
+            stdout, stderr = process.communicate()
+            break
+    return CommandResult(args, process.returncode, stdout or '', stderr or '', stopped)
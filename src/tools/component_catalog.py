@@ -0,0 +1,302 @@
+"""Manifest of the UI components shipped with the React project template"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FORMAT = 1
+SCANNED_DIRS = ('src/components', 'src/hooks')
+SOURCE_EXTENSIONS = ('.tsx', '.ts', '.jsx', '.js')
+SKIPPED_SUFFIXES = ('.test.tsx', '.test.ts', '.stories.tsx', '.d.ts')
+
+EXPORT_DECLARATION = re.compile(r'^export\s+(?:default\s+)?(?:async\s+)?(?:function|const|let|class)\s+(\w+)', re.M)
+EXPORT_LIST = re.compile(r'^export\s*\{([^}]*)\}', re.M)
+CVA_CALL = re.compile(r'\bconst\s+(\w+)\s*=\s*cva\s*\(')
+PROPS_DECLARATION = re.compile(r'^\s*(?:export\s+)?(?:interface|type)\s+(\w+Props)\b([^{}=;"\']*?)(?:=\s*([^{};"\']*?))?\{', re.M)
+OBJECT_KEY = re.compile(r'["\']?([\w-]+)["\']?\s*\??\s*:')
+ALIAS_PATH = re.compile(r'"(@[\w-]*)/\*"\s*:\s*\[\s*"(?:\./)?src/\*"')
+
+
+def _matching_brace(text: str, start: int) -> int:
+    """Index of the brace closing the one at start, skipping strings and template literals"""
+    depth = 0
+    quote = None
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '"\'`':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text) - 1
+
+
+def _top_level_keys(body: str) -> List[str]:
+    """Keys of an object literal or type body, ignoring nested objects and string contents"""
+    keys = []
+    depth = 0
+    quote = None
+    segment_start = 0
+    text = body + ','
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'`':
+            quote = char
+        elif char in '{([<':
+            depth += 1
+        elif char in '})]' or (char == '>' and text[i - 1] != '='):
+            depth -= 1
+        elif char in ',;\n' and depth == 0:
+            match = OBJECT_KEY.match(body[segment_start:i].strip())
+            if match and match.group(1) not in keys:
+                keys.append(match.group(1))
+            segment_start = i + 1
+    return keys
+
+
+def _object_after(text: str, key: str, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+    """Body of the object literal assigned to key, e.g. variants: { ... }"""
+    match = re.compile(rf'\b{key}\s*:\s*\{{').search(text, start, end if end is not None else len(text))
+    if not match:
+        return None
+    opening = match.end() - 1
+    return text[opening + 1:_matching_brace(text, opening)]
+
+
+def _exports(source: str) -> List[str]:
+    names = EXPORT_DECLARATION.findall(source)
+    for group in EXPORT_LIST.findall(source):
+        for item in group.split(','):
+            item = item.strip()
+            if not item or item.startswith('type '):
+                continue
+            names.append(item.split(' as ')[-1].strip())
+    return list(dict.fromkeys(names))
+
+
+def _variants(source: str) -> Dict[str, Dict[str, Any]]:
+    """Variant options and defaults of every cva() call"""
+    result = {}
+    for match in CVA_CALL.finditer(source):
+        opening = source.find('{', match.end())
+        if opening < 0:
+            continue
+        closing = _matching_brace(source, opening)
+        variants = _object_after(source, 'variants', opening, closing)
+        if variants is None:
+            continue
+        defaults_body = _object_after(source, 'defaultVariants', opening, closing) or ''
+        defaults = dict(re.findall(r'(\w+)\s*:\s*["\']([\w-]+)["\']', defaults_body))
+        options = {}
+        for name in _top_level_keys(variants):
+            body = _object_after(variants, re.escape(name))
+            options[name] = _top_level_keys(body) if body is not None else []
+        result[match.group(1)] = {'options': options, 'defaults': defaults}
+    return result
+
+
+def _props(source: str) -> Dict[str, Dict[str, Any]]:
+    """Own props and base types of every *Props interface or type"""
+    result = {}
+    for match in PROPS_DECLARATION.finditer(source):
+        opening = match.end() - 1
+        body = source[opening + 1:_matching_brace(source, opening)]
+        heritage = (match.group(2) or '') + ' ' + (match.group(3) or '')
+        bases = [
+            base.strip() for base in re.split(r',|&', re.sub(r'^\s*extends\s+', '', heritage.strip()))
+            if base.strip()
+        ]
+        result[match.group(1)] = {'props': _top_level_keys(body), 'extends': bases}
+    return result
+
+
+def _import_alias(template: str) -> Optional[str]:
+    """Path alias mapped to src/ in the template's tsconfig, usually "@" """
+    for name in ('tsconfig.json', 'tsconfig.app.json', 'jsconfig.json'):
+        try:
+            with open(os.path.join(template, name), 'r', encoding='utf-8') as f:
+                match = ALIAS_PATH.search(f.read())
+        except OSError:
+            continue
+        if match:
+            return match.group(1)
+    return None
+
+
+def _source_files(template: str) -> Iterable[Tuple[str, str]]:
+    for scanned in SCANNED_DIRS:
+        top = os.path.join(template, scanned)
+        for directory, dirs, files in os.walk(top):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(SOURCE_EXTENSIONS) and not name.endswith(SKIPPED_SUFFIXES):
+                    path = os.path.join(directory, name)
+                    yield os.path.relpath(path, template).replace(os.sep, '/'), path
+
+
+def template_hash(template: str) -> str:
+    """Content hash of the scanned template sources and tsconfig, the catalog version"""
+    digest = hashlib.sha256()
+    sources = list(_source_files(template))
+    for name in ('tsconfig.json', 'tsconfig.app.json', 'jsconfig.json'):
+        if os.path.exists(os.path.join(template, name)):
+            sources.append((name, os.path.join(template, name)))
+    for relative, path in sources:
+        digest.update(relative.encode('utf-8') + b'\0')
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def build_catalog(template: str) -> Dict[str, Any]:
+    """
+    Scan the template's components and hooks
+
+    Args:
+        template: Root of the React project template
+
+    Returns:
+        Manifest with one entry per source file: import path, exports,
+        cva variants and *Props declarations
+    """
+    alias = _import_alias(template)
+    components = []
+    for relative, path in _source_files(template):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            source = f.read()
+        exports = _exports(source)
+        if not exports:
+            continue
+        module = os.path.splitext(relative)[0]
+        if module.endswith('/index'):
+            module = module[:-len('/index')]
+        components.append({
+            'name': os.path.basename(module),
+            'path': relative,
+            'import': f"{alias}/{module[len('src/'):]}" if alias else f"./{module[len('src/'):]}",
+            'exports': exports,
+            'variants': _variants(source),
+            'props': _props(source),
+        })
+    return {
+        'format': CATALOG_FORMAT,
+        'version': template_hash(template),
+        'components': components,
+    }
+
+
+def format_catalog(catalog: Dict[str, Any]) -> str:
+    """
+    One compact line per component, for the agent instruction
+
+    The text has no braces: ADK reads {name} in an instruction as a session
+    state placeholder, so `import { Label }` would fail every model call.
+
+    Args:
+        catalog: Manifest from build_catalog()
+
+    Returns:
+        Lines like `button: Button, buttonVariants from "@/components/ui/button"; variant=default*|outline; props asChild`
+    """
+    lines = []
+    for component in catalog.get('components', []):
+        parts = [f"{component['name']}: {', '.join(component['exports'])} from \"{component['import']}\""]
+        for variants in component['variants'].values():
+            for name, options in variants['options'].items():
+                default = variants['defaults'].get(name)
+                parts.append(f"{name}=" + '|'.join(f'{option}*' if option == default else option for option in options))
+        own_props = [prop for props in component['props'].values() for prop in props['props']]
+        if own_props:
+            parts.append('props ' + ', '.join(dict.fromkeys(own_props)))
+        lines.append('; '.join(parts))
+    return '\n'.join(lines)
+
+
+def load_catalog(template: str, path: str) -> Dict[str, Any]:
+    """
+    Read the manifest written for the current template, rebuilding it if the template changed
+
+    Args:
+        template: Root of the React project template
+        path: Manifest file
+
+    Returns:
+        Manifest, empty when the template does not exist
+    """
+    if not os.path.isdir(template):
+        return {'format': CATALOG_FORMAT, 'version': None, 'components': []}
+    version = template_hash(template)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        if catalog.get('version') == version and catalog.get('format') == CATALOG_FORMAT:
+            return catalog
+    except (OSError, ValueError):
+        pass
+    catalog = build_catalog(template)
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(catalog, f, indent=1)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write component catalog {path}: {e}")
+    logger.info(f"Built component catalog {catalog['version']} ({len(catalog['components'])} components)")
+    return catalog
+
+
+_catalogs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_component_catalog(template: Optional[str] = None, path: Optional[str] = None) -> Dict[str, Any]:
+    """Get the template's component manifest, loaded once per process (singleton pattern)"""
+    if template is None or path is None:
+        from ..config import get_settings
+        settings = get_settings()
+        template = template or settings.parent_project_path
+        path = path or settings.component_catalog_path
+    key = (os.path.abspath(template), os.path.abspath(path))
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = load_catalog(*key)
+        return _catalogs[key]
+
+
+def main(argv: Optional[List[str]] = None):
+    """Build step: python -m src.tools.component_catalog [--template DIR] [--output FILE]"""
+    from ..config import get_settings
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description='Build the UI component catalog of the React template')
+    parser.add_argument('--template', default=settings.parent_project_path)
+    parser.add_argument('--output', default=settings.component_catalog_path)
+    args = parser.parse_args(argv)
+    catalog = load_catalog(os.path.abspath(args.template), os.path.abspath(args.output))
+    print(f"{args.output}: version {catalog['version']}, {len(catalog['components'])} components")
+
+
+if __name__ == '__main__':
+    main()
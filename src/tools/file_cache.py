@@ -0,0 +1,245 @@
+"""Read-through file content cache with inotify based invalidation"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .file_ops import MAX_READ_BYTES
+
+
+logger = logging.getLogger(__name__)
+
+IGNORED_DIRS = {'node_modules', '.git', 'dist', 'build', '.vite', '.next', '__pycache__', '.tashkil'}
+
+
+class FileReadCache:
+    """
+    Size-bounded LRU cache of file contents
+
+    Entries are validated against mtime and size on every lookup, so the
+    cache never serves stale content even without a watcher. The watcher
+    only evicts changed entries early to free memory and to catch writes
+    that keep the same mtime and size. Sizes and limits are in bytes of the
+    file, not characters of the decoded text.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        # path -> (mtime_ns, size, text, truncated, bytes read)
+        self._entries: "OrderedDict[str, Tuple[int, int, str, bool, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def read(self, path: str, max_bytes: int = MAX_READ_BYTES) -> Tuple[str, bool]:
+        """
+        Read a file through the cache
+
+        Args:
+            path: Absolute file path
+            max_bytes: Size limit, larger files are truncated
+
+        Returns:
+            (text, truncated)
+        """
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            # The whole file within the limit, or a cut at the same limit
+            if (entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size
+                    and (entry[4] == max_bytes if entry[3] else entry[4] <= max_bytes)):
+                self._entries.move_to_end(path)
+                self.stats['hits'] += 1
+                return entry[2], entry[3]
+            self.stats['misses'] += 1
+
+        with open(path, 'rb') as f:
+            data = f.read(max_bytes + 1)
+        truncated = len(data) > max_bytes
+        data = data[:max_bytes]
+        text = data.decode('utf-8', errors='replace')
+
+        with self._lock:
+            self._drop(path)
+            size = len(data)
+            if size <= self.max_bytes:
+                self._entries[path] = (st.st_mtime_ns, st.st_size, text, truncated, size)
+                self.current_bytes += size
+                while self.current_bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._drop(oldest)
+                    self.stats['evictions'] += 1
+        return text, truncated
+
+    def _drop(self, path: str) -> bool:
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return False
+        self.current_bytes -= entry[4]
+        return True
+
+    def invalidate(self, path: str):
+        """Drop a file, or every file below a directory"""
+        prefix = path.rstrip(os.sep) + os.sep
+        with self._lock:
+            if self._drop(path):
+                self.stats['invalidations'] += 1
+            for cached in [p for p in self._entries if p.startswith(prefix)]:
+                self._drop(cached)
+                self.stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self.stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def info(self) -> Dict[str, int]:
+        """Cache counters and occupancy"""
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self.current_bytes}
+
+
+class InotifyWatcher:
+    """
+    Recursive inotify watcher that reports changed paths to a callback
+
+    Linux only; start() returns False elsewhere and the cache then relies
+    on its mtime/size validation alone.
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, root: str, on_change: Callable[[str], None], on_overflow: Optional[Callable[[], None]] = None):
+        self.root = os.path.realpath(root)
+        self._listeners: List[Tuple[Callable[[str], None], Optional[Callable[[], None]]]] = [(on_change, on_overflow)]
+        self._fd = -1
+        self._libc = None
+        self._watches: Dict[int, str] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def add_listener(self, on_change: Callable[[str], None], on_overflow: Optional[Callable[[], None]] = None):
+        """Also report changes to another index of the same tree"""
+        self._listeners.append((on_change, on_overflow))
+
+    def start(self) -> bool:
+        """Start watching in a daemon thread; False when inotify is unavailable"""
+        if not os.path.isdir(self.root):
+            return False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return False
+        if fd < 0:
+            return False
+        self._libc, self._fd = libc, fd
+        self._add_tree(self.root)
+        self._thread = threading.Thread(target=self._loop, name='tashkil-file-watcher', daemon=True)
+        self._thread.start()
+        logger.info(f"Watching {self.root} ({len(self._watches)} directories)")
+        return True
+
+    def stop(self):
+        """Stop the watcher thread and release the inotify descriptor"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = path
+
+    def _add_tree(self, top: str):
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRS]
+            self._add_watch(dirpath)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            self._dispatch(data)
+
+    def _dispatch(self, data: bytes):
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', errors='replace')
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                for _, on_overflow in self._listeners:
+                    if on_overflow:
+                        on_overflow()
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            path = os.path.join(directory, name) if name else directory
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO) and name not in IGNORED_DIRS:
+                self._add_tree(path)
+            for on_change, _ in self._listeners:
+                try:
+                    on_change(path)
+                except Exception as e:
+                    logger.warning(f"File watcher callback failed for {path}: {e}")
+
+
+def create_watched_cache(root: str, max_bytes: int) -> Tuple[FileReadCache, Optional[InotifyWatcher]]:
+    """
+    Create a read cache and, when possible, an inotify watcher that keeps it fresh
+
+    Args:
+        root: Directory to watch
+        max_bytes: Cache capacity in bytes
+
+    Returns:
+        (cache, watcher or None)
+    """
+    cache = FileReadCache(max_bytes=max_bytes)
+    watcher = InotifyWatcher(root, on_change=cache.invalidate, on_overflow=cache.clear)
+    if not watcher.start():
+        logger.info("inotify unavailable, file cache relies on mtime/size validation")
+        watcher = None
+    return cache, watcher
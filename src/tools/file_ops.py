@@ -0,0 +1,229 @@
+"""Batched file operations for the project MCP server"""
+
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+
+MAX_READ_BYTES = 256 * 1024
+
+# Read once at import: os.umask() can only be read by setting it, which would race the tool threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def resolve_project_path(path: str, root: str) -> str:
+    """
+    Resolve a path against the project root and refuse anything outside it
+
+    Args:
+        path: Absolute path or path relative to the project root
+        root: Project root directory
+
+    Returns:
+        Absolute, normalized path inside the root
+    """
+    root = os.path.realpath(root)
+    candidate = path if os.path.isabs(path) else os.path.join(root, path)
+    resolved = os.path.realpath(candidate)
+    if resolved != root and not resolved.startswith(root + os.sep):
+        raise ValueError(f'Path "{path}" is outside the project root')
+    return resolved
+
+
+def _read_text(path: str, max_bytes: int = MAX_READ_BYTES) -> Tuple[str, bool]:
+    """Read a text file, truncating it after max_bytes"""
+    with open(path, 'rb') as f:
+        data = f.read(max_bytes + 1)
+    truncated = len(data) > max_bytes
+    return data[:max_bytes].decode('utf-8', errors='replace'), truncated
+
+
+def read_files(
+    paths: List[str],
+    root: str,
+    max_bytes: int = MAX_READ_BYTES,
+    reader=None
+) -> Dict[str, Any]:
+    """
+    Read several files in one call
+
+    Args:
+        paths: Files to read, relative to the root or absolute
+        root: Project root directory
+        max_bytes: Per-file size limit, larger files are truncated
+        reader: Optional callable(path, max_bytes) -> (text, truncated)
+
+    Returns:
+        Mapping of requested path to content, plus per-file errors
+    """
+    reader = reader or _read_text
+    files: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    truncated: List[str] = []
+
+    for path in paths:
+        try:
+            text, was_truncated = reader(resolve_project_path(path, root), max_bytes)
+            files[path] = text
+            if was_truncated:
+                truncated.append(path)
+        except (OSError, ValueError) as e:
+            errors[path] = str(e)
+
+    result: Dict[str, Any] = {'success': not errors, 'files': files}
+    if errors:
+        result['errors'] = errors
+    if truncated:
+        result['truncated'] = truncated
+    return result
+
+
+def _apply_edits(content: str, edits: List[Dict[str, str]]) -> str:
+    """Apply oldText/newText replacements, each must match exactly once"""
+    for index, edit in enumerate(edits):
+        old_text = edit.get('oldText', '')
+        new_text = edit.get('newText', '')
+        if not old_text:
+            raise ValueError(f'edit {index}: oldText is empty')
+        count = content.count(old_text)
+        if count == 0:
+            raise ValueError(f'edit {index}: oldText not found')
+        if count > 1:
+            raise ValueError(f'edit {index}: oldText matches {count} times, add more context')
+        content = content.replace(old_text, new_text, 1)
+    return content
+
+
+def _make_dirs(directory: str, created: List[str]):
+    """Create a directory and its missing parents, recording the ones created here, outermost first"""
+    missing = []
+    while not os.path.isdir(directory):
+        missing.append(directory)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            break
+        directory = parent
+    for directory in reversed(missing):
+        try:
+            os.mkdir(directory)
+        except FileExistsError:
+            continue
+        created.append(directory)
+
+
+def _write_temp(path: str, content: str, created_dirs: List[str]) -> str:
+    """Write content to a temp file next to path and return the temp path"""
+    _make_dirs(os.path.dirname(path), created_dirs)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tashkil-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the target's mode, or give a new file the usual one
+        if os.path.exists(path):
+            os.chmod(temp_path, os.stat(path).st_mode & 0o7777)
+        else:
+            os.chmod(temp_path, 0o666 & ~_UMASK)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return temp_path
+
+
+def write_files(operations: List[Dict[str, Any]], root: str, on_commit=None) -> Dict[str, Any]:
+    """
+    Apply several writes and edits as a single atomic batch
+
+    Each operation is either {'path', 'content'} to write a whole file or
+    {'path', 'edits': [{'oldText', 'newText'}]} to edit an existing one.
+    Every new content is staged into a temp file first; only when all of
+    them are staged are they renamed into place. If a rename fails the
+    files already replaced are restored, so the batch lands completely or
+    not at all.
+
+    Args:
+        operations: Write and edit operations
+        root: Project root directory
+        on_commit: Optional callable(path) invoked for every committed file
+
+    Returns:
+        Batch status with a compact per-file summary
+    """
+    staged: Dict[str, str] = {}
+    originals: Dict[str, Optional[bytes]] = {}
+    errors: Dict[str, str] = {}
+    summary: List[Dict[str, Any]] = []
+
+    # Compute every new content before touching the disk
+    for index, operation in enumerate(operations):
+        label = operation.get('path') or f'#{index}'
+        try:
+            path = resolve_project_path(operation['path'], root)
+            if path not in originals:
+                originals[path] = None
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        originals[path] = f.read()
+            if 'content' in operation:
+                new_content = operation['content']
+                action = 'write'
+            elif 'edits' in operation:
+                if path in staged:
+                    current = staged[path]
+                elif originals[path] is not None:
+                    current = originals[path].decode('utf-8')
+                else:
+                    raise ValueError('cannot edit a file that does not exist')
+                new_content = _apply_edits(current, operation['edits'])
+                action = 'edit'
+            else:
+                raise ValueError('operation needs either "content" or "edits"')
+            staged[path] = new_content
+            summary.append({'path': operation['path'], 'op': action, 'bytes': len(new_content.encode('utf-8'))})
+        except (KeyError, OSError, UnicodeDecodeError, ValueError) as e:
+            errors[label] = str(e)
+
+    if errors:
+        return {'success': False, 'message': 'Batch rejected, no files were written', 'errors': errors}
+
+    temp_paths: Dict[str, str] = {}
+    committed: List[str] = []
+    created_dirs: List[str] = []
+    finished = False
+    try:
+        for path, content in staged.items():
+            temp_paths[path] = _write_temp(path, content, created_dirs)
+        for path, temp_path in temp_paths.items():
+            os.replace(temp_path, path)
+            committed.append(path)
+        finished = True
+    except OSError as e:
+        for path in committed:
+            try:
+                if originals[path] is None:
+                    os.unlink(path)
+                else:
+                    with open(path, 'wb') as f:
+                        f.write(originals[path])
+            except OSError:
+                pass
+        return {'success': False, 'message': f'Batch rolled back: {e}'}
+    finally:
+        for path, temp_path in temp_paths.items():
+            if path not in committed and os.path.exists(temp_path):
+                os.unlink(temp_path)
+        if not finished:
+            # Innermost first; a directory another writer has put files in since stays
+            for directory in reversed(created_dirs):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    pass
+
+    if on_commit:
+        for path in committed:
+            on_commit(path)
+
+    return {'success': True, 'message': f'{len(committed)} file(s) written', 'files': summary}
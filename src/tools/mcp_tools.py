@@ -1,5 +1,8 @@
 """MCP (Model Context Protocol) tools configuration"""
 
+import os
+from typing import Optional
+
 from google.adk.tools.mcp_tool.mcp_toolset import MCPToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
@@ -7,14 +10,18 @@ from mcp import StdioServerParameters
 from ..config import get_settings
 
 
-def create_filesystem_toolset() -> MCPToolset:
+def create_filesystem_toolset(root: Optional[str] = None) -> MCPToolset:
     """
     Create MCP toolset for filesystem operations
     
+    Args:
+        root: Folder the server may access (defaults to settings)
+        
     Returns:
         Configured MCPToolset for filesystem operations
     """
     settings = get_settings()
+    root = root or settings.target_folder_absolute_path
     
     return MCPToolset(
         connection_params=StdioConnectionParams(
@@ -23,7 +30,7 @@ def create_filesystem_toolset() -> MCPToolset:
                 args=[
                     "-y",
                     "@modelcontextprotocol/server-filesystem",
-                    settings.target_folder_absolute_path
+                    root
                 ],
             ),
             timeout=settings.mcp_timeout
@@ -31,20 +38,32 @@ def create_filesystem_toolset() -> MCPToolset:
     )
 
 
-def create_react_project_toolset() -> MCPToolset:
+def create_react_project_toolset(root: Optional[str] = None) -> MCPToolset:
     """
     Create MCP toolset for React project management
     
+    Args:
+        root: Folder projects are created in and file tools may access, also the
+            working directory of npm commands (defaults to settings)
+        
     Returns:
         Configured MCPToolset for React project operations
     """
     settings = get_settings()
+    root = root or settings.target_folder_absolute_path
     
     return MCPToolset(
         connection_params=StdioConnectionParams(
             server_params=StdioServerParameters(
                 command='python3',
-                args=[settings.react_manage_project_mcp_path]
+                args=[os.path.abspath(settings.react_manage_project_mcp_path)],
+                env={
+                    **os.environ,
+                    'TARGET_FOLDER_PATH': root,
+                    'PARENT_PROJECT_PATH': os.path.abspath(settings.parent_project_path),
+                    'COMPONENT_CATALOG_PATH': os.path.abspath(settings.component_catalog_path),
+                },
+                cwd=root if os.path.isdir(root) else None
             ),
             timeout=settings.mcp_timeout
         )
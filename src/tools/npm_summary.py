@@ -0,0 +1,129 @@
+"""Compact summaries of npm command output"""
+
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+
+COUNT_RE = re.compile(r'\b(added|removed|changed|audited) (\d+) packages?')
+VULNERABILITIES_RE = re.compile(r'(\d+) vulnerabilit(?:y|ies) \(([^)]*)\)')
+NO_VULNERABILITIES_RE = re.compile(r'found 0 vulnerabilities')
+WARN_RE = re.compile(r'^npm (?:WARN|warn) (\S+)\s*(.*)$')
+ERROR_RE = re.compile(r'^npm (?:ERR!|error) ?(.*)$')
+ERROR_CODE_RE = re.compile(r'^code (\S+)')
+NOISE_RE = re.compile(r'A complete log of this run|^\s*$|^(?:npm (?:ERR!|error) )?\s*$')
+
+MAX_ERROR_LINES = 4
+MAX_WARNING_EXAMPLES = 2
+
+
+def _warnings(lines: List[str]) -> Dict[str, Any]:
+    """Warnings grouped by type (deprecated, ERESOLVE, ...) with a couple of examples each"""
+    counts: Counter = Counter()
+    examples: Dict[str, List[str]] = {}
+    for line in lines:
+        match = WARN_RE.match(line)
+        if not match:
+            continue
+        kind = match.group(1).rstrip(':')
+        counts[kind] += 1
+        if len(examples.setdefault(kind, [])) < MAX_WARNING_EXAMPLES:
+            examples[kind].append(match.group(2)[:160])
+    return {kind: {'count': count, 'examples': examples[kind]} for kind, count in counts.most_common()}
+
+
+def _first_error(lines: List[str]) -> Optional[Dict[str, Any]]:
+    """Error code and the first few meaningful error lines"""
+    code = None
+    message: List[str] = []
+    for line in lines:
+        match = ERROR_RE.match(line)
+        if not match or NOISE_RE.search(line):
+            continue
+        text = match.group(1).strip()
+        code_match = ERROR_CODE_RE.match(text)
+        if code_match and code is None:
+            code = code_match.group(1)
+            continue
+        if len(message) < MAX_ERROR_LINES:
+            message.append(text[:200])
+    if code is None and not message:
+        # Not an npm-formatted error, e.g. a missing executable
+        fallback = [line.strip()[:200] for line in lines if line.strip()]
+        message = fallback[:MAX_ERROR_LINES]
+    if code is None and not message:
+        return None
+    return {'code': code, 'message': '\n'.join(message)}
+
+
+def summarize_npm(
+    args: List[str],
+    returncode: int,
+    stdout: str,
+    stderr: str,
+    duration: float
+) -> Dict[str, Any]:
+    """
+    Summarize an npm install/uninstall run
+
+    Args:
+        args: npm arguments, e.g. ["install", "lodash"]
+        returncode: Exit status
+        stdout: Captured standard output
+        stderr: Captured standard error
+        duration: Seconds the command took
+
+    Returns:
+        Package counts, requested packages, vulnerabilities, warnings grouped
+        by type and, on failure, the first relevant error
+    """
+    lines = (stdout + '\n' + stderr).splitlines()
+    text = '\n'.join(lines)
+    summary: Dict[str, Any] = {'command': 'npm ' + ' '.join(args), 'seconds': round(duration, 1)}
+
+    counts = {kind: int(number) for kind, number in COUNT_RE.findall(text)}
+    if counts:
+        summary['packages'] = counts
+    if 'up to date' in text:
+        summary['up_to_date'] = True
+
+    requested = [arg for arg in args[1:] if not arg.startswith('-')]
+    if requested:
+        summary['requested'] = requested
+
+    vulnerabilities = VULNERABILITIES_RE.search(text)
+    if vulnerabilities:
+        summary['vulnerabilities'] = f'{vulnerabilities.group(1)} ({vulnerabilities.group(2)})'
+    elif NO_VULNERABILITIES_RE.search(text):
+        summary['vulnerabilities'] = '0'
+
+    warnings = _warnings(lines)
+    if warnings:
+        summary['warnings'] = warnings
+    if returncode != 0:
+        summary['error'] = _first_error(lines)
+    return summary
+
+
+def summarize_npm_list(stdout: str) -> Dict[str, Any]:
+    """
+    Summarize `npm list --depth=0 --json`
+
+    Returns:
+        Project name and a flat name -> version mapping, plus problems
+        (missing or invalid packages) reported by npm
+    """
+    try:
+        data = json.loads(stdout or '{}')
+    except json.JSONDecodeError:
+        return {'error': {'code': 'EJSONPARSE', 'message': stdout.strip()[:200]}}
+    dependencies = {
+        name: info.get('version') or ('missing' if info.get('missing') else None)
+        for name, info in (data.get('dependencies') or {}).items()
+    }
+    summary: Dict[str, Any] = {'name': data.get('name'), 'count': len(dependencies), 'dependencies': dependencies}
+    problems = data.get('problems') or []
+    if problems:
+        summary['problems'] = [problem[:200] for problem in problems[:10]]
+    return summary
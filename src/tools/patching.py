@@ -0,0 +1,369 @@
+"""Unified-diff and anchored-hunk patch application with fuzz matching"""
+
+import difflib
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .file_ops import resolve_project_path, write_files
+
+
+HUNK_HEADER = re.compile(r'^@@(?: -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@)?(.*)$')
+# Extended header lines git writes between the files of a diff
+GIT_HEADER = re.compile(
+    r'^(?:diff --git |index |old mode |new mode |new file mode |deleted file mode |similarity index '
+    r'|dissimilarity index |rename from |rename to |copy from |copy to |Binary files )'
+)
+MAX_FUZZ = 2
+
+
+class PatchConflict(ValueError):
+    """Raised when a hunk cannot be located in the target file"""
+
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.details = details or {}
+
+
+@dataclass
+class Hunk:
+    """
+    A single hunk; old_start is None for anchored hunks without line numbers
+
+    anchor is the text after the hunk header ("@@ -3,2 +3,2 @@ function App"
+    or "@@ function App @@"): a line at or above the change that tells
+    identical context blocks apart.
+    """
+    old_start: Optional[int]
+    anchor: str = ''
+    lines: List[Tuple[str, str]] = field(default_factory=list)
+    # Line counts from the header still to be read; None for anchored hunks
+    old_left: Optional[int] = None
+    new_left: Optional[int] = None
+
+    @property
+    def complete(self) -> bool:
+        """Every line announced by the header has been read"""
+        return self.old_left is not None and self.old_left <= 0 and self.new_left <= 0
+
+    @property
+    def old_lines(self) -> List[str]:
+        return [text for tag, text in self.lines if tag in (' ', '-')]
+
+    @property
+    def new_lines(self) -> List[str]:
+        return [text for tag, text in self.lines if tag in (' ', '+')]
+
+
+@dataclass
+class FilePatch:
+    """All hunks targeting one file"""
+    path: Optional[str]
+    hunks: List[Hunk] = field(default_factory=list)
+    is_new: bool = False
+
+
+def _strip_prefix(path: str) -> Optional[str]:
+    """Normalize a ---/+++ header path"""
+    path = path.split('\t')[0].strip()
+    if path == '/dev/null':
+        return None
+    if path.startswith(('a/', 'b/')):
+        path = path[2:]
+    return path
+
+
+def parse_patch(text: str, default_path: Optional[str] = None) -> List[FilePatch]:
+    """
+    Parse a unified diff into per-file hunks
+
+    Headers (---/+++) are optional when default_path is given, and hunk
+    headers may omit line numbers ("@@" or "@@ some anchor @@"); such
+    hunks are located by their context lines and anchor. Extended git
+    headers (diff --git, index, mode and rename lines) are skipped, so
+    multi-file `git diff` output applies as is.
+
+    Args:
+        text: Patch text
+        default_path: File to patch when the diff has no file headers
+
+    Returns:
+        Parsed file patches
+    """
+    patches: List[FilePatch] = []
+    current: Optional[FilePatch] = None
+    hunk: Optional[Hunk] = None
+    old_path: Optional[str] = None
+
+    lines = text.splitlines()
+    for index, line in enumerate(lines):
+        next_line = lines[index + 1] if index + 1 < len(lines) else ''
+        if GIT_HEADER.match(line):
+            hunk = None
+            continue
+        # While a numbered hunk still expects lines, "--- x" is a removed "-- x" and "+++ y" an added "++ y"
+        expecting = hunk is not None and hunk.old_left is not None and not hunk.complete
+        if not expecting and line.startswith('--- ') and next_line.startswith('+++ '):
+            old_path = line[4:]
+            hunk = None
+            continue
+        if line.startswith('+++ ') and old_path is not None:
+            new_path = _strip_prefix(line[4:])
+            if new_path is None:
+                raise ValueError('File deletion is not supported by the patch tool')
+            current = FilePatch(path=new_path, is_new=_strip_prefix(old_path) is None)
+            patches.append(current)
+            old_path = None
+            continue
+        match = HUNK_HEADER.match(line)
+        if line.startswith('@@') and match:
+            if current is None:
+                current = FilePatch(path=default_path)
+                patches.append(current)
+            anchor = match.group(5).strip()
+            if not match.group(1) and anchor.endswith('@@'):
+                anchor = anchor[:-2].strip()
+            hunk = Hunk(old_start=int(match.group(1)) if match.group(1) else None, anchor=anchor)
+            if match.group(1):
+                hunk.old_left = int(match.group(2)) if match.group(2) is not None else 1
+                hunk.new_left = int(match.group(4)) if match.group(4) is not None else 1
+            current.hunks.append(hunk)
+            continue
+        if hunk is None:
+            continue
+        if line.startswith('\\'):
+            # "\ No newline at end of file"
+            continue
+        tag, body = (line[0], line[1:]) if line else (' ', '')
+        if tag not in (' ', '-', '+'):
+            raise ValueError(f'Unexpected line in hunk: {line[:60]!r}')
+        hunk.lines.append((tag, body))
+        if hunk.old_left is not None:
+            hunk.old_left -= int(tag != '+')
+            hunk.new_left -= int(tag != '-')
+
+    for patch in patches:
+        if not patch.path:
+            raise ValueError('Patch has no file header, pass the target path')
+        patch.hunks = [h for h in patch.hunks if h.lines]
+    if not any(p.hunks for p in patches):
+        raise ValueError('Patch contains no hunks')
+    return patches
+
+
+def _matches(lines: List[str], start: int, block: List[str], loose: bool) -> bool:
+    if start < 0 or start + len(block) > len(lines):
+        return False
+    if loose:
+        return all(lines[start + i].strip() == b.strip() for i, b in enumerate(block))
+    return lines[start:start + len(block)] == block
+
+
+def _candidates(hint: int, size: int):
+    """Positions ordered by distance from the hint"""
+    hint = max(0, min(hint, size - 1))
+    yield hint
+    for delta in range(1, size):
+        if hint - delta >= 0:
+            yield hint - delta
+        if hint + delta < size:
+            yield hint + delta
+
+
+def _closest(lines: List[str], block: List[str]) -> Dict[str, Any]:
+    """Find the window that looks most like the expected block"""
+    best_ratio, best_start = 0.0, 0
+    size = max(1, len(block))
+    expected = '\n'.join(block)
+    for start in range(max(1, len(lines) - size + 1)):
+        ratio = difflib.SequenceMatcher(None, '\n'.join(lines[start:start + size]), expected).quick_ratio()
+        if ratio > best_ratio:
+            best_ratio, best_start = ratio, start
+    return {
+        'closest_line': best_start + 1,
+        'similarity': round(best_ratio, 2),
+        'found': lines[best_start:best_start + min(size, 8)],
+    }
+
+
+def _anchored(lines: List[str], matches: List[int], size: int, anchor: str) -> List[int]:
+    """Narrow matches to the first one reaching past each line that contains the anchor"""
+    picked: List[int] = []
+    for line_number, line in enumerate(lines):
+        if anchor not in line:
+            continue
+        match = next((m for m in matches if m + size > line_number), None)
+        if match is not None and match not in picked:
+            picked.append(match)
+    return picked
+
+
+def _locate(lines: List[str], hunk: Hunk, offset: int, max_fuzz: int) -> Tuple[int, int, int, int]:
+    """
+    Find where a hunk applies
+
+    With line numbers the match nearest to them wins. Without, the
+    context must match exactly one place, after narrowing by the anchor;
+    otherwise the hunk is a conflict rather than a guess.
+
+    Returns:
+        (start line, leading context dropped, trailing context dropped, fuzz used)
+    """
+    tags = [tag for tag, _ in hunk.lines if tag in (' ', '-')]
+    old = hunk.old_lines
+    hint = None if hunk.old_start is None else hunk.old_start - 1 + offset
+    if not old:
+        if hint is None:
+            anchors = [i for i, line in enumerate(lines) if hunk.anchor and hunk.anchor in line]
+            if len(anchors) != 1:
+                raise PatchConflict(
+                    'Pure insertion hunk needs line numbers, context lines or an anchor matching one line',
+                    {'anchor_matches': [i + 1 for i in anchors][:10]}
+                )
+            return anchors[0] + 1, 0, 0, 0
+        return max(0, min(hint + 1, len(lines))), 0, 0, 0
+
+    lead = len(tags) - len(''.join(tags).lstrip(' '))
+    trail = len(tags) - len(''.join(tags).rstrip(' '))
+    for fuzz in range(max_fuzz + 1):
+        drop_lead, drop_trail = min(fuzz, lead), min(fuzz, trail)
+        if fuzz and not (drop_lead or drop_trail):
+            continue
+        block = old[drop_lead:len(old) - drop_trail]
+        if not block:
+            continue
+        for loose in (False, True):
+            if hint is not None:
+                for start in _candidates(hint + drop_lead, len(lines)):
+                    if _matches(lines, start, block, loose):
+                        return start - drop_lead, drop_lead, drop_trail, fuzz + int(loose)
+                continue
+            found = [start for start in range(len(lines)) if _matches(lines, start, block, loose)]
+            if len(found) > 1 and hunk.anchor:
+                found = _anchored(lines, found, len(block), hunk.anchor) or found
+            if len(found) > 1:
+                raise PatchConflict(f'Hunk context matches {len(found)} places', {
+                    'matches': [start - drop_lead + 1 for start in found][:10],
+                    'hint': 'Add context lines or an "@@ <line above the change> @@" anchor that is unique',
+                })
+            if found:
+                return found[0] - drop_lead, drop_lead, drop_trail, fuzz + int(loose)
+    raise PatchConflict('Hunk context not found', _closest(lines, old))
+
+
+def apply_hunks(content: str, hunks: List[Hunk], max_fuzz: int = MAX_FUZZ) -> Tuple[str, int]:
+    """
+    Apply hunks to file content
+
+    Args:
+        content: Current file content
+        hunks: Hunks in file order
+        max_fuzz: How many context lines may be ignored at each hunk edge
+
+    Returns:
+        (new content, number of hunks that needed fuzz)
+    """
+    newline = '\r\n' if '\r\n' in content else '\n'
+    trailing_newline = content.endswith(('\n', '\r\n')) or not content
+    lines = content.splitlines()
+    offset = 0
+    fuzzy = 0
+
+    for index, hunk in enumerate(hunks):
+        try:
+            start, drop_lead, drop_trail, fuzz = _locate(lines, hunk, offset, max_fuzz)
+        except PatchConflict as e:
+            e.details = {'hunk': index + 1, 'expected': hunk.old_lines[:8], **e.details}
+            raise
+        old_count = len(hunk.old_lines)
+        replace_start = start + drop_lead
+        replace_end = start + old_count - drop_trail
+        new_block = hunk.new_lines
+        new_block = new_block[drop_lead:len(new_block) - drop_trail]
+        lines[replace_start:replace_end] = new_block
+        if hunk.old_start is not None:
+            offset = start - (hunk.old_start - 1) + len(hunk.new_lines) - old_count
+        fuzzy += int(fuzz > 0)
+
+    result = newline.join(lines)
+    if trailing_newline and lines:
+        result += newline
+    return result, fuzzy
+
+
+def apply_patch(patch_text: str, root: str, path: Optional[str] = None, max_fuzz: int = MAX_FUZZ) -> Dict[str, Any]:
+    """
+    Apply a unified diff (or anchored hunks) to files under the project root
+
+    All touched files are committed as one atomic batch, so a conflict in
+    any hunk leaves every file unchanged. Several sections for the same
+    file apply in order, each to the result of the previous one.
+
+    Args:
+        patch_text: Unified diff text
+        root: Project root directory
+        path: Target file when the diff has no ---/+++ headers
+        max_fuzz: Context lines that may be ignored at each hunk edge
+
+    Returns:
+        Status, per-file summary, conflict details and byte metrics
+    """
+    try:
+        patches = parse_patch(patch_text, default_path=path)
+    except ValueError as e:
+        return {'success': False, 'message': f'Invalid patch: {e}'}
+
+    contents: Dict[str, str] = {}
+    files: Dict[str, Dict[str, Any]] = {}
+    bytes_changed = 0
+    for file_patch in patches:
+        target = resolve_project_path(file_patch.path, root)
+        if target in contents:
+            if file_patch.is_new:
+                return {'success': False, 'message': f'Patch creates {file_patch.path} twice'}
+            content = contents[target]
+        elif file_patch.is_new:
+            if os.path.exists(target):
+                return {
+                    'success': False,
+                    'message': f'Conflict in {file_patch.path}: the patch creates it, but it already exists',
+                    'conflict': {'path': file_patch.path, 'hint': 'Patch the existing file instead of /dev/null'},
+                }
+            content = ''
+        elif not os.path.exists(target):
+            return {'success': False, 'message': f'File not found: {file_patch.path}'}
+        else:
+            with open(target, 'r', encoding='utf-8', newline='') as f:
+                content = f.read()
+        try:
+            contents[target], fuzzy = apply_hunks(content, file_patch.hunks, max_fuzz)
+        except PatchConflict as e:
+            return {
+                'success': False,
+                'message': f'Conflict in {file_patch.path}: {e}',
+                'conflict': {'path': file_patch.path, **e.details},
+            }
+        bytes_changed += sum(
+            len(text.encode('utf-8')) + 1 for h in file_patch.hunks for tag, text in h.lines if tag != ' '
+        )
+        summary = files.setdefault(target, {'path': file_patch.path, 'hunks': 0, 'fuzzy': 0})
+        summary['hunks'] += len(file_patch.hunks)
+        summary['fuzzy'] += fuzzy
+
+    result = write_files(
+        [{'path': summary['path'], 'content': contents[target]} for target, summary in files.items()], root
+    )
+    if not result['success']:
+        return result
+
+    return {
+        'success': True,
+        'message': f'Patched {len(files)} file(s)',
+        'files': list(files.values()),
+        'metrics': {
+            'bytes_sent': len(patch_text.encode('utf-8')),
+            'bytes_changed': bytes_changed,
+            'file_bytes': sum(len(content.encode('utf-8')) for content in contents.values()),
+        },
+    }
@@ -0,0 +1,71 @@
+"""Per-path write locks for tools that run concurrently in the MCP server"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, Set
+
+
+class PathLocks:
+    """
+    Exclusive locks on project paths, taken all at once
+
+    A call holds every path it writes for its whole duration; calls on
+    disjoint paths run side by side. Taking all paths of a call atomically
+    (instead of one by one) means two calls can never deadlock on each
+    other. The tree lock is for whole-project operations such as
+    checkpoints and restores: it waits for every path lock to be released
+    and blocks new ones while held.
+    """
+
+    def __init__(self, root: str, timeout: float = 120.0):
+        self.root = os.path.realpath(root)
+        self.timeout = timeout
+        self._held: Set[str] = set()
+        self._tree = False
+        self._changed = threading.Condition()
+
+    def normalize(self, path: str) -> str:
+        """Lock key of a path; symlinks are resolved like the root so both spellings collide"""
+        return os.path.realpath(path if os.path.isabs(path) else os.path.join(self.root, path))
+
+    @contextmanager
+    def hold(self, paths: Iterable[str], timeout: Optional[float] = None) -> Iterator[None]:
+        """
+        Hold the given paths exclusively
+
+        Raises:
+            TimeoutError: If another call kept one of them for longer than timeout seconds
+        """
+        wanted = {self.normalize(path) for path in paths if path}
+        with self._changed:
+            if not self._changed.wait_for(
+                lambda: not self._tree and self._held.isdisjoint(wanted),
+                self.timeout if timeout is None else timeout
+            ):
+                busy = sorted(wanted & self._held) or ['the project']
+                raise TimeoutError(f"{os.path.relpath(busy[0], self.root)} is being written by another tool call, retry later")
+            self._held |= wanted
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._held -= wanted
+                self._changed.notify_all()
+
+    @contextmanager
+    def hold_tree(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Hold the whole project, once no path is held"""
+        with self._changed:
+            if not self._changed.wait_for(
+                lambda: not self._tree and not self._held,
+                self.timeout if timeout is None else timeout
+            ):
+                raise TimeoutError('The project is being written by another tool call, retry later')
+            self._tree = True
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._tree = False
+                self._changed.notify_all()
@@ -0,0 +1,102 @@
+"""Full tool output kept out of the model context and read back a page at a time"""
+
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+LOG_DIR = os.path.join('.tashkil', 'logs')
+DEFAULT_PAGE_LINES = 80
+MAX_LINE_CHARS = 400
+
+
+class LogStore:
+    """
+    Plain-text logs of tool runs stored under the project folder
+
+    Tools keep only a summary in their result and hand back a log id;
+    read() serves the log in pages, optionally filtered by a pattern, so
+    the agent pulls in detail only when it needs it. The oldest logs are
+    removed once more than max_logs exist.
+    """
+
+    def __init__(self, root: str, max_logs: int = 50):
+        self.directory = os.path.join(root, LOG_DIR)
+        self.max_logs = max_logs
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def _path(self, log_id: str) -> str:
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', log_id):
+            raise ValueError(f'Invalid log id {log_id}')
+        return os.path.join(self.directory, f'{log_id}.log')
+
+    def save(self, name: str, text: str) -> str:
+        """
+        Store a log
+
+        Args:
+            name: Short tool or command name used in the id
+            text: Full output
+
+        Returns:
+            Log id
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        log_id = f"{time.strftime('%Y%m%d%H%M%S')}-{counter}-{re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-')[:30]}"
+        with open(self._path(log_id), 'w', encoding='utf-8') as f:
+            f.write(text)
+        with self._lock:
+            self._prune()
+        return log_id
+
+    def _prune(self):
+        logs = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.log')),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in logs[:max(0, len(logs) - self.max_logs)]:
+            os.unlink(entry.path)
+
+    def read(
+        self,
+        log_id: str,
+        page: int = 1,
+        page_lines: int = DEFAULT_PAGE_LINES,
+        pattern: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Read one page of a log
+
+        Args:
+            log_id: Id returned by save()
+            page: 1-based page number
+            page_lines: Lines per page
+            pattern: Optional regular expression; only matching lines are paged
+
+        Returns:
+            The page's lines (numbered as in the full log) and paging info
+        """
+        with open(self._path(log_id), 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.read().splitlines()
+        numbered = list(enumerate(lines, 1))
+        if pattern:
+            regex = re.compile(pattern, re.IGNORECASE)
+            numbered = [(number, line) for number, line in numbered if regex.search(line)]
+        page_lines = max(1, page_lines)
+        pages = max(1, -(-len(numbered) // page_lines))
+        page = min(max(1, page), pages)
+        chunk = numbered[(page - 1) * page_lines:page * page_lines]
+        return {
+            'log_id': log_id,
+            'page': page,
+            'pages': pages,
+            'total_lines': len(lines),
+            'matched_lines': len(numbered),
+            'lines': [f'{number}: {line[:MAX_LINE_CHARS]}' for number, line in chunk],
+        }
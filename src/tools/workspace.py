@@ -0,0 +1,355 @@
+"""Project roots of the workspace and the toolsets and dev servers kept warm for each"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..config import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Toolsets:
+    """MCP toolsets of one project root, bound to the event loop that runs their sessions"""
+    root: str
+    loop: Optional[asyncio.AbstractEventLoop]
+    file_system: Any
+    react_project: Any
+    active: int = 0
+    last_used: float = 0.0
+    warm: bool = True
+    evictions: int = 0
+
+
+@dataclass
+class _DevServer:
+    """A `npm run dev` process serving one project root"""
+    root: str
+    port: int
+    process: subprocess.Popen
+    last_used: float = 0.0
+
+    @property
+    def url(self) -> str:
+        return f'http://localhost:{self.port}'
+
+    @property
+    def running(self) -> bool:
+        return self.process.poll() is None
+
+
+def _port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        try:
+            sock.bind(('127.0.0.1', port))
+        except OSError:
+            return False
+    return True
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class Workspace:
+    """
+    Project roots a session can switch between, with per-root resources
+
+    Every root gets one filesystem and one project-management MCP toolset,
+    created on first use and reused by every session and agent working on
+    that root, so switching a session to another project only rebuilds its
+    agents. The MCP server processes hold the per-root indexes (file read
+    cache, type-check watcher, checkpoints), so they stay warm as long as
+    the toolsets do. Dev servers are started on demand, one per root.
+
+    Roots idle for longer than idle_seconds are evicted: their toolsets are
+    closed, which stops the MCP servers, and their dev server is terminated.
+    An evicted toolset reconnects on its next use. MCP sessions belong to
+    the event loop that opened them, so toolsets are kept per root and loop,
+    and only the running loop's toolsets are closed by evict_idle().
+    """
+
+    def __init__(self, base: str, idle_seconds: float = 900.0, dev_server_port: int = 8080):
+        self.base = os.path.realpath(base)
+        # Trusted roots outside the base, e.g. batch output; never taken from clients
+        self._extra_roots: List[str] = []
+        self.idle_seconds = idle_seconds
+        self.dev_server_port = dev_server_port
+        self._toolsets: Dict[Tuple[str, int], _Toolsets] = {}
+        self._dev_servers: Dict[str, _DevServer] = {}
+        # Streamlit sessions run on separate threads
+        self._lock = threading.Lock()
+
+    # Roots ---------------------------------------------------------------
+
+    def add_root(self, path: str) -> str:
+        """
+        Allow projects below a directory outside the workspace base
+
+        Only for directories chosen by the operator (batch output, benchmark
+        scratch folders), never for paths that come from a client.
+
+        Args:
+            path: Directory to allow
+
+        Returns:
+            Its real path
+        """
+        root = os.path.realpath(path)
+        with self._lock:
+            if root not in self._extra_roots:
+                self._extra_roots.append(root)
+        return root
+
+    def resolve(self, project: Optional[str] = None) -> str:
+        """
+        Absolute root of a project
+
+        Symlinks and ".." are resolved before the check, so a project can
+        only be the base, a folder below it, or a folder below a root added
+        with add_root().
+
+        Args:
+            project: Folder name under the workspace base, or an absolute path;
+                the base itself when empty
+
+        Returns:
+            Real path of the project root
+
+        Raises:
+            ValueError: If the path is outside the workspace
+        """
+        if not project:
+            return self.base
+        root = os.path.realpath(project if os.path.isabs(project) else os.path.join(self.base, project))
+        for allowed in [self.base, *self._extra_roots]:
+            if root == allowed or root.startswith(allowed.rstrip(os.sep) + os.sep):
+                return root
+        raise ValueError(f'Project "{project}" is outside the workspace')
+
+    def list_projects(self) -> List[Dict[str, Any]]:
+        """Folders of the workspace base that contain a package.json, the base first if it is one"""
+        candidates = [self.base]
+        if os.path.isdir(self.base):
+            candidates += sorted(
+                entry.path for entry in os.scandir(self.base)
+                if entry.is_dir() and not entry.name.startswith('.')
+            )
+        projects = []
+        for path in candidates:
+            if not os.path.exists(os.path.join(path, 'package.json')):
+                continue
+            root = os.path.realpath(path)
+            server = self._dev_servers.get(root)
+            projects.append({
+                'name': os.path.relpath(root, self.base),
+                'root': root,
+                'warm': any(entry.warm for key, entry in self._toolsets.items() if key[0] == root),
+                'dev_server': server.url if server and server.running else None,
+            })
+        return projects
+
+    # Toolsets ------------------------------------------------------------
+
+    def toolsets(self, root: str) -> Tuple[Any, Any]:
+        """
+        Filesystem and project-management toolsets of a root, created once per root and event loop
+
+        Args:
+            root: Project root (see resolve())
+
+        Returns:
+            (filesystem toolset, react project toolset)
+        """
+        from .mcp_tools import create_filesystem_toolset, create_react_project_toolset
+
+        loop = _current_loop()
+        key = (root, id(loop))
+        with self._lock:
+            entry = self._toolsets.get(key)
+            if entry is None or entry.loop is not loop:
+                entry = _Toolsets(
+                    root=root,
+                    loop=loop,
+                    file_system=create_filesystem_toolset(root),
+                    react_project=create_react_project_toolset(root),
+                )
+                self._toolsets[key] = entry
+                logger.info(f"Created toolsets for {root}")
+            entry.last_used = time.monotonic()
+            return entry.file_system, entry.react_project
+
+    @asynccontextmanager
+    async def use(self, root: str) -> AsyncIterator[None]:
+        """Mark a root busy for the duration of a turn, then evict roots that went idle"""
+        entry = self._toolsets.get((root, id(_current_loop())))
+        if entry is not None:
+            entry.active += 1
+            entry.warm = True
+        try:
+            yield
+        finally:
+            if entry is not None:
+                entry.active -= 1
+                entry.last_used = time.monotonic()
+            await self.evict_idle()
+
+    def active_turns(self, root: str) -> int:
+        """Turns currently working on a root, across all event loops"""
+        return sum(entry.active for entry in list(self._toolsets.values()) if entry.root == root)
+
+    async def _close(self, entry: _Toolsets):
+        for toolset in (entry.file_system, entry.react_project):
+            try:
+                await toolset.close()
+            except Exception as e:
+                logger.warning(f"Error closing toolset of {entry.root}: {e}")
+        entry.warm = False
+        entry.evictions += 1
+
+    async def evict_idle(self) -> List[str]:
+        """
+        Close toolsets and stop dev servers of roots idle beyond idle_seconds
+
+        Returns:
+            Roots whose toolsets were closed
+        """
+        now = time.monotonic()
+        loop = _current_loop()
+        evicted = []
+        with self._lock:
+            # Toolsets of loops that are gone can no longer be closed or used
+            for key in [key for key, entry in self._toolsets.items() if entry.loop is not None and entry.loop.is_closed()]:
+                del self._toolsets[key]
+            idle = [
+                entry for entry in self._toolsets.values()
+                if entry.loop is loop and entry.warm and not entry.active
+                and now - entry.last_used > self.idle_seconds
+            ]
+        for entry in idle:
+            await self._close(entry)
+            evicted.append(entry.root)
+            logger.info(f"Evicted idle toolsets of {entry.root}")
+        self.stop_idle_dev_servers()
+        return evicted
+
+    async def evict(self, root: str):
+        """Close a root's toolsets and dev server now, e.g. once a batch request's project is done"""
+        entry = self._toolsets.get((root, id(_current_loop())))
+        if entry is not None and entry.warm and not entry.active:
+            await self._close(entry)
+        self.stop_dev_server(root)
+
+    async def close_all(self):
+        """Close the running loop's toolsets and stop every dev server"""
+        loop = _current_loop()
+        for entry in [entry for entry in self._toolsets.values() if entry.loop is loop and entry.warm]:
+            await self._close(entry)
+        for root in list(self._dev_servers):
+            self.stop_dev_server(root)
+
+    # Dev servers ---------------------------------------------------------
+
+    def start_dev_server(self, root: str) -> str:
+        """
+        Start `npm run dev` for a root on a free port, or reuse the running one
+
+        Returns:
+            URL of the dev server
+        """
+        with self._lock:
+            server = self._dev_servers.get(root)
+            if server is not None and server.running:
+                server.last_used = time.monotonic()
+                return server.url
+            taken = {s.port for s in self._dev_servers.values() if s.running}
+            port = self.dev_server_port
+            while port in taken or not _port_free(port):
+                port += 1
+            process = subprocess.Popen(
+                ['npm', 'run', 'dev', '--', '--port', str(port), '--strictPort'],
+                cwd=root,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+            server = _DevServer(root=root, port=port, process=process, last_used=time.monotonic())
+            self._dev_servers[root] = server
+        logger.info(f"Started dev server for {root} on port {port}")
+        return server.url
+
+    def dev_server_url(self, root: str) -> Optional[str]:
+        """URL of the root's running dev server, refreshing its idle timer"""
+        server = self._dev_servers.get(root)
+        if server is None or not server.running:
+            return None
+        server.last_used = time.monotonic()
+        return server.url
+
+    def stop_dev_server(self, root: str):
+        server = self._dev_servers.pop(root, None)
+        if server is None or not server.running:
+            return
+        # npm starts the server in a child process; stop the whole group
+        try:
+            os.killpg(server.process.pid, signal.SIGTERM)
+            server.process.wait(timeout=5)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            server.process.kill()
+        logger.info(f"Stopped dev server for {root}")
+
+    def stop_idle_dev_servers(self):
+        now = time.monotonic()
+        for root, server in list(self._dev_servers.items()):
+            if not server.running or now - server.last_used > self.idle_seconds:
+                self.stop_dev_server(root)
+
+    # Reporting -----------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Warm roots, busy turns and dev servers for the metrics endpoint"""
+        now = time.monotonic()
+        return {
+            'base': self.base,
+            'idle_seconds': self.idle_seconds,
+            'toolsets': [
+                {
+                    'root': entry.root,
+                    'warm': entry.warm,
+                    'active_turns': entry.active,
+                    'idle_seconds': round(now - entry.last_used, 1),
+                    'evictions': entry.evictions,
+                }
+                for entry in self._toolsets.values()
+            ],
+            'dev_servers': {root: server.url for root, server in self._dev_servers.items() if server.running},
+        }
+
+
+_workspace: Optional[Workspace] = None
+
+
+def get_workspace() -> Workspace:
+    """Get the process-wide workspace (singleton pattern)"""
+    global _workspace
+    if _workspace is None:
+        settings = get_settings()
+        _workspace = Workspace(
+            base=settings.target_folder_absolute_path,
+            idle_seconds=settings.workspace_idle_seconds,
+            dev_server_port=settings.dev_server_port,
+        )
+    return _workspace
@@ -1,5 +1,19 @@
 """Utility modules"""
 
-from .logging_config import setup_logging
+from typing import TYPE_CHECKING
 
-__all__ = ["setup_logging"]
\ No newline at end of file
+from .lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from .logging_config import setup_logging
+
+# Submodules are imported on first use to keep cold start cheap
+_EXPORTS = {
+    "setup_logging": ".logging_config",
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
+
+__all__ = [
+    "setup_logging"
+]
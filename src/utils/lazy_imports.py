@@ -0,0 +1,34 @@
+"""Lazy attribute loading for package __init__ modules"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """
+    Build module-level __getattr__/__dir__ that import submodules on first access
+
+    Keeps `import src.<package>` cheap: heavy dependencies such as google.adk
+    are only loaded when one of the exported names is actually used.
+
+    Args:
+        package: The package __name__
+        exports: Public name -> relative submodule (e.g. ".session_service")
+
+    Returns:
+        (__getattr__, __dir__) to assign in the package namespace
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
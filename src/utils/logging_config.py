@@ -28,6 +28,15 @@ def setup_logging(
     log_file = log_file or settings.log_file
     log_level = log_level or settings.log_level
     
+    # Create logger
+    logger = logging.getLogger('tashkil_coder')
+    
+    # Configure the file handler only once, repeated calls would duplicate every line
+    log_path = os.path.abspath(log_file)
+    for handler in logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == log_path:
+            return logger
+    
     # Clear existing log file if requested
     if clear_existing and os.path.exists(log_file):
         os.remove(log_file)
@@ -38,9 +47,6 @@ def setup_logging(
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
-    # Create logger
-    logger = logging.getLogger('tashkil_coder')
-    
     # Add file handler
     file_handler = logging.FileHandler(log_file)
     file_handler.setLevel(getattr(logging, log_level.upper()))
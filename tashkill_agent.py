@@ -3,13 +3,19 @@ Tashkill Agent - Legacy compatibility module
 This module now uses the new modular structure for better maintainability.
 """
 
-# Import from new modular structure
+# Import from new modular structure; agents and toolsets are only built on first use
 from main import run_agent_async, run_agent
-from src.config import get_settings
-from src.agents import create_dev_flow_agent
-from src.tools import create_filesystem_toolset, create_react_project_toolset
-from src.services import create_session_manager
-from src.utils import setup_logging
+from src.utils.lazy_imports import lazy_exports
+
+# Names this module used to import eagerly, still importable from here
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "get_settings": "src.config",
+    "create_dev_flow_agent": "src.agents",
+    "create_filesystem_toolset": "src.tools",
+    "create_react_project_toolset": "src.tools",
+    "create_session_manager": "src.services",
+    "setup_logging": "src.utils",
+})
 
 # Legacy compatibility
 async def get_custom_agent_async():
@@ -17,6 +23,9 @@ async def get_custom_agent_async():
     Legacy function - now uses modular structure
     Creates agents using the new modular approach
     """
+    from src.agents import create_dev_flow_agent
+    from src.tools import create_filesystem_toolset, create_react_project_toolset
+
     # Create agents using new structure
     dev_agent = create_dev_flow_agent()
     toolset_file_system = create_filesystem_toolset()
@@ -33,4 +42,4 @@ async def async_main(query, session_service=None, artifacts_service=None, sessio
 
 
 # Export the main functions for backward compatibility
-__all__ = ["run_agent", "async_main", "get_custom_agent_async"]
\ No newline at end of file
+__all__ = ["run_agent", "async_main", "get_custom_agent_async"]
@@ -0,0 +1,38 @@
+"""
+WebSocket frames the API server cannot use
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+pytest.importorskip('httpx')
+
+from fastapi.testclient import TestClient
+
+from src.api import create_app
+
+
+async def idle_session(session_id, user_id, target_folder=None):
+    async def cleanup():
+        pass
+    return SimpleNamespace(session=SimpleNamespace(id=session_id), target_folder=target_folder, cleanup=cleanup)
+
+
+def test_invalid_frames_get_an_error_and_keep_the_socket_open():
+    with TestClient(create_app(idle_session)) as client:
+        session_id = client.post('/sessions', json={}).json()['session_id']
+        with client.websocket_connect(f'/sessions/{session_id}/ws') as socket:
+            for frame in ('{"message": ', '["hello"]', '"hello"', '{"message": 42}', '{}'):
+                socket.send_text(frame)
+                reply = socket.receive_json()
+                assert reply['kind'] == 'error', frame
+
+            socket.send_json({'interrupt': True})
+            assert socket.receive_json() == {'kind': 'cancelled', 'cancelled': False}
@@ -0,0 +1,76 @@
+"""
+Batch requests: per-request folders, cleanup failures and invalid lines
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from src.services import batch_runner
+from src.services.batch_runner import _folder_name, run_batch
+
+
+def test_similar_request_ids_get_separate_folders():
+    assert _folder_name('a/b') != _folder_name('a_b')
+    assert _folder_name('a/b').startswith('a_b-')
+    assert _folder_name('a/b') == _folder_name('a/b')
+
+
+def test_failed_project_eviction_does_not_lose_results(tmp_path, monkeypatch):
+    workspace = batch_runner.get_workspace()
+
+    async def evict(root):
+        raise RuntimeError('MCP server did not stop')
+
+    monkeypatch.setattr(workspace, 'evict', evict)
+    sessions = []
+
+    async def run_agent(query, session_manager, raise_errors=False, streaming=None):
+        sessions.append(session_manager.session.id)
+        return
+        yield
+
+    requests = tmp_path / 'requests.jsonl'
+    requests.write_text('\n'.join(json.dumps({'id': rid, 'query': 'go'}) for rid in ('a/b', 'a_b')) + '\n')
+    output = tmp_path / 'results.jsonl'
+    counters = asyncio.run(run_batch(
+        str(requests), str(output), run_agent, concurrency=2, output_root=str(tmp_path / 'out')
+    ))
+
+    assert counters['processed'] == 2
+    results = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len({result['output_folder'] for result in results}) == 2
+    assert len(set(sessions)) == 2
+
+
+def test_invalid_lines_are_reported_without_stopping_the_batch(tmp_path):
+    queries = []
+
+    async def run_agent(query, session_manager, raise_errors=False, streaming=None):
+        queries.append(query)
+        return
+        yield
+
+    requests = tmp_path / 'requests.jsonl'
+    requests.write_text('\n'.join([
+        '{"id": "broken", "query": ',
+        '["not", "an", "object"]',
+        json.dumps({'id': 'empty', 'title': ''}),
+        json.dumps({'id': 'ok', 'title': 'Todo app', 'body': 'With filters'}),
+    ]) + '\n')
+    output = tmp_path / 'results.jsonl'
+    counters = asyncio.run(run_batch(str(requests), str(output), run_agent, output_root=str(tmp_path / 'out')))
+
+    assert (counters['processed'], counters['failed']) == (1, 3)
+    assert queries == ['Todo app\n\nWith filters']
+    results = {result['request_id']: result for result in map(json.loads, output.read_text().splitlines())}
+    assert results['line-1']['error'].startswith('Invalid JSON')
+    assert results['line-2']['status'] == results['empty']['status'] == 'failed'
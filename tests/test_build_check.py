@@ -0,0 +1,49 @@
+"""
+Type check watcher restarts, against a scripted stand-in for tsc --watch
+"""
+
+import os
+import sys
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import build_check
+from src.tools.build_check import TypeCheckWatcher
+
+FAILING_PASS = """
+import sys, time
+print('Starting compilation in watch mode...')
+print("src/App.tsx(3,7): error TS2322: Type 'string' is not assignable to type 'number'.")
+print('Found 1 error. Watching for file changes.')
+sys.stdout.flush()
+time.sleep(60)
+"""
+
+# The restarted checker takes a moment before its first pass, like tsc does
+CLEAN_PASS = """
+import sys, time
+time.sleep(0.3)
+print('Starting compilation in watch mode...')
+print('Found 0 errors. Watching for file changes.')
+sys.stdout.flush()
+time.sleep(60)
+"""
+
+
+def test_restarted_watcher_waits_for_its_own_first_pass(tmp_path, monkeypatch):
+    scripts = iter([FAILING_PASS, CLEAN_PASS])
+    monkeypatch.setattr(build_check, '_tsc_command', lambda project: [sys.executable, '-c', next(scripts)])
+    watcher = TypeCheckWatcher(str(tmp_path))
+    try:
+        first = watcher.check(timeout=10)
+        assert first['errors'] == 1 and first['full_check']
+
+        # tsc died; the next check restarts it and must not report the old process's diagnostics
+        watcher.stop()
+        second = watcher.check(timeout=10)
+        assert second['success'] and second['full_check']
+        assert second['errors'] == 0
+        assert second['fixed'] == 0
+    finally:
+        watcher.stop()
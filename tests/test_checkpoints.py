@@ -0,0 +1,52 @@
+"""
+Incremental checkpoints and restores of a project folder
+"""
+
+import os
+import sys
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.checkpoints import CheckpointStore
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def test_watched_checkpoints_only_check_dirty_paths(tmp_path):
+    _write(tmp_path, 'index.html', '<div id="root"></div>')
+    _write(tmp_path, 'src/App.tsx', 'export default 1')
+    store = CheckpointStore(str(tmp_path))
+    store.watched = True
+    first = store.checkpoint('scaffold')
+    assert first['files'] == 2
+
+    store.mark_dirty(_write(tmp_path, 'src/App.tsx', 'export default 2'))
+    _write(tmp_path, 'src/pages/Home.tsx', 'export const Home = 1')
+    store.mark_dirty(str(tmp_path / 'src' / 'pages'))
+    second = store.checkpoint('home page')
+    assert (second['added'], second['modified'], second['parent']) == (1, 1, first['id'])
+
+    # Nothing reported this change, so the checkpoint does not walk the tree to find it
+    _write(tmp_path, 'notes.txt', 'scratch')
+    assert store.checkpoint('nothing')['unchanged']
+    os.unlink(tmp_path / 'notes.txt')
+
+    # Another process moved the head: the next checkpoint scans everything
+    other = CheckpointStore(str(tmp_path))
+    _write(tmp_path, 'index.html', '<main></main>')
+    third = other.checkpoint('edited elsewhere')
+    assert store.head() == third['id']
+    _write(tmp_path, 'README.md', 'docs')
+    assert store.checkpoint('readme')['added'] == 1
+
+    result = store.restore(first['id'])
+    assert sorted(result['removed']) == ['README.md', 'src/pages/Home.tsx']
+    assert not (tmp_path / 'src' / 'pages').exists()
+    assert (tmp_path / 'src' / 'App.tsx').read_text() == 'export default 1'
+    assert store.diff(first['id'])['modified'] == []
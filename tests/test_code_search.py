@@ -0,0 +1,94 @@
+"""
+Trigram search: literal parts of patterns and reindexing of reported changes
+"""
+
+import os
+import re
+import shutil
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.code_search import TrigramIndex, _literal_runs
+
+
+@pytest.mark.parametrize('pattern, runs', [
+    (r'useState\(', ['useState(']),
+    (r'Header|Footer', []),
+    (r'export (?:default )?function', ['export ', 'function']),
+    (r'colou?r', ['colo']),
+    (r'(?:data)?Source', ['Source']),
+    (r'(?:Card)+Title', ['Card', 'Title']),
+    (r'on[A-Z]\w*Change', ['Change']),
+    (r'[Hh]ea[dr]', []),
+    (r'import\s+React', ['import', 'React']),
+    (r'^const apiUrl = ', ['const apiUrl = ']),
+    (r'(unclosed', []),
+])
+def test_literal_runs_are_only_required_substrings(pattern, runs):
+    assert _literal_runs(pattern) == runs
+
+
+def test_literal_runs_keep_candidates_that_match():
+    files = {
+        'a.tsx': 'export function App() {}',
+        'b.tsx': 'export default function Home() {}',
+        'c.tsx': 'const CardCardTitle = 1',
+    }
+    for pattern in (r'export (?:default )?function', r'(?:Card)+Title', r'colou?r|export'):
+        compiled = re.compile(pattern)
+        for text in files.values():
+            if compiled.search(text):
+                assert all(run in text for run in _literal_runs(pattern)), pattern
+
+
+def _write(root, relative, text):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def _paths(result):
+    return sorted({match.split(':', 1)[0].replace(os.sep, '/') for match in result['matches']})
+
+
+def test_watched_index_reindexes_only_reported_paths(tmp_path):
+    _write(tmp_path, 'src/App.tsx', 'export default function App() {}')
+    _write(tmp_path, 'src/pages/Home.tsx', 'export const Home = () => <Header />')
+    _write(tmp_path, 'src/pages/About.tsx', 'export const About = () => <Header />')
+    index = TrigramIndex(str(tmp_path))
+    index.watched = True
+    assert _paths(index.search('Header')) == ['src/pages/About.tsx', 'src/pages/Home.tsx']
+    indexed = index.stats['reindexed']
+
+    index.mark_dirty(_write(tmp_path, 'src/App.tsx', 'export default function App() { return <Header /> }'))
+    assert _paths(index.search('Header')) == ['src/App.tsx', 'src/pages/About.tsx', 'src/pages/Home.tsx']
+    assert index.stats['reindexed'] == indexed + 1
+
+    # A new directory is reported once and indexed whole
+    _write(tmp_path, 'src/components/Header.tsx', 'export function Header() {}')
+    _write(tmp_path, 'src/components/Nav.tsx', 'import { Header } from "./Header"')
+    index.mark_dirty(str(tmp_path / 'src' / 'components'))
+    assert index.search('Header', path_glob='src/components/*')['files_matched'] == 2
+
+    # A removed directory drops every file below it
+    shutil.rmtree(tmp_path / 'src' / 'pages')
+    index.mark_dirty(str(tmp_path / 'src' / 'pages'))
+    result = index.search('Header')
+    assert _paths(result) == ['src/App.tsx', 'src/components/Header.tsx', 'src/components/Nav.tsx']
+    assert result['files_indexed'] == 3
+
+    # Ignored directories are never indexed
+    index.mark_dirty(_write(tmp_path, 'node_modules/lib/index.js', 'Header'))
+    assert index.search('Header')['files_indexed'] == 3
+
+
+def test_definitions_rank_first(tmp_path):
+    _write(tmp_path, 'src/a/Uses.tsx', 'Header\nHeader\nHeader')
+    _write(tmp_path, 'src/Header.tsx', 'export function Header() {}')
+    result = TrigramIndex(str(tmp_path)).search('Header')
+    assert result['matches'][0].startswith(os.path.join('src', 'Header.tsx'))
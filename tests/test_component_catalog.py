@@ -0,0 +1,72 @@
+"""
+Template component catalog as rendered into the developer agent's instruction
+"""
+
+import asyncio
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.component_catalog import build_catalog, format_catalog
+
+# ADK's instruction placeholder pattern; a match whose content is an identifier is looked up in session state
+PLACEHOLDER = re.compile(r'{+[^{}]*}+')
+
+TEMPLATE_FILES = {
+    'tsconfig.json': '{"compilerOptions": {"paths": {"@/*": ["./src/*"]}}}',
+    'src/components/ui/label.tsx': 'export function Label(props: LabelProps) { return null }\n',
+    'src/components/ui/button.tsx': (
+        'const buttonVariants = cva("base", {\n'
+        '  variants: { variant: { default: "a", outline: "b" } },\n'
+        '  defaultVariants: { variant: "default" },\n'
+        '})\n'
+        'export interface ButtonProps { asChild?: boolean }\n'
+        'export { Button, buttonVariants }\n'
+    ),
+    'src/hooks/use-mobile.tsx': 'export function useIsMobile() { return false }\n',
+}
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    for relative, content in TEMPLATE_FILES.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return build_catalog(str(tmp_path))
+
+
+def _inject_session_state(instruction: str) -> str:
+    """Run ADK's state injection with an empty session state"""
+    session = SimpleNamespace(state={}, app_name='app', user_id='user', id='session')
+    try:
+        from google.adk.utils.instructions_utils import inject_session_state
+    except ImportError:
+        from google.adk.flows.llm_flows.instructions import _populate_values
+        return asyncio.run(_populate_values(instruction, SimpleNamespace(session=session, artifact_service=None)))
+    context = SimpleNamespace(_invocation_context=SimpleNamespace(session=session, artifact_service=None))
+    return asyncio.run(inject_session_state(instruction, context))
+
+
+def test_catalog_lines_have_no_state_placeholders(catalog):
+    text = format_catalog(catalog)
+    assert 'Label from "@/components/ui/label"' in text
+    assert 'useIsMobile from "@/hooks/use-mobile"' in text
+    assert 'variant=default*|outline' in text
+    identifiers = [m.group().strip('{} ?') for m in PLACEHOLDER.finditer(text)]
+    assert not [name for name in identifiers if name.isidentifier()]
+
+
+def test_instruction_with_catalog_survives_state_injection(catalog):
+    pytest.importorskip('google.adk')
+    from src.agents.specialized_agents import build_components_section
+
+    section = build_components_section(catalog)
+    assert 'Label' in section
+    assert _inject_session_state(section) == section
@@ -0,0 +1,137 @@
+"""
+Session event logs: round trip, crash recovery and restoring a session
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from src.services.event_log import (
+    EVENT, INDEX_SUFFIX, TURN_END, TURN_START, EventLogReader, EventLogWriter, log_path, restore_session
+)
+
+SESSION = 'session-1'
+
+
+def _event(invocation_id: str, text: str) -> bytes:
+    content = types.Content(role='model', parts=[types.Part(text=text)])
+    return Event(invocation_id=invocation_id, author='builder', content=content).model_dump_json(exclude_none=True).encode()
+
+
+def _turn(writer: EventLogWriter, invocation_id: str, texts, ended: bool = True):
+    user = types.Content(role='user', parts=[types.Part(text=f'request {invocation_id}')])
+    writer.submit(SESSION, TURN_START, invocation_id, {
+        'invocation_id': invocation_id, 'at': 1700000000.0, 'user': user.model_dump(mode='json', exclude_none=True),
+    })
+    for text in texts:
+        writer.submit(SESSION, EVENT, invocation_id, _event(invocation_id, text))
+    if ended:
+        writer.submit(SESSION, TURN_END, invocation_id, {'at': 1700000001.0})
+
+
+def _texts(events):
+    return [event.content.parts[0].text for event in events]
+
+
+def test_turns_are_read_back_after_each_flush(tmp_path):
+    writer = EventLogWriter(str(tmp_path), flush_interval=60)
+    reader = EventLogReader(log_path(str(tmp_path), SESSION))
+    try:
+        _turn(writer, 'inv-1', ['Created the layout', 'x' * 2000])
+        writer.flush()
+        assert [(t['turn'], t['records'], t['completed']) for t in reader.turns()] == [(1, 4, True)]
+
+        _turn(writer, 'inv-2', ['Added the header'], ended=False)
+        writer.flush()
+        # Still running: found past the index, not completed yet
+        assert [(t['turn'], t['completed']) for t in reader.turns()] == [(1, True), (2, False)]
+        assert _texts(reader.events(2)) == ['request inv-2', 'Added the header']
+    finally:
+        writer.close()
+
+    assert [(t['turn'], t['completed']) for t in reader.turns()] == [(1, True), (2, False)]
+    assert _texts(reader.events(1)) == ['request inv-1', 'Created the layout', 'x' * 2000]
+
+
+def test_tail_turns_with_an_end_record_are_completed(tmp_path):
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-1', ['Created the layout'])
+    writer.close()
+    path = log_path(str(tmp_path), SESSION)
+    # The process died after writing the records, before the index entry
+    open(path[:-len('.evlog')] + INDEX_SUFFIX, 'wb').close()
+
+    assert [(t['turn'], t['records'], t['completed']) for t in EventLogReader(path).turns()] == [(1, 3, True)]
+
+
+def test_torn_record_is_cut_off_and_logging_continues(tmp_path):
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-1', ['Created the layout'])
+    _turn(writer, 'inv-2', ['Added the header'])
+    writer.close()
+    path = log_path(str(tmp_path), SESSION)
+    reader = EventLogReader(path)
+    second = reader.turns()[1]
+    # Crash in the middle of the second turn's last record, before its index entry
+    with open(path, 'r+b') as f:
+        f.truncate(second['end'] - 3)
+    with open(reader.index_path, 'r+b') as f:
+        f.truncate(os.path.getsize(reader.index_path) // 2)
+
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-3', ['Built the home page'])
+    writer.close()
+
+    assert [(t['turn'], t['completed']) for t in reader.turns()] == [(1, True), (2, False), (3, True)]
+    assert _texts(reader.events(3)) == ['request inv-3', 'Built the home page']
+    assert _texts(reader.events()) == [
+        'request inv-1', 'Created the layout', 'request inv-2', 'Added the header',
+        'request inv-3', 'Built the home page',
+    ]
+
+
+def test_index_entry_past_the_end_of_the_log_is_dropped(tmp_path):
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-1', ['Created the layout'])
+    _turn(writer, 'inv-2', ['Added the header'])
+    writer.close()
+    path = log_path(str(tmp_path), SESSION)
+    reader = EventLogReader(path)
+    # The index reached the disk, the second turn's records did not
+    with open(path, 'r+b') as f:
+        f.truncate(reader.turns()[0]['end'])
+    assert [t['turn'] for t in reader.turns()] == [1]
+
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-3', ['Built the home page'])
+    writer.close()
+
+    assert [(t['turn'], t['completed']) for t in reader.turns()] == [(1, True), (2, True)]
+    assert _texts(reader.events(2)) == ['request inv-3', 'Built the home page']
+
+
+def test_restore_session_replays_the_log(tmp_path):
+    writer = EventLogWriter(str(tmp_path))
+    _turn(writer, 'inv-1', ['Created the layout'])
+    _turn(writer, 'inv-2', ['Added the header'])
+    writer.close()
+
+    service = InMemorySessionService()
+    session = asyncio.run(restore_session(service, 'app', 'user', SESSION, str(tmp_path)))
+    stored = asyncio.run(service.get_session(app_name='app', user_id='user', session_id=SESSION))
+    assert session.id == SESSION
+    assert _texts(stored.events) == ['request inv-1', 'Created the layout', 'request inv-2', 'Added the header']
+    assert [event.author for event in stored.events] == ['user', 'builder', 'user', 'builder']
+
+    assert asyncio.run(restore_session(service, 'app', 'user', 'unknown', str(tmp_path))) is None
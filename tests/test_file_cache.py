@@ -0,0 +1,62 @@
+"""
+File read cache: hits, invalidation and byte-based limits
+"""
+
+import os
+import sys
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.file_cache import FileReadCache
+
+
+def _write(path, text):
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_hits_until_the_file_changes_or_is_invalidated(tmp_path):
+    cache = FileReadCache()
+    path = _write(tmp_path / 'App.jsx', 'export default 1\n')
+    assert cache.read(path) == ('export default 1\n', False)
+    assert cache.read(path) == ('export default 1\n', False)
+    assert (cache.stats['hits'], cache.stats['misses']) == (1, 1)
+
+    _write(tmp_path / 'App.jsx', 'export default 22\n')
+    assert cache.read(path)[0] == 'export default 22\n'
+
+    cache.invalidate(str(tmp_path))
+    assert cache.info()['entries'] == 0 and cache.info()['bytes'] == 0
+    assert cache.read(path)[0] == 'export default 22\n'
+    assert cache.stats['misses'] == 3
+
+
+def test_limits_and_capacity_count_bytes_not_characters(tmp_path):
+    # Nine characters, 27 bytes in UTF-8
+    path = _write(tmp_path / 'ar.txt', 'تشكيل كود')
+    size = os.path.getsize(path)
+    cache = FileReadCache(max_bytes=2 * size)
+
+    assert cache.read(path, max_bytes=11) == ('تشكيل ', True)
+    assert cache.info()['bytes'] == 11
+    # Another limit reads again instead of cutting the cached text by characters
+    assert cache.read(path, max_bytes=6) == ('تشك', True)
+    assert cache.read(path) == ('تشكيل كود', False)
+    assert cache.info()['bytes'] == size
+    assert cache.read(path, max_bytes=size) == ('تشكيل كود', False)
+    assert cache.stats['hits'] == 1
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    paths = [_write(tmp_path / f'{name}.txt', name * 10) for name in 'abc']
+    cache = FileReadCache(max_bytes=25)
+    cache.read(paths[0])
+    cache.read(paths[1])
+    cache.read(paths[0])
+    cache.read(paths[2])
+
+    assert cache.stats['evictions'] == 1
+    assert cache.info()['bytes'] == 20
+    cache.read(paths[0])
+    assert cache.stats['hits'] == 2
@@ -0,0 +1,38 @@
+"""
+Atomic file batches: modes of new files and rollback
+"""
+
+import os
+import stat
+import sys
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools import file_ops
+from src.tools.file_ops import write_files
+
+
+def test_new_files_get_the_umask_mode(tmp_path):
+    result = write_files([{'path': 'src/App.jsx', 'content': 'export default 1\n'}], str(tmp_path))
+    assert result['success']
+    assert stat.S_IMODE(os.stat(tmp_path / 'src' / 'App.jsx').st_mode) == 0o666 & ~file_ops._UMASK
+
+
+def test_rollback_removes_directories_created_for_the_batch(tmp_path, monkeypatch):
+    (tmp_path / 'src').mkdir()
+    replace = os.replace
+
+    def failing_replace(source, target):
+        if target.endswith('broken.txt'):
+            raise OSError('disk full')
+        replace(source, target)
+
+    monkeypatch.setattr(file_ops.os, 'replace', failing_replace)
+    result = write_files([
+        {'path': 'src/pages/home/Home.jsx', 'content': 'export const Home = 1\n'},
+        {'path': 'src/broken.txt', 'content': 'x'},
+    ], str(tmp_path))
+
+    assert not result['success']
+    assert sorted(os.listdir(tmp_path / 'src')) == []
@@ -0,0 +1,29 @@
+"""
+Cold-start import budget for the entry points
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.import_time import measure_import
+
+# Generous enough for slow CI machines, far below what google.adk costs
+IMPORT_TIME_BUDGET_MS = float(os.getenv('IMPORT_TIME_BUDGET_MS', '300'))
+
+
+@pytest.mark.parametrize('statement', [
+    'import main',
+    'import tashkill_agent',
+    'import src, src.agents, src.config, src.models, src.services, src.tools, src.utils',
+])
+def test_cold_import_stays_within_budget(statement):
+    result = measure_import(statement)
+    assert not result['heavy'], f"{statement} loaded heavy modules: {result['heavy']}"
+    assert result['ms'] < IMPORT_TIME_BUDGET_MS, (
+        f"{statement} took {result['ms']:.0f} ms, budget is {IMPORT_TIME_BUDGET_MS:.0f} ms"
+    )
@@ -0,0 +1,81 @@
+"""
+Memory accounting of sessions that are dropped without being forgotten or whose turn failed
+"""
+
+import asyncio
+import gc
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.memory import MemoryAccountant, merge_snapshots
+
+
+class FakeManager:
+    def __init__(self, session_id: str):
+        self.session = SimpleNamespace(id=session_id, app_name='app', user_id='user', events=[], state={'k': 'v'})
+        self.session_service = None
+        self.artifacts_service = None
+
+
+def test_dropped_session_is_not_pinned(tmp_path):
+    accountant = MemoryAccountant(10 ** 9, 10 ** 9, spill_dir=str(tmp_path))
+    manager = FakeManager('page')
+    accountant.after_turn(manager)
+    accountant.after_turn(manager)
+    assert accountant.snapshot()['sessions'] == 1
+
+    # A newer manager for the same session keeps it tracked when the old one goes
+    newer = FakeManager('page')
+    accountant.after_turn(newer)
+    del manager
+    gc.collect()
+    assert accountant.snapshot()['sessions'] == 1
+
+    del newer
+    gc.collect()
+    assert accountant.snapshot()['sessions'] == 0
+
+
+def test_worker_snapshots_are_summed(tmp_path):
+    accountant = MemoryAccountant(10 ** 9, 10 ** 9, spill_dir=str(tmp_path))
+    managers = [FakeManager('a'), FakeManager('b')]
+    for manager in managers:
+        accountant.after_turn(manager)
+    local = MemoryAccountant(10 ** 9, 10 ** 9).snapshot()
+    worker = {**accountant.snapshot(), 'worker': 0}
+
+    merged = merge_snapshots([local, worker])
+    assert merged['sessions'] == 2
+    assert [s['session_id'] for s in merged['largest_sessions']] == ['a', 'b']
+    assert [p.get('worker') for p in merged['processes']] == [None, 0]
+
+
+def test_failed_turn_is_still_accounted(tmp_path, monkeypatch):
+    pytest.importorskip('google.adk')
+    import main
+    from src.services import memory
+
+    accountant = MemoryAccountant(10 ** 9, 10 ** 9, spill_dir=str(tmp_path))
+    monkeypatch.setattr(memory, '_accountant', accountant)
+    manager = FakeManager('failed')
+
+    async def run_async(**kwargs):
+        yield SimpleNamespace(id='e1')
+        raise RuntimeError('model unavailable')
+
+    async def initialize_runner():
+        return SimpleNamespace(run_async=run_async)
+
+    manager.initialize_runner = initialize_runner
+
+    async def run():
+        return [event async for event in main.run_agent_async('go', session_manager=manager)]
+
+    assert len(asyncio.run(run())) == 1
+    assert accountant.snapshot()['sessions'] == 1
@@ -0,0 +1,125 @@
+"""
+Unified-diff parsing and hunk placement of the patch tool
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.patching import PatchConflict, apply_hunks, apply_patch, parse_patch
+
+TWO_BLOCKS = (
+    "function first() {\n"
+    "  const value = 1;\n"
+    "  return value;\n"
+    "}\n"
+    "function second() {\n"
+    "  const value = 1;\n"
+    "  return value;\n"
+    "}\n"
+)
+
+
+def test_multi_file_git_diff(tmp_path):
+    (tmp_path / 'x.txt').write_text('a\nb\nc\n')
+    (tmp_path / 'y.txt').write_text('1\n2\n3\n')
+    patch = (
+        "diff --git a/x.txt b/x.txt\n"
+        "index 1111111..2222222 100644\n"
+        "--- a/x.txt\n"
+        "+++ b/x.txt\n"
+        "@@ -1,3 +1,3 @@\n"
+        " a\n"
+        "-b\n"
+        "+B\n"
+        " c\n"
+        "diff --git a/y.txt b/y.txt\n"
+        "old mode 100644\n"
+        "new mode 100755\n"
+        "index 3333333..4444444\n"
+        "--- a/y.txt\n"
+        "+++ b/y.txt\n"
+        "@@ -2,2 +2,2 @@\n"
+        "-2\n"
+        "+two\n"
+        " 3\n"
+        "diff --git a/z.txt b/z.txt\n"
+        "new file mode 100644\n"
+        "index 0000000..5555555\n"
+        "--- /dev/null\n"
+        "+++ b/z.txt\n"
+        "@@ -0,0 +1 @@\n"
+        "+new\n"
+    )
+    result = apply_patch(patch, str(tmp_path))
+    assert result['success'], result
+    assert (tmp_path / 'x.txt').read_text() == 'a\nB\nc\n'
+    assert (tmp_path / 'y.txt').read_text() == '1\ntwo\n3\n'
+    assert (tmp_path / 'z.txt').read_text() == 'new\n'
+
+
+def test_anchor_selects_between_identical_blocks():
+    hunks = parse_patch(
+        "@@ function second() { @@\n"
+        "   const value = 1;\n"
+        "-  return value;\n"
+        "+  return value * 2;\n",
+        default_path='f.js'
+    )[0].hunks
+    assert hunks[0].anchor == 'function second() {'
+    content, _ = apply_hunks(TWO_BLOCKS, hunks)
+    assert content.splitlines()[2] == '  return value;'
+    assert content.splitlines()[6] == '  return value * 2;'
+
+
+def test_ambiguous_context_is_a_conflict():
+    hunks = parse_patch("@@\n   const value = 1;\n-  return value;\n+  return 0;\n", default_path='f.js')[0].hunks
+    with pytest.raises(PatchConflict) as conflict:
+        apply_hunks(TWO_BLOCKS, hunks)
+    assert conflict.value.details['matches'] == [2, 6]
+
+
+def test_line_numbers_still_pick_the_nearest_match():
+    hunks = parse_patch(
+        "@@ -6,2 +6,2 @@ function second() {\n   const value = 1;\n-  return value;\n+  return 2;\n",
+        default_path='f.js'
+    )[0].hunks
+    content, _ = apply_hunks(TWO_BLOCKS, hunks)
+    assert content.splitlines()[6] == '  return 2;'
+
+
+def test_sections_for_the_same_file_both_apply(tmp_path):
+    (tmp_path / 'f.txt').write_text(''.join(f'{n}\n' for n in range(1, 9)))
+    patch = (
+        "--- a/f.txt\n+++ b/f.txt\n@@ -1,2 +1,2 @@\n-1\n+one\n 2\n"
+        "--- a/f.txt\n+++ b/f.txt\n@@ -7,2 +7,2 @@\n 7\n-8\n+eight\n"
+    )
+    result = apply_patch(patch, str(tmp_path))
+    assert result['success'], result
+    assert [f['path'] for f in result['files']] == ['f.txt'] and result['files'][0]['hunks'] == 2
+    assert (tmp_path / 'f.txt').read_text().splitlines() == ['one', '2', '3', '4', '5', '6', '7', 'eight']
+
+
+def test_new_file_patch_does_not_overwrite(tmp_path):
+    (tmp_path / 'g.txt').write_text('keep\n')
+    result = apply_patch("--- /dev/null\n+++ b/g.txt\n@@ -0,0 +1 @@\n+new\n", str(tmp_path))
+    assert not result['success'] and result['conflict']['path'] == 'g.txt'
+    assert (tmp_path / 'g.txt').read_text() == 'keep\n'
+
+
+def test_header_like_lines_inside_a_hunk(tmp_path):
+    (tmp_path / 'notes.md').write_text('intro\n-- x\nfor (;;) {}\n')
+    patch = (
+        "--- a/notes.md\n+++ b/notes.md\n@@ -1,3 +1,3 @@\n"
+        " intro\n"
+        "--- x\n"
+        "+++ y\n"
+        " for (;;) {}\n"
+    )
+    result = apply_patch(patch, str(tmp_path))
+    assert result['success'], result
+    assert (tmp_path / 'notes.md').read_text() == 'intro\n++ y\nfor (;;) {}\n'
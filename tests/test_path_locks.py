@@ -0,0 +1,32 @@
+"""
+Path lock keys of the same file spelled through a symlink
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.path_locks import PathLocks
+
+
+def test_symlinked_and_relative_paths_share_a_lock(tmp_path):
+    project = tmp_path / 'project'
+    project.mkdir()
+    link = tmp_path / 'link'
+    link.symlink_to(project, target_is_directory=True)
+    locks = PathLocks(str(link), timeout=0.05)
+
+    # npm holds the lock through the working directory, a file tool through the project-relative path
+    with locks.hold([os.path.join(str(link), 'package.json')]):
+        with pytest.raises(TimeoutError):
+            with locks.hold(['package.json']):
+                pass
+        with pytest.raises(TimeoutError):
+            with locks.hold([str(project / 'package.json')]):
+                pass
+        with locks.hold(['src/App.jsx']):
+            pass
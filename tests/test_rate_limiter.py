@@ -0,0 +1,145 @@
+"""
+Model rate limiting: token buckets, adaptive concurrency and turn deadlines
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from src.models import rate_limiter
+from src.models.rate_limiter import (
+    AdaptiveConcurrency,
+    RateLimitedLlm,
+    RateLimitTimeout,
+    TokenBucket,
+    is_throttling_error,
+    set_turn_deadline,
+)
+from src.models.stub_llm import StubLlm
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class Throttled(Exception):
+    code = 429
+
+
+def test_bucket_refills_at_its_rate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    bucket = TokenBucket(per_minute=60, capacity=10)
+    assert asyncio.run(bucket.take(10)) == 0.0
+    assert bucket.delay(3) == pytest.approx(3.0)
+
+    clock.now += 2
+    assert bucket.delay(3) == pytest.approx(1.0)
+    clock.now += 60
+    assert bucket.delay(10) == 0.0 and bucket.tokens == 10
+
+
+def test_concurrency_halves_on_throttle_and_grows_back():
+    concurrency = AdaptiveConcurrency(8)
+
+    async def calls(throttled, count=1):
+        for _ in range(count):
+            await concurrency.acquire()
+            concurrency.release(throttled)
+
+    asyncio.run(calls(True))
+    assert concurrency.limit == 4
+    asyncio.run(calls(True, 3))
+    assert concurrency.limit == 1
+
+    # One more slot after `limit` successes in a row
+    asyncio.run(calls(False))
+    assert concurrency.limit == 2
+    asyncio.run(calls(False, 2))
+    assert concurrency.limit == 3
+
+
+def test_concurrency_slot_is_handed_across_event_loops():
+    concurrency = AdaptiveConcurrency(1)
+    asyncio.run(concurrency.acquire())
+    admitted = threading.Event()
+
+    def other_session():
+        async def run():
+            await concurrency.acquire()
+            admitted.set()
+            concurrency.release(False)
+        asyncio.run(run())
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    assert not admitted.wait(0.2)
+    concurrency.release(False)
+    assert admitted.wait(5)
+    thread.join(5)
+    assert concurrency.active == 0
+
+
+def test_waits_past_the_turn_deadline_give_up():
+    bucket = TokenBucket(per_minute=6, capacity=1)
+
+    async def take_twice():
+        token = set_turn_deadline(1)
+        try:
+            await bucket.take(1)
+            await bucket.take(1)
+        finally:
+            rate_limiter._turn_deadline.reset(token)
+
+    with pytest.raises(RateLimitTimeout):
+        asyncio.run(take_twice())
+    # The refused take did not reserve anything
+    assert bucket.tokens == pytest.approx(0, abs=0.01)
+
+
+def test_throttled_call_is_not_retried_past_the_deadline(monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'get_model_limiter', lambda model: rate_limiter.ModelLimiter(model, 0, 0, 4))
+
+    class Failing(StubLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            raise Throttled('slow down')
+            yield
+
+    model = RateLimitedLlm(model='stub/x', inner=Failing(model='stub/x'), backoff_base=60, backoff_cap=60)
+
+    async def call():
+        token = set_turn_deadline(0.5)
+        try:
+            async for _ in model.generate_content_async(rate_limiter.LlmRequest()):
+                pass
+        finally:
+            rate_limiter._turn_deadline.reset(token)
+
+    monkeypatch.setattr(rate_limiter.random, 'uniform', lambda low, high: high)
+    with pytest.raises(Throttled):
+        asyncio.run(call())
+
+
+def test_only_status_or_type_marks_a_throttle():
+    class RateLimitError(Exception):
+        pass
+
+    class StatusError(Exception):
+        status = 'RESOURCE_EXHAUSTED'
+
+    assert is_throttling_error(Throttled())
+    assert is_throttling_error(RateLimitError('busy'))
+    assert is_throttling_error(StatusError())
+    assert not is_throttling_error(ValueError('File src/quota.ts line 429 has a type error'))
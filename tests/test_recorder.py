@@ -0,0 +1,98 @@
+"""
+Cassette record and replay of a streamed session
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from src.models import StubLlm
+from src.services.recorder import CassettePlayer, CassetteRecorder
+
+
+class SseStub(StubLlm):
+    """Answers like Gemini in SSE mode: text and function call as two final responses of one call"""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        model_turns, _ = self._turn_state(llm_request)
+        if model_turns:
+            yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text='All done')]))
+            return
+        yield LlmResponse(content=types.Content(role='model', parts=[types.Part(text='Reading the file')]))
+        call = types.FunctionCall(name='read_file', args={'path': 'src/App.jsx'})
+        yield LlmResponse(content=types.Content(role='model', parts=[types.Part(function_call=call)]))
+
+
+class Unreachable(StubLlm):
+    async def generate_content_async(self, llm_request, stream=False):
+        raise AssertionError('replay called the model')
+        yield
+
+
+def read_file(path: str) -> dict:
+    """Read a file"""
+    return {'content': f'contents of {path}'}
+
+
+def _run(model, plugin):
+    agent = LlmAgent(name='builder', model=model, instruction='Build it', tools=[read_file])
+    runner = Runner(app_name='test', agent=agent, session_service=InMemorySessionService(), plugins=[plugin])
+
+    async def run():
+        session = await runner.session_service.create_session(app_name='test', user_id='u')
+        message = types.Content(role='user', parts=[types.Part(text='Fix the app')])
+        events = []
+        async for event in runner.run_async(
+            user_id='u', session_id=session.id, new_message=message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        ):
+            if not event.partial:
+                events.append(event)
+        return events
+
+    return asyncio.run(run())
+
+
+def _summary(events):
+    summary = []
+    for event in events:
+        for part in event.content.parts if event.content else []:
+            if part.text:
+                summary.append(('text', part.text))
+            if part.function_call:
+                summary.append(('call', part.function_call.name))
+            if part.function_response:
+                summary.append(('result', part.function_response.response['content']))
+    return summary
+
+
+def test_streamed_session_replays_from_its_recording(tmp_path):
+    cassette = str(tmp_path / 'session.jsonl')
+    recorder = CassetteRecorder(cassette)
+    recorded = _run(SseStub(model='stub/sse'), recorder)
+    recorder.close()
+
+    player = CassettePlayer(cassette)
+    replayed = _run(Unreachable(model='stub/none'), player)
+
+    assert _summary(replayed) == _summary(recorded) == [
+        ('text', 'Reading the file'),
+        ('call', 'read_file'),
+        ('result', 'contents of src/App.jsx'),
+        ('text', 'All done'),
+    ]
+    assert player.stats == {'model_replays': 2, 'tool_replays': 1, 'misses': 0}
@@ -0,0 +1,38 @@
+"""
+Turn scheduler backpressure
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.scheduler import PRIORITY_BATCH, SchedulerSaturated, TurnScheduler
+
+
+@pytest.mark.parametrize('max_queue', [0, 1])
+def test_wait_for_space_yields_until_a_slot_frees(max_queue):
+    async def scenario():
+        scheduler = TurnScheduler(max_workers=1, max_queue=max_queue)
+        held = [await scheduler.acquire('a')]
+        held += [scheduler.submit('b') for _ in range(max_queue)]
+        with pytest.raises(SchedulerSaturated):
+            scheduler.submit('c')
+
+        waiter = asyncio.create_task(scheduler.acquire('c', PRIORITY_BATCH, wait_for_space=True))
+        # A saturated scheduler must not keep the loop busy while the waiter is blocked
+        await asyncio.wait_for(asyncio.sleep(0.05), timeout=1)
+        assert not waiter.done()
+
+        for ticket in held:
+            ticket.release()
+            await asyncio.sleep(0.01)
+        ticket = await asyncio.wait_for(waiter, timeout=1)
+        assert ticket.started is not None
+        assert scheduler.running == 1 and scheduler.queued == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
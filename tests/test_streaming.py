@@ -0,0 +1,51 @@
+"""
+Stream chunks of interleaved agents
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from google.adk.events import Event
+from google.genai import types
+
+from src.services.streaming import stream_chunks
+
+
+def _event(author, text, partial):
+    content = types.Content(role='model', parts=[types.Part(text=text)])
+    return Event(author=author, invocation_id='i', content=content, partial=partial)
+
+
+def test_final_events_of_interleaved_workers_are_not_shown_twice():
+    events = [
+        _event('worker_1', 'Building ', True),
+        _event('worker_2', 'Styling ', True),
+        _event('worker_1', 'the header', True),
+        _event('worker_2', 'the page', True),
+        _event('worker_2', 'Styling the page', False),
+        _event('worker_1', 'Building the header', False),
+        # Not streamed before, so shown as is
+        _event('worker_1', 'Header done', False),
+    ]
+
+    async def collect():
+        async def source():
+            for event in events:
+                yield event
+        return [(chunk.author, chunk.text) async for chunk in stream_chunks(source())]
+
+    assert asyncio.run(collect()) == [
+        ('worker_1', 'Building '),
+        ('worker_2', 'Styling '),
+        ('worker_1', 'the header'),
+        ('worker_2', 'the page'),
+        ('worker_1', 'Header done'),
+    ]
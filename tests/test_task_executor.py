@@ -0,0 +1,114 @@
+"""
+Concurrent task execution against the stub model
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+pytest.importorskip('google.adk')
+
+from typing import AsyncGenerator, ClassVar, List
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from src.agents.task_executor import TaskExecutor, parse_task_graph
+from src.models import StubLlm
+
+TASKS = """
+**Phase 1: Setup**
+- [ ] Create the layout
+- [ ] Create the header
+**Phase 2: Pages**
+- [ ] Build the home page
+"""
+
+
+class RecordingStub(StubLlm):
+    """Stub that notes, per request, whether the previous tool call is in the history"""
+    requests: ClassVar[List[int]] = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        model_turns, _ = self._turn_state(llm_request)
+        RecordingStub.requests.append(model_turns)
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+class ExecutorAgent(BaseAgent):
+    """Runs the task list through a TaskExecutor, like DevFlowAgent does"""
+    executor: TaskExecutor
+    tasks: str = TASKS
+
+    model_config = {'arbitrary_types_allowed': True}
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        async for event in self.executor.run(ctx, parse_task_graph(self.tasks)):
+            yield event
+
+
+def _run(agent: BaseAgent) -> List[Event]:
+    async def scenario():
+        sessions = InMemorySessionService()
+        session = await sessions.create_session(app_name='test', user_id='u')
+        runner = Runner(app_name='test', agent=agent, session_service=sessions)
+        message = types.Content(role='user', parts=[types.Part(text='go')])
+        return [event async for event in runner.run_async(user_id='u', session_id=session.id, new_message=message)]
+
+    return asyncio.run(asyncio.wait_for(scenario(), timeout=30))
+
+
+def test_workers_see_their_own_tool_results(tmp_path):
+    calls = []
+
+    def record_step(name: str) -> dict:
+        """Record a step"""
+        calls.append(name)
+        return {'success': True}
+
+    model = RecordingStub(model='stub/tasks', script=[
+        {'tool': 'record_step', 'args': {'name': 'step'}},
+        {'text': 'Changed one file.'},
+    ], latency=0.01)
+    template = LlmAgent(name='Developer', model=model, instruction='Build it.', tools=[record_step])
+    agent = ExecutorAgent(name='Orchestrator', executor=TaskExecutor(template, str(tmp_path), max_workers=2))
+
+    events = _run(agent)
+    results = events[-1].actions.state_delta['task_results']
+    assert [r['status'] for r in results.values()] == ['ok', 'ok', 'ok']
+    # Each worker's second request already contains its function call and response
+    assert len(calls) == 3
+    assert sorted(RecordingStub.requests) == [0, 0, 0, 1, 1, 1]
+
+
+def test_braced_task_title_is_not_a_state_placeholder(tmp_path):
+    instructions = []
+
+    class InstructionStub(StubLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            instructions.append(llm_request.config.system_instruction)
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+
+    model = InstructionStub(model='stub/braces', script=[{'text': 'Done.'}])
+    template = LlmAgent(name='Developer', model=model, instruction='Build it.')
+    agent = ExecutorAgent(
+        name='Orchestrator',
+        executor=TaskExecutor(template, str(tmp_path), max_workers=1),
+        tasks='**Phase 1: UI**\n- [ ] Render `{children}` in Card with `{ padding: 4 }`\n',
+    )
+
+    events = _run(agent)
+    results = events[-1].actions.state_delta['task_results']
+    assert [r['status'] for r in results.values()] == ['ok']
+    assert 'Render `children` in Card with `{ padding: 4 }`' in instructions[0]
@@ -0,0 +1,30 @@
+"""
+Transcript store eviction
+"""
+
+import os
+import sys
+import time
+
+# Add repo root to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services.transcript import TranscriptStore
+
+
+def test_active_transcripts_are_kept_and_evicted_ones_are_marked():
+    store = TranscriptStore(max_transcripts=2, idle_seconds=0.05)
+    first = store.get('first')
+    first.append('user', 'Build a todo app')
+    store.get('second')
+    store.get('third')
+    # Over the limit, but every page was used just now
+    assert store.get('first') is first
+
+    time.sleep(0.1)
+    store.get('fourth')
+    assert store.get('first') is first and len(first) == 1 and not first.expired
+
+    replaced = store.get('second')
+    assert replaced.expired and len(replaced) == 0
+    assert not store.get('new').expired
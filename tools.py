@@ -1,14 +1,174 @@
+import asyncio
+import atexit
+import functools
 import os
+import re
 import shutil
-import subprocess
-from typing import Optional, Dict, Any
+import threading
+import time
+from typing import Optional, Dict, Any, List
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 load_dotenv()
 
+from src.tools.file_ops import read_files, write_files
+from src.tools.patching import apply_patch, parse_patch
+from src.tools.file_cache import create_watched_cache
+from src.tools.code_search import TrigramIndex
+from src.tools.component_catalog import get_component_catalog
+from src.tools.checkpoints import CheckpointStore
+from src.tools.npm_summary import summarize_npm, summarize_npm_list
+from src.tools.tool_logs import LogStore
+from src.tools.build_check import find_typescript_project, get_type_checker, stop_type_checkers
+from src.tools.commands import read_deadline, run_command
+from src.tools.path_locks import PathLocks
+
 mcp = FastMCP('tashkil_mcp_server')
+atexit.register(stop_type_checkers)
+
+_file_cache = None
+_file_watcher = None
+_search_index = None
+_checkpoints = None
+_logs = None
+_path_locks = None
+# Tools run in worker threads; the lazy singletons below are created under this lock
+_singletons_lock = threading.RLock()
+
+# Files npm rewrites; installs and removals of one project must not overlap
+NPM_PATHS = ['package.json', 'package-lock.json', 'node_modules']
+
+
+def _tool(name: str):
+    """
+    Register a tool that runs in a worker thread
+
+    FastMCP calls plain functions on its event loop, so one slow call
+    (npm, a type check) would hold up every other request. Registered as
+    coroutines that hand the work to a thread, the calls of one model step
+    run concurrently; writes are serialized per path with _get_path_locks().
+    The module-level function stays synchronous.
+    """
+    def register(fn):
+        @functools.wraps(fn)
+        async def run(*args, **kwargs):
+            return await asyncio.to_thread(fn, *args, **kwargs)
+
+        mcp.tool(name)(run)
+        return fn
+
+    return register
+
+
+def _project_root() -> str:
+    """Root folder the file tools are allowed to touch"""
+    return os.path.abspath(os.getenv('TARGET_FOLDER_PATH', os.getcwd()))
+
+
+def _get_file_cache():
+    """Create the read cache on first use, once the project root exists"""
+    global _file_cache, _file_watcher
+    if _file_cache is None:
+        with _singletons_lock:
+            if _file_cache is None and os.path.isdir(_project_root()):
+                max_bytes = int(os.getenv('FILE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+                cache, _file_watcher = create_watched_cache(_project_root(), max_bytes)
+                _file_cache = cache
+    return _file_cache
+
+
+def _get_search_index() -> TrigramIndex:
+    """Create the code search index on first use; the file watcher keeps it current"""
+    global _search_index
+    if _search_index is None:
+        with _singletons_lock:
+            if _search_index is None:
+                index = TrigramIndex(_project_root(), max_file_bytes=int(os.getenv('SEARCH_MAX_FILE_BYTES', str(1024 * 1024))))
+                _get_file_cache()
+                if _file_watcher is not None:
+                    _file_watcher.add_listener(index.mark_dirty, index.mark_all_dirty)
+                    index.watched = True
+                # Published only once it is wired to the watcher
+                _search_index = index
+    return _search_index
+
+
+def _file_changed(path: str):
+    """Drop a file written by a tool from the read cache and the search index, and mark it for the next checkpoint"""
+    if _file_cache is not None:
+        _file_cache.invalidate(path)
+    if _search_index is not None:
+        _search_index.mark_dirty(path)
+    if _checkpoints is not None:
+        _checkpoints.mark_dirty(path)
+
+def _get_checkpoints() -> CheckpointStore:
+    """Create the checkpoint store on first use; the file watcher reports changes made outside the tools"""
+    global _checkpoints
+    if _checkpoints is None:
+        with _singletons_lock:
+            if _checkpoints is None:
+                store = CheckpointStore(_project_root())
+                _get_file_cache()
+                if _file_watcher is not None:
+                    _file_watcher.add_listener(store.mark_dirty, store.mark_all_dirty)
+                    store.watched = True
+                _checkpoints = store
+    return _checkpoints
 
-@mcp.tool('tashkil-create-react-project')
+
+def _get_path_locks() -> PathLocks:
+    global _path_locks
+    if _path_locks is None:
+        with _singletons_lock:
+            if _path_locks is None:
+                _path_locks = PathLocks(_project_root(), timeout=float(os.getenv('PATH_LOCK_TIMEOUT', '120')))
+    return _path_locks
+
+
+def _get_logs() -> LogStore:
+    global _logs
+    if _logs is None:
+        with _singletons_lock:
+            if _logs is None:
+                _logs = LogStore(_project_root())
+    return _logs
+
+
+def _command_timeout() -> float:
+    return float(os.getenv('TOOL_COMMAND_TIMEOUT', '600'))
+
+
+def _run_npm(args: List[str], success_message: str, failure_message: str) -> Dict[str, Any]:
+    """Run npm, keep the full output as a log and return only a compact summary"""
+    started = time.perf_counter()
+    # Absolute keys under the working directory npm runs in; the locks resolve symlinks
+    with _get_path_locks().hold(os.path.join(os.getcwd(), path) for path in NPM_PATHS):
+        result = run_command(['npm', *args], cwd=os.getcwd(), root=_project_root(), timeout=_command_timeout())
+    summary = summarize_npm(args, result.returncode, result.stdout, result.stderr, time.perf_counter() - started)
+    log_id = _get_logs().save(f'npm-{args[0]}', f"$ npm {' '.join(args)}\n{result.stdout}\n{result.stderr}")
+    if result.stopped:
+        # The turn was cancelled or ran out of time; npm was killed part way
+        summary['stopped'] = result.stopped
+    return {
+        'success': result.returncode == 0,
+        'message': success_message if result.returncode == 0 else failure_message,
+        **summary,
+        'log_id': log_id,
+    }
+
+
+def _auto_checkpoint(result: Dict[str, Any], label: str) -> Dict[str, Any]:
+    """Checkpoint the project after a successful write batch (one module of work)"""
+    if result.get('success') and os.getenv('AUTO_CHECKPOINTS', 'true').lower() in ('1', 'true', 'yes'):
+        try:
+            with _get_path_locks().hold_tree():
+                result['checkpoint'] = _get_checkpoints().checkpoint(label)['id']
+        except Exception as e:
+            result['checkpoint_error'] = str(e)
+    return result
+
+@_tool('tashkil-create-react-project')
 def tashkil_create_react_project(
     project_name: str,
     path: str = os.getenv('TARGET_FOLDER_PATH')
@@ -58,52 +218,65 @@ def tashkil_create_react_project(
 
     except Exception as e:
         return {'success': False, 'message': f'Error during project creation: {str(e)}'}
-    
 
-@mcp.tool('tashkil-install-dependencies')
+@_tool('tashkil-list-components')
+def tashkil_list_components(names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    List the UI components that come with every new project, with their
+    import paths, exports, variants and props.
+    Use this instead of listing or reading component files.
+
+    Args:
+        names: Component file names to return, e.g. ["button", "dialog"]; all when empty
+
+    Returns:
+        Catalog version and the matching components
+    """
+    try:
+        catalog = get_component_catalog(
+            os.getenv('PARENT_PROJECT_PATH'),
+            os.getenv('COMPONENT_CATALOG_PATH', os.path.join('.tashkil', 'component_catalog.json'))
+        )
+        wanted = {name.lower() for name in names or []}
+        components = [c for c in catalog['components'] if not wanted or c['name'].lower() in wanted]
+        missing = sorted(wanted - {c['name'].lower() for c in components})
+        return {
+            'success': True,
+            'message': f'{len(components)} components',
+            'version': catalog['version'],
+            'components': components,
+            **({'not_found': missing} if missing else {}),
+        }
+    except Exception as e:
+        return {'success': False, 'message': f'Error listing components: {str(e)}'}
+
+
+@_tool('tashkil-install-dependencies')
 def tashkil_install_dependencies() -> Dict[str, Any]:
     """
     Install npm packages listed in package.json in the current project directory.
     
     Returns:
-        Installation status
+        Compact summary (package counts, vulnerabilities, grouped warnings,
+        first error) and the log_id of the full npm output
     """
     try:
         # Check if package.json exists
         if not os.path.exists('package.json'):
             return {'success': False, 'message': 'No package.json found in current directory'}
         
-        # Run npm install
-        result = subprocess.run(
-            ['npm', 'install'],
-            capture_output=True,
-            text=True,
-            cwd=os.getcwd()
-        )
-        
-        if result.returncode == 0:
-            return {
-                'success': True,
-                'message': 'Dependencies installed successfully',
-                'output': result.stdout
-            }
-        else:
-            return {
-                'success': False,
-                'message': 'Failed to install dependencies',
-                'error': result.stderr
-            }
+        return _run_npm(['install'], 'Dependencies installed successfully', 'Failed to install dependencies')
     
     except Exception as e:
         return {'success': False, 'message': f'Error installing dependencies: {str(e)}'}
 
-@mcp.tool('tashkil-list-dependencies')
+@_tool('tashkil-list-dependencies')
 def tashkil_list_dependencies() -> Dict[str, Any]:
     """
     List npm packages in the current project
     
     Returns:
-        List of dependencies or error message
+        Mapping of top-level package name to installed version
     """
     try:
         # Check if package.json exists
@@ -111,30 +284,23 @@ def tashkil_list_dependencies() -> Dict[str, Any]:
             return {'success': False, 'message': 'No package.json found in current directory'}
         
         # Run npm list --depth=0 to get top-level packages
-        result = subprocess.run(
+        result = run_command(
             ['npm', 'list', '--depth=0', '--json'],
-            capture_output=True,
-            text=True,
-            cwd=os.getcwd()
+            cwd=os.getcwd(),
+            root=_project_root(),
+            timeout=_command_timeout()
         )
         
+        summary = summarize_npm_list(result.stdout)
         if result.returncode == 0:
-            dependencies = result.stdout
-            return {
-                'success': True,
-                'dependencies': dependencies
-            }
-        else:
-            return {
-                'success': False,
-                'message': 'Failed to list dependencies',
-                'error': result.stderr
-            }
+            return {'success': True, **summary}
+        log_id = _get_logs().save('npm-list', f'{result.stdout}\n{result.stderr}')
+        return {'success': False, 'message': 'Failed to list dependencies', **summary, 'log_id': log_id}
     
     except Exception as e:
         return {'success': False, 'message': f'Error listing dependencies: {str(e)}'}
     
-@mcp.tool('tashkil-add-dependency')
+@_tool('tashkil-add-dependency')
 def tashkil_add_dependency(package: str) -> Dict[str, Any]:
     """
     Add npm packages to the project
@@ -143,38 +309,19 @@ def tashkil_add_dependency(package: str) -> Dict[str, Any]:
         package: Package name with optional version (e.g., "lodash@latest")
     
     Returns:
-        Package installed status
+        Compact summary and the log_id of the full npm output
     """
     try:
         # Check if package.json exists
         if not os.path.exists('package.json'):
             return {'success': False, 'message': 'No package.json found in current directory'}
         
-        # Run npm install
-        result = subprocess.run(
-            ['npm', 'install', package],
-            capture_output=True,
-            text=True,
-            cwd=os.getcwd()
-        )
-        
-        if result.returncode == 0:
-            return {
-                'success': True,
-                'message': f'Package {package} installed successfully',
-                'output': result.stdout
-            }
-        else:
-            return {
-                'success': False,
-                'message': f'Failed to install {package}',
-                'error': result.stderr
-            }
+        return _run_npm(['install', package], f'Package {package} installed successfully', f'Failed to install {package}')
     
     except Exception as e:
         return {'success': False, 'message': f'Error installing package: {str(e)}'}
 
-@mcp.tool('tashkil-remove-dependency')
+@_tool('tashkil-remove-dependency')
 def tashkil_remove_dependency(package: str) -> Dict[str, Any]:
     """
     Remove npm packages
@@ -183,38 +330,258 @@ def tashkil_remove_dependency(package: str) -> Dict[str, Any]:
         package: Package name to remove
     
     Returns:
-        Package uninstalled status
+        Compact summary and the log_id of the full npm output
     """
     try:
         # Check if package.json exists
         if not os.path.exists('package.json'):
             return {'success': False, 'message': 'No package.json found in current directory'}
         
-        # Run npm uninstall
-        result = subprocess.run(
-            ['npm', 'uninstall', package],
-            capture_output=True,
-            text=True,
-            cwd=os.getcwd()
-        )
-        
-        if result.returncode == 0:
-            return {
-                'success': True,
-                'message': f'Package {package} removed successfully',
-                'output': result.stdout
-            }
-        else:
-            return {
-                'success': False,
-                'message': f'Failed to remove {package}',
-                'error': result.stderr
-            }
+        return _run_npm(['uninstall', package], f'Package {package} removed successfully', f'Failed to remove {package}')
     
     except Exception as e:
         return {'success': False, 'message': f'Error removing package: {str(e)}'}
 
-@mcp.tool('tashkil-welcome')
+@_tool('tashkil-read-log')
+def tashkil_read_log(log_id: str, page: int = 1, pattern: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Read the full output of an earlier tool run, one page at a time.
+    Only needed when the summary of that run is not enough.
+
+    Args:
+        log_id: The log_id returned by the tool
+        page: Page number, starting at 1
+        pattern: Optional regular expression to keep only matching lines
+    
+    Returns:
+        Numbered log lines of the page and the number of pages
+    """
+    try:
+        return {'success': True, **_get_logs().read(log_id, page=page, pattern=pattern)}
+    except FileNotFoundError:
+        return {'success': False, 'message': f'Log {log_id} not found'}
+    except Exception as e:
+        return {'success': False, 'message': f'Error reading log: {str(e)}'}
+
+@_tool('tashkil-read-files')
+def tashkil_read_files(paths: List[str]) -> Dict[str, Any]:
+    """
+    Read several project files in a single call.
+    Prefer this over reading files one by one.
+
+    Args:
+        paths: File paths relative to the project folder
+    
+    Returns:
+        Mapping of path to file content, plus errors for unreadable files
+    """
+    try:
+        cache = _get_file_cache()
+        return read_files(paths, _project_root(), reader=cache.read if cache else None)
+    except Exception as e:
+        return {'success': False, 'message': f'Error reading files: {str(e)}'}
+
+@_tool('tashkil-search-code')
+def tashkil_search_code(
+    query: str,
+    regex: bool = False,
+    case_sensitive: bool = False,
+    path_glob: Optional[str] = None,
+    limit: int = 50
+) -> Dict[str, Any]:
+    """
+    Search the project source for a string or regular expression.
+    Use this to find where something is defined or used instead of
+    reading files to look for it; node_modules is not searched.
+
+    Args:
+        query: Text to find, or a Python regular expression when regex is true
+        regex: Treat query as a regular expression
+        case_sensitive: Match case exactly
+        path_glob: Only search matching paths, e.g. "src/components/*.tsx"
+        limit: Maximum number of matching lines returned
+
+    Returns:
+        Matching lines as "path:line: text", best files first, and match counts
+    """
+    try:
+        if not query:
+            return {'success': False, 'message': 'Query is empty'}
+        result = _get_search_index().search(
+            query, regex=regex, case_sensitive=case_sensitive, path_glob=path_glob, limit=max(1, limit)
+        )
+        found = f"{result['total_matches']} matches in {result['files_matched']} files"
+        return {'success': True, 'message': found if result['total_matches'] else 'No matches', **result}
+    except re.error as e:
+        return {'success': False, 'message': f'Invalid regular expression: {str(e)}'}
+    except Exception as e:
+        return {'success': False, 'message': f'Error searching code: {str(e)}'}
+
+@_tool('tashkil-write-files')
+def tashkil_write_files(operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Write and edit several project files in a single atomic batch.
+    Either every operation is applied or none is.
+
+    Args:
+        operations: List of operations, each one of
+            {"path": "src/App.jsx", "content": "..."} to write a whole file
+            {"path": "src/App.jsx", "edits": [{"oldText": "...", "newText": "..."}]}
+            to replace unique snippets in an existing file
+    
+    Returns:
+        Batch status with a compact per-file summary
+    """
+    try:
+        _get_file_cache()
+        with _get_path_locks().hold(str(operation.get('path') or '') for operation in operations):
+            result = write_files(operations, _project_root(), on_commit=_file_changed)
+        paths = ', '.join(str(operation.get('path')) for operation in operations)
+        return _auto_checkpoint(result, f'write {paths}')
+    except Exception as e:
+        return {'success': False, 'message': f'Error writing files: {str(e)}'}
+
+@_tool('tashkil-apply-patch')
+def tashkil_apply_patch(patch: str, path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Apply a unified diff to project files instead of rewriting them.
+    Hunks are matched with fuzz against the current file; hunk headers may
+    omit line numbers ("@@ anchor @@", the anchor being a line at or above
+    the change) to locate a hunk by context. Context that matches several
+    places without a unique anchor is reported as a conflict.
+    All touched files are updated atomically.
+
+    Args:
+        patch: Unified diff text (with ---/+++ headers, or hunks only when path is given)
+        path: Target file relative to the project folder, when the diff has no headers
+    
+    Returns:
+        Patch status, conflict details for the failing hunk, and byte metrics
+    """
+    try:
+        try:
+            targets = [file.path for file in parse_patch(patch, default_path=path)]
+        except ValueError:
+            # apply_patch reports the malformed patch
+            targets = [path] if path else []
+        with _get_path_locks().hold(targets):
+            result = apply_patch(patch, _project_root(), path=path)
+        for target in targets:
+            _file_changed(os.path.join(_project_root(), target))
+        paths = ', '.join(file['path'] for file in result.get('files', []))
+        return _auto_checkpoint(result, f'patch {paths}')
+    except Exception as e:
+        return {'success': False, 'message': f'Error applying patch: {str(e)}'}
+
+@_tool('tashkil-check-build')
+def tashkil_check_build(project_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Type check the project after editing files, incrementally.
+    The first call starts a background TypeScript watcher and runs a full
+    check; later calls only wait for the recheck of the files you changed.
+    Call it after each module and fix the reported errors in the same turn.
+
+    Args:
+        project_path: Folder with tsconfig.json relative to the project folder
+            (defaults to the project folder or the React project inside it)
+    
+    Returns:
+        Error count, diagnostics that are new since the previous check as
+        "file:line:column code message", and how many were fixed
+    """
+    try:
+        project = find_typescript_project(_project_root(), project_path)
+        if project is None:
+            return {'success': False, 'message': 'No tsconfig.json found; create the React project first'}
+        timeout = float(os.getenv('BUILD_CHECK_TIMEOUT', '90'))
+        deadline = read_deadline(_project_root())
+        if deadline is not None and deadline > time.time():
+            # Do not keep waiting for the watcher past the turn deadline
+            timeout = min(timeout, max(1.0, deadline - time.time()))
+        return get_type_checker(project).check(timeout=timeout)
+    except Exception as e:
+        return {'success': False, 'message': f'Error checking build: {str(e)}'}
+
+@_tool('tashkil-checkpoint')
+def tashkil_checkpoint(label: str) -> Dict[str, Any]:
+    """
+    Save a checkpoint of the project files (node_modules excluded).
+    Write batches and patches are checkpointed automatically; use this to
+    mark a module boundary explicitly.
+
+    Args:
+        label: Short description, e.g. "module 2: task list"
+    
+    Returns:
+        Checkpoint id and counts of added, modified and deleted files
+    """
+    try:
+        with _get_path_locks().hold_tree():
+            return {'success': True, **_get_checkpoints().checkpoint(label)}
+    except Exception as e:
+        return {'success': False, 'message': f'Error creating checkpoint: {str(e)}'}
+
+@_tool('tashkil-list-checkpoints')
+def tashkil_list_checkpoints(limit: int = 20) -> Dict[str, Any]:
+    """
+    List the most recent project checkpoints, newest first
+
+    Args:
+        limit: Maximum number of checkpoints to return
+    
+    Returns:
+        Checkpoint ids, labels and change counts
+    """
+    try:
+        history = _get_checkpoints().history()
+        return {'success': True, 'total': len(history), 'checkpoints': history[::-1][:limit]}
+    except Exception as e:
+        return {'success': False, 'message': f'Error listing checkpoints: {str(e)}'}
+
+@_tool('tashkil-diff-checkpoints')
+def tashkil_diff_checkpoints(from_id: str, to_id: Optional[str] = None, path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Show which files changed between two checkpoints, or since a checkpoint
+
+    Args:
+        from_id: Older checkpoint id
+        to_id: Newer checkpoint id (defaults to the current files)
+        path: Also return a unified diff of this file
+    
+    Returns:
+        Added, modified and deleted paths, and the file diff if requested
+    """
+    try:
+        return {'success': True, **_get_checkpoints().diff(from_id, to_id, path)}
+    except Exception as e:
+        return {'success': False, 'message': f'Error diffing checkpoints: {str(e)}'}
+
+@_tool('tashkil-restore-checkpoint')
+def tashkil_restore_checkpoint(checkpoint_id: str) -> Dict[str, Any]:
+    """
+    Roll the project files back to a checkpoint.
+    Use this to undo a module that went wrong instead of rewriting files.
+    The current state is checkpointed first, so the restore can be undone.
+
+    Args:
+        checkpoint_id: Checkpoint to restore
+    
+    Returns:
+        Restored and removed files, and the id of the pre-restore backup
+    """
+    try:
+        _get_file_cache()
+        with _get_path_locks().hold_tree():
+            result = _get_checkpoints().restore(checkpoint_id, on_change=_file_changed)
+        return {
+            'success': True,
+            'message': f'Restored {len(result["restored"])} and removed {len(result["removed"])} files',
+            **result,
+        }
+    except Exception as e:
+        return {'success': False, 'message': f'Error restoring checkpoint: {str(e)}'}
+
+@_tool('tashkil-welcome')
 def tashkil_welcome() -> str:
     """
     Generate a welcome message